@@ -0,0 +1,5 @@
+"""
+Benchmarks del pipeline ETL de Metaltronic S.A.
+Ejecutar cada script como módulo desde la raíz del repositorio, por ejemplo:
+    python -m benchmarks.bench_logs_extraction
+"""
@@ -0,0 +1,90 @@
+"""
+Benchmark de carga masiva a PostgreSQL
+Metaltronic S.A. - Pipeline ETL
+
+Compara el rendimiento de COPY FROM STDIN con INSERT multi-fila (to_sql
+method='multi') sobre una tabla temporal con las columnas del resumen
+diario. Requiere la base PostgreSQL configurada en las variables de entorno.
+
+Uso:
+    python -m benchmarks.bench_bulk_load --filas 100000
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from config.database import db_config
+from src.load import copy_dataframe
+
+TABLA = 'bench_carga_masiva'
+
+CREATE_TABLE = f"""
+CREATE TABLE analytics.{TABLA} (
+    fecha_resumen DATE,
+    total_ventas DECIMAL(15,2),
+    total_transacciones INTEGER,
+    productos_vendidos INTEGER,
+    cliente_mas_frecuente VARCHAR(200),
+    categoria_mas_vendida VARCHAR(50),
+    promedio_ticket DECIMAL(10,2)
+)
+"""
+
+
+def generar_filas(filas, semilla=42):
+    """Generar filas sintéticas con la forma del resumen diario"""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'fecha_resumen': pd.Timestamp('2000-01-01') + pd.to_timedelta(np.arange(filas) % 36500, unit='D'),
+        'total_ventas': rng.uniform(100, 100000, filas).round(2),
+        'total_transacciones': rng.integers(1, 500, filas),
+        'productos_vendidos': rng.integers(1, 5000, filas),
+        'cliente_mas_frecuente': rng.choice(['Constructora Andina Cía. Ltda.', 'Talleres Unidos Cía. Ltda.'], filas),
+        'categoria_mas_vendida': rng.choice(['Tuberia', 'Lamina', 'Perfil', 'Soldadura'], filas),
+        'promedio_ticket': rng.uniform(10, 5000, filas).round(2)
+    })
+
+
+def cargar_insert(engine, df):
+    df.to_sql(name=TABLA, schema='analytics', con=engine, if_exists='append',
+              index=False, method='multi')
+
+
+def cargar_copy(engine, df):
+    with engine.begin() as conn:
+        copy_dataframe(conn, df, f'analytics.{TABLA}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=100000)
+    args = parser.parse_args()
+
+    engine = db_config.get_postgres_engine()
+    df = generar_filas(args.filas)
+
+    print(f"\nCarga de {args.filas} filas")
+    print(f"{'método':<12} {'segundos':>10} {'filas/s':>12}")
+    try:
+        for nombre, cargar in [('insert', cargar_insert), ('copy', cargar_copy)]:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS analytics.{TABLA}"))
+                conn.execute(text(CREATE_TABLE))
+
+            inicio = time.perf_counter()
+            cargar(engine, df)
+            segundos = time.perf_counter() - inicio
+
+            with engine.connect() as conn:
+                cargadas = conn.execute(text(f"SELECT COUNT(*) FROM analytics.{TABLA}")).scalar()
+            assert cargadas == args.filas, f"{nombre}: se cargaron {cargadas} filas"
+            print(f"{nombre:<12} {segundos:>10.3f} {args.filas / segundos:>12,.0f}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS analytics.{TABLA}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark del resumen diario de ventas
+Metaltronic S.A. - Pipeline ETL
+
+Compara la agregación anterior (lambdas con value_counts por grupo más un
+segundo groupby con idxmax para el cliente) con la agregación vectorizada de
+DataTransformer.aggregate_daily_sales, y verifica que ambas producen el mismo
+resultado.
+
+En días con empate en la categoría o el vendedor más frecuente, la versión
+anterior elegía según el orden de un argsort no estable de numpy (depende de
+la plataforma); en esos días sólo se exige que el valor elegido tenga el
+mismo conteo máximo. La versión vectorizada desempata por primera aparición.
+
+Uso:
+    python -m benchmarks.bench_daily_aggregation --filas 1000000
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.common import medir, imprimir_resultados
+from src.transform import DataTransformer
+
+CATEGORIAS = ['Tuberia', 'Lamina', 'Perfil', 'Soldadura', 'Accesorios', 'Herramientas']
+VENDEDORES = ['Ana García', 'Carlos López', 'María Rodríguez', 'Luis Pérez', 'Sofía Mena']
+
+
+def generar_ventas(filas, dias, clientes=400, semilla=42):
+    """Generar líneas de detalle de ventas sintéticas"""
+    rng = np.random.default_rng(semilla)
+    nombres = np.array([f'Cliente {i:04d} Cía. Ltda.' for i in range(clientes)])
+    return pd.DataFrame({
+        'fecha_venta': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, dias, filas), unit='D'),
+        'total_factura': rng.uniform(10, 5000, filas).round(2),
+        'cantidad': rng.integers(1, 100, filas),
+        'nombre_cliente': nombres[rng.integers(0, clientes, filas)],
+        'categoria': np.array(CATEGORIAS)[rng.integers(0, len(CATEGORIAS), filas)],
+        'vendedor': np.array(VENDEDORES)[rng.integers(0, len(VENDEDORES), filas)]
+    })
+
+
+def aggregate_daily_sales_anterior(df_ventas):
+    """Implementación anterior del resumen diario (referencia)"""
+    daily_summary = df_ventas.groupby('fecha_venta').agg({
+        'total_factura': ['sum', 'mean', 'count'],
+        'cantidad': 'sum',
+        'nombre_cliente': 'nunique',
+        'categoria': lambda x: x.value_counts().index[0] if not x.empty else None,
+        'vendedor': lambda x: x.value_counts().index[0] if not x.empty else None
+    }).reset_index()
+
+    daily_summary.columns = [
+        'fecha_resumen', 'total_ventas', 'promedio_ticket',
+        'total_transacciones', 'productos_vendidos',
+        'clientes_unicos', 'categoria_mas_vendida', 'vendedor_top'
+    ]
+
+    clientes_frecuentes = df_ventas.groupby(['fecha_venta', 'nombre_cliente']).size().reset_index(name='frecuencia')
+    clientes_top = clientes_frecuentes.loc[clientes_frecuentes.groupby('fecha_venta')['frecuencia'].idxmax()]
+
+    return daily_summary.merge(
+        clientes_top[['fecha_venta', 'nombre_cliente']].rename(columns={'nombre_cliente': 'cliente_mas_frecuente'}),
+        left_on='fecha_resumen',
+        right_on='fecha_venta',
+        how='left'
+    ).drop('fecha_venta', axis=1)
+
+
+def verificar_paridad(df, esperado, obtenido, caso):
+    """Comparar dos resúmenes diarios ignorando la fecha de procesamiento"""
+    obtenido = obtenido.drop(columns='fecha_procesamiento')[esperado.columns]
+    empates = 0
+    for columna, origen in [('categoria_mas_vendida', 'categoria'), ('vendedor_top', 'vendedor')]:
+        distintos = esperado[columna] != obtenido[columna]
+        if distintos.any():
+            conteos = df.groupby(['fecha_venta', origen]).size()
+            fechas = esperado.loc[distintos, 'fecha_resumen']
+            conteo_esperado = conteos.loc[list(zip(fechas, esperado.loc[distintos, columna]))].values
+            conteo_obtenido = conteos.loc[list(zip(fechas, obtenido.loc[distintos, columna]))].values
+            assert (conteo_esperado == conteo_obtenido).all(), f"{columna}: valores más frecuentes distintos"
+            obtenido.loc[distintos, columna] = esperado.loc[distintos, columna]
+            empates += int(distintos.sum())
+    pd.testing.assert_frame_equal(esperado, obtenido)
+    print(f"Paridad verificada ({caso}): {len(esperado)} días, {empates} empates resueltos distinto")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=1000000)
+    parser.add_argument('--dias', type=int, default=365)
+    args = parser.parse_args()
+
+    transformer = DataTransformer()
+
+    # Caso con muchos empates: pocos registros por día
+    df_empates = generar_ventas(20000, 5000, clientes=30, semilla=7)
+    verificar_paridad(df_empates, aggregate_daily_sales_anterior(df_empates),
+                      transformer.aggregate_daily_sales(df_empates), 'empates')
+
+    df = generar_ventas(args.filas, args.dias)
+    esperado, t_anterior, mem_anterior = medir(aggregate_daily_sales_anterior, df)
+    obtenido, t_vectorizado, mem_vectorizado = medir(transformer.aggregate_daily_sales, df)
+
+    imprimir_resultados(f"Resumen diario de {args.filas} líneas ({args.dias} días)", [
+        ('lambdas value_counts + idxmax', t_anterior, mem_anterior),
+        ('conteos agrupados vectorizados', t_vectorizado, mem_vectorizado)
+    ])
+    print(f"\nAceleración: {t_anterior / t_vectorizado:.1f}x")
+    verificar_paridad(df, esperado, obtenido, f'{args.filas} líneas')
+
+
+if __name__ == '__main__':
+    main()
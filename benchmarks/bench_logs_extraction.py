@@ -0,0 +1,83 @@
+"""
+Benchmark de extracción de logs de MongoDB
+Metaltronic S.A. - Pipeline ETL
+
+Compara la conversión actual (documentos completos + json_normalize) con la
+extracción proyectada por lotes. Los cursores se simulan generando cada
+documento al iterar, tal como pymongo los decodifica, por lo que no se
+requiere una base de datos.
+
+Uso:
+    python -m benchmarks.bench_logs_extraction --documentos 200000
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+from bson import ObjectId
+from benchmarks.common import medir, imprimir_resultados
+from src.extract import logs_documents_to_frame, logs_cursor_to_frame, LOGS_FIELDS
+
+VENDEDORES = ['Ana García', 'Carlos López', 'María Rodríguez']
+EVENTOS = ['venta_completada', 'venta_anulada', 'cotizacion_creada']
+
+
+def cursor_simulado(documentos, proyectado, semilla=42):
+    """Generar documentos de logs como los devolvería un cursor de pymongo"""
+    rng = np.random.default_rng(semilla)
+    rng_productos = np.random.default_rng(semilla + 1)
+    inicio = datetime(2024, 1, 15)
+    for i in range(documentos):
+        num_productos = int(rng.integers(1, 6))
+        documento = {
+            'timestamp': inicio + timedelta(seconds=int(rng.integers(0, 86400))),
+            'evento': EVENTOS[i % len(EVENTOS)],
+            'numero_factura': f'001-001-{i:09d}',
+            'cliente_id': int(rng.integers(1, 500)),
+            'vendedor': VENDEDORES[i % len(VENDEDORES)],
+            'total': float(rng.uniform(10, 5000))
+        }
+        if proyectado:
+            documento['num_productos'] = num_productos
+        else:
+            documento['_id'] = ObjectId()
+            documento['productos'] = [
+                {'codigo': f'MT-{j:03d}', 'cantidad': int(rng_productos.integers(1, 100))}
+                for j in range(num_productos)
+            ]
+            documento['metadatos'] = {
+                'ip_cliente': f'192.168.1.{i % 255}',
+                'sucursal': 'Ambato',
+                'terminal': f'POS-{i % 5:03d}'
+            }
+        yield documento
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--documentos', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    df_actual, t_actual, mem_actual = medir(
+        logs_documents_to_frame, cursor_simulado(args.documentos, proyectado=False)
+    )
+    df_proyectado, t_proyectado, mem_proyectado = medir(
+        logs_cursor_to_frame, cursor_simulado(args.documentos, proyectado=True), args.batch_size
+    )
+
+    imprimir_resultados(f"Extracción de {args.documentos} logs", [
+        ('documentos completos + json_normalize', t_actual, mem_actual),
+        (f'proyectado por lotes ({args.batch_size})', t_proyectado, mem_proyectado)
+    ])
+    print(f"\nColumnas actual: {len(df_actual.columns)}, proyectado: {len(df_proyectado.columns)}")
+    print(f"Memoria DataFrame actual: {df_actual.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB, "
+          f"proyectado: {df_proyectado.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
+
+    # Los campos proyectados deben coincidir con la ruta actual
+    comunes = [c for c in LOGS_FIELDS if c in df_actual.columns]
+    assert df_actual[comunes].equals(df_proyectado[comunes]), "Los campos proyectados difieren"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark del esquema compacto de ventas en memoria
+Metaltronic S.A. - Pipeline ETL
+
+Compara la memoria de ventas_clean con el esquema por defecto (objetos
+Python) y con el esquema compacto (categóricas y enteros pequeños), y
+verifica que el resumen diario y el análisis de inventario no cambian.
+Las líneas de detalle se generan con los tipos que entrega la extracción
+(Decimal para columnas DECIMAL y date para fecha_venta).
+
+Uso:
+    python -m benchmarks.bench_sales_memory --filas 500000
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from src.transform import DataTransformer, memory_mb
+
+CIUDADES = ['Ambato', 'Latacunga', 'Riobamba', 'Quito', 'Guayaquil']
+CATEGORIAS = ['Tuberia', 'Lamina', 'Perfil', 'Soldadura', 'Accesorios']
+MATERIALES = ['Acero', 'Hierro', 'Aluminio', 'Cobre']
+METODOS_PAGO = ['Efectivo', 'Transferencia', 'Cheque', 'Crédito']
+VENDEDORES = ['Ana García', 'Carlos López', 'María Rodríguez', 'Luis Pérez']
+
+
+def generar_ventas_sin_procesar(filas, productos=200, clientes=2000, semilla=42):
+    """Generar líneas de detalle con los tipos de la extracción"""
+    rng = np.random.default_rng(semilla)
+    transacciones = np.sort(rng.integers(1, filas // 3 + 2, filas))
+    producto = rng.integers(0, productos, filas)
+    cliente = rng.integers(0, clientes, filas)[transacciones % filas]
+    inicio = date(2024, 1, 1)
+    precios = [Decimal(f'{p:.2f}') for p in rng.uniform(0.5, 200, productos)]
+    totales = {t: Decimal(f'{v:.2f}') for t, v in zip(np.unique(transacciones), rng.uniform(10, 5000, filas))}
+    cantidades = rng.integers(1, 100, filas)
+    return pd.DataFrame({
+        'id_transaccion': transacciones,
+        'numero_factura': [f'001-001-{t:09d}' for t in transacciones],
+        'fecha_venta': [inicio + timedelta(days=int(t) % 365) for t in transacciones],
+        'nombre_cliente': [f'Cliente {c:05d} Cía. Ltda.' for c in cliente],
+        'ciudad': np.array(CIUDADES, dtype=object)[cliente % len(CIUDADES)],
+        'provincia': 'Tungurahua',
+        'codigo_producto': [f'MT-{p:04d}' for p in producto],
+        'nombre_producto': [f'Producto metálico {p:04d}' for p in producto],
+        'categoria': np.array(CATEGORIAS, dtype=object)[producto % len(CATEGORIAS)],
+        'material': np.array(MATERIALES, dtype=object)[producto % len(MATERIALES)],
+        'cantidad': cantidades,
+        'precio_unitario': [precios[p] for p in producto],
+        'descuento': [Decimal('0.00')] * filas,
+        'subtotal': [precios[p] * int(q) for p, q in zip(producto, cantidades)],
+        'total_factura': [totales[t] for t in transacciones],
+        'metodo_pago': np.array(METODOS_PAGO, dtype=object)[transacciones % len(METODOS_PAGO)],
+        'vendedor': np.array(VENDEDORES, dtype=object)[transacciones % len(VENDEDORES)],
+        'sucursal': 'Ambato'
+    })
+
+
+def generar_inventario(productos=200):
+    """Generar el inventario de los productos vendidos"""
+    return pd.DataFrame({
+        'codigo_producto': [f'MT-{p:04d}' for p in range(productos)],
+        'stock_actual': np.arange(productos) % 50
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--filas', type=int, default=500000)
+    args = parser.parse_args()
+
+    transformer = DataTransformer()
+    ventas = generar_ventas_sin_procesar(args.filas)
+    inventario = generar_inventario()
+
+    # Se mide la memoria del DataFrame resultante; tracemalloc no se usa
+    # porque multiplica el tiempo de conversión de los objetos Decimal
+    print(f"\nLimpieza de {args.filas} líneas de ventas "
+          f"(sin procesar: {memory_mb(ventas):.1f} MB)")
+    print(f"{'caso':<24} {'segundos':>10} {'ventas_clean MB':>16}")
+    resultados = {}
+    for nombre, compact in [('esquema por defecto', False), ('esquema compacto', True)]:
+        inicio = time.perf_counter()
+        resultados[compact] = transformer.clean_sales_data(ventas, compact=compact)
+        segundos = time.perf_counter() - inicio
+        print(f"{nombre:<24} {segundos:>10.3f} {memory_mb(resultados[compact]):>16.1f}")
+    normal, compacto = resultados[False], resultados[True]
+    print(f"Reducción de memoria: {1 - memory_mb(compacto) / memory_mb(normal):.0%}")
+
+    # Las salidas posteriores deben ser idénticas
+    resumen_normal = transformer.aggregate_daily_sales(normal).drop(columns='fecha_procesamiento')
+    resumen_compacto = transformer.aggregate_daily_sales(compacto).drop(columns='fecha_procesamiento')
+    pd.testing.assert_frame_equal(resumen_normal, resumen_compacto)
+    pd.testing.assert_frame_equal(
+        transformer.analyze_inventory_trends(inventario, normal),
+        transformer.analyze_inventory_trends(inventario, compacto)
+    )
+    print(f"Paridad verificada: {len(resumen_normal)} días, {len(inventario)} productos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Suite de benchmarks de escalamiento del pipeline
+Metaltronic S.A. - Pipeline ETL
+
+Mide tiempo y pico de memoria de los métodos públicos de DataExtractor,
+DataTransformer y DataLoader sobre datos sintéticos deterministas
+(benchmarks.generator) a varias escalas, sin bases de datos: las lecturas y
+escrituras usan benchmarks.memory_backend.
+
+Los métodos de DataExtractor que sólo ejecutan consultas SQL no tienen
+trabajo en Python que medir sin PostgreSQL y se listan como omitidos; para
+ellos existen bench_bulk_load y parity_sales_pushdown contra una base real.
+
+Uso:
+    python -m benchmarks.bench_suite --escalas 10000,100000,1000000
+    python -m benchmarks.bench_suite --escalas 10000000 --sin-memoria
+"""
+
+import argparse
+from benchmarks.common import medir
+from benchmarks.generator import SyntheticDataGenerator
+from benchmarks.memory_backend import MemoryBackend
+from src.extract import DataExtractor
+from src.transform import DataTransformer
+from src.load import DataLoader
+from src.quality import approximate_summary, exact_summary
+
+# Métodos públicos que requieren PostgreSQL
+OMITIDOS = [
+    'DataExtractor.plan_incremental_sales', 'DataExtractor.extract_sales_data',
+    'DataExtractor.extract_sales_data_chunks', 'DataExtractor.extract_daily_summary',
+    'DataExtractor.extract_product_sales', 'DataExtractor.extract_inventory_data',
+    'DataExtractor.run_sources', 'DataExtractor.extract_all_data'
+]
+
+
+def casos_de_escala(generador, decimales):
+    """
+    Construir los casos a medir para una escala
+
+    Cada caso recibe los resultados de los anteriores, de modo que la
+    entrada de cada método es la salida real del paso previo.
+
+    Returns:
+        list: Tuplas (nombre, función que recibe el contexto, clave donde
+            guardar el resultado, clave de la entrada cuyas filas se reportan;
+            None para reportar las filas del resultado)
+    """
+    backend = MemoryBackend(generador)
+    extractor = DataExtractor()
+    extractor.db_config = backend
+    transformer = DataTransformer()
+    loader = DataLoader()
+    loader.db_config = backend
+
+    desde = generador.fecha_inicio.isoformat()
+    hasta = (generador.fecha_inicio.replace(year=generador.fecha_inicio.year + 10)).isoformat()
+
+    tablas = ['resumen_diario', 'analisis_inventario', 'logs_processed']
+    return [
+        ('generador.sales_frame', lambda c: generador.sales_frame(decimales=decimales), 'ventas', None),
+        ('generador.inventory_frame', lambda c: generador.inventory_frame(), 'inventario', None),
+        ('DataExtractor.extract_logs_data',
+         lambda c: extractor.extract_logs_data(desde, hasta, projected=True), 'logs', None),
+        ('DataExtractor.extract_logs_data (completo)',
+         lambda c: extractor.extract_logs_data(desde, hasta, projected=False), None, None),
+        ('DataTransformer.clean_sales_data',
+         lambda c: transformer.clean_sales_data(c['ventas'], compact=False), 'ventas_clean', 'ventas'),
+        ('DataTransformer.clean_sales_data (compacto)',
+         lambda c: transformer.clean_sales_data(c['ventas'], compact=True), None, 'ventas'),
+        ('DataTransformer.aggregate_daily_sales',
+         lambda c: transformer.aggregate_daily_sales(c['ventas_clean']), 'resumen_diario', 'ventas_clean'),
+        ('DataTransformer.summarize_product_sales',
+         lambda c: transformer.summarize_product_sales(c['ventas_clean']), None, 'ventas_clean'),
+        ('DataTransformer.analyze_inventory_trends',
+         lambda c: transformer.analyze_inventory_trends(c['inventario'], c['ventas_clean']),
+         'analisis_inventario', 'ventas_clean'),
+        ('DataTransformer.transform_sales_chunks',
+         lambda c: transformer.transform_sales_chunks(
+             c['ventas'].iloc[i:i + 100000] for i in range(0, len(c['ventas']), 100000)), None, 'ventas'),
+        ('DataTransformer.process_logs_data',
+         lambda c: transformer.process_logs_data(c['logs']), 'logs_processed', 'logs'),
+        ('DataTransformer.transform_all_data',
+         lambda c: transformer.transform_all_data({k: c[k] for k in ['ventas', 'inventario', 'logs']}), None, 'ventas'),
+        ('DataLoader.load_daily_summary',
+         lambda c: loader.load_daily_summary(c['resumen_diario']), None, 'resumen_diario'),
+        ('DataLoader.load_inventory_analysis',
+         lambda c: loader.load_inventory_analysis(c['analisis_inventario']), None, 'analisis_inventario'),
+        ('DataLoader.load_logs_summary',
+         lambda c: loader.load_logs_summary(c['logs_processed']), None, 'logs_processed'),
+        ('quality.exact_summary',
+         lambda c: exact_summary(c['ventas_clean']), None, 'ventas_clean'),
+        ('quality.approximate_summary',
+         lambda c: approximate_summary(c['ventas_clean']), None, 'ventas_clean'),
+        ('DataLoader.generate_data_quality_report',
+         lambda c: loader.generate_data_quality_report({k: c[k] for k in tablas}), None, 'resumen_diario'),
+        ('DataLoader.load_all_data',
+         lambda c: loader.load_all_data({k: c[k] for k in tablas}), None, 'resumen_diario')
+    ]
+
+
+def ejecutar_escala(lineas, decimales, trazar_memoria):
+    """Ejecutar todos los casos para una escala e imprimir los resultados"""
+    generador = SyntheticDataGenerator(lineas)
+    print(f"\nEscala: {lineas:,} líneas de detalle ({generador.num_transacciones:,} transacciones, "
+          f"{generador.num_clientes:,} clientes, {generador.num_productos:,} productos)")
+    print(f"{'caso':<48} {'filas':>11} {'segundos':>10} {'filas/s':>12} {'pico MB':>9}")
+
+    contexto = {}
+    for nombre, funcion, clave, entrada in casos_de_escala(generador, decimales):
+        try:
+            resultado, segundos, pico = medir(funcion, contexto, trazar_memoria=trazar_memoria)
+        except Exception as e:
+            print(f"{nombre:<48} ERROR: {type(e).__name__}: {str(e)[:60]}")
+            continue
+        if clave:
+            contexto[clave] = resultado
+        filas = len(contexto[entrada] if entrada else resultado)
+        pico_texto = f"{pico:>9.1f}" if pico is not None else f"{'-':>9}"
+        print(f"{nombre:<48} {filas:>11,} {segundos:>10.3f} {filas / max(segundos, 1e-9):>12,.0f} {pico_texto}")
+
+    print(f"Omitidos (requieren PostgreSQL): {', '.join(m.split('.')[1] for m in OMITIDOS)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escalas', default='10000,100000',
+                        help='Líneas de detalle por escala, separadas por coma')
+    parser.add_argument('--decimales', action='store_true',
+                        help='Generar columnas DECIMAL como objetos Decimal (como psycopg2)')
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help='No medir el pico de memoria (tracemalloc ralentiza los métodos)')
+    args = parser.parse_args()
+
+    for lineas in [int(valor) for valor in args.escalas.split(',')]:
+        ejecutar_escala(lineas, args.decimales, not args.sin_memoria)
+
+
+if __name__ == '__main__':
+    main()
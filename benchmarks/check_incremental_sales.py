@@ -0,0 +1,131 @@
+"""
+Verificación de la planificación incremental de ventas
+Metaltronic S.A. - Pipeline ETL
+
+Comprueba que DataExtractor.plan_incremental_sales detecta:
+
+- una transacción con id menor confirmada después de otra con id mayor
+  (commit fuera de orden), gracias a la ventana de relectura;
+- la modificación de una línea de detalle de una transacción ya procesada
+  (el trigger de detalle_ventas marca su transacción).
+
+Inserta transacciones de prueba con fechas de venta sin actividad y las
+elimina al terminar. Las marcas de agua se guardan en memoria: no se
+modifica analytics.etl_watermarks. Requiere la base PostgreSQL configurada
+en las variables de entorno (con el esquema de sql/init_postgres.sql).
+
+Uso:
+    python -m benchmarks.check_incremental_sales --fecha-a 1999-01-01 --fecha-b 1999-01-02
+"""
+
+import argparse
+import os
+import time
+from sqlalchemy import text
+from config.database import db_config
+from config.pipeline import pipeline_config
+from src.extract import DataExtractor
+
+INSERTAR_TRANSACCION = """
+INSERT INTO ventas.transacciones
+    (numero_factura, id_cliente, fecha_venta, subtotal, iva, total, metodo_pago, vendedor)
+VALUES (:factura, (SELECT MIN(id_cliente) FROM ventas.clientes), :fecha, 10, 1.2, 11.2, 'Efectivo', 'Verificación')
+RETURNING id_transaccion
+"""
+
+INSERTAR_DETALLE = """
+INSERT INTO ventas.detalle_ventas (id_transaccion, id_producto, cantidad, precio_unitario, subtotal)
+VALUES (:id, (SELECT MIN(id_producto) FROM inventario.productos), 1, 10, 10)
+RETURNING id_detalle
+"""
+
+
+class MarcasEnMemoria:
+    """Marcas de agua con la interfaz de WatermarkStore, sin base de datos"""
+
+    def __init__(self):
+        self.confirmadas = {}
+        self.pendientes = {}
+
+    def get(self, fuente):
+        return self.confirmadas.get(fuente)
+
+    def set(self, fuente, valor, pendiente=False):
+        (self.pendientes if pendiente else self.confirmadas)[fuente] = str(valor)
+
+    def confirm(self, fuente=None):
+        self.confirmadas.update(self.pendientes)
+        self.pendientes = {}
+
+
+def planificar(extractor):
+    """Planificar y confirmar, como una ejecución con carga exitosa"""
+    fechas = extractor.plan_incremental_sales() or []
+    extractor.watermarks.confirm()
+    return fechas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fecha-a', default='1999-01-01', help='Fecha de venta sin actividad')
+    parser.add_argument('--fecha-b', default='1999-01-02', help='Otra fecha de venta sin actividad')
+    parser.add_argument('--ventana-s', type=float, default=2.0, help='Ventana de relectura en segundos')
+    args = parser.parse_args()
+
+    pipeline_config.extract_config['incremental_lookback_minutes'] = args.ventana_s / 60
+    extractor = DataExtractor()
+    extractor.watermarks = MarcasEnMemoria()
+    engine = db_config.get_postgres_engine()
+    sufijo = os.getpid()
+    ids = []
+
+    conn_a = engine.connect()
+    try:
+        planificar(extractor)
+
+        # A obtiene el id menor pero confirma después que B
+        tx_a = conn_a.begin()
+        ids.append(conn_a.execute(text(INSERTAR_TRANSACCION),
+                                  {'factura': f'CHK-A-{sufijo}', 'fecha': args.fecha_a}).scalar())
+        time.sleep(args.ventana_s / 4)
+        with engine.begin() as conn_b:
+            id_b = conn_b.execute(text(INSERTAR_TRANSACCION),
+                                  {'factura': f'CHK-B-{sufijo}', 'fecha': args.fecha_b}).scalar()
+            id_detalle = conn_b.execute(text(INSERTAR_DETALLE), {'id': id_b}).scalar()
+        ids.append(id_b)
+        assert ids[0] < id_b, f"Se esperaba id de A ({ids[0]}) menor que el de B ({id_b})"
+
+        fechas = planificar(extractor)
+        assert args.fecha_b in fechas and args.fecha_a not in fechas, f"Antes del commit de A: {fechas}"
+
+        tx_a.commit()
+        fechas = planificar(extractor)
+        assert args.fecha_a in fechas, f"Commit fuera de orden no detectado: {fechas}"
+        print(f"Commit fuera de orden detectado (id {ids[0]} < {id_b}): {fechas}")
+
+        # Pasada la ventana, las transacciones ya procesadas no se releen
+        time.sleep(args.ventana_s + 1)
+        fechas = planificar(extractor)
+        assert args.fecha_a not in fechas and args.fecha_b not in fechas, f"Sin cambios: {fechas}"
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE ventas.detalle_ventas SET cantidad = cantidad + 1 WHERE id_detalle = :id"),
+                         {'id': id_detalle})
+        fechas = planificar(extractor)
+        assert args.fecha_b in fechas and args.fecha_a not in fechas, f"Detalle modificado no detectado: {fechas}"
+        print(f"Modificación de detalle detectada: {fechas}")
+
+        print("Planificación incremental de ventas verificada")
+
+    finally:
+        conn_a.close()
+        with engine.begin() as conn:
+            if ids:
+                conn.execute(text("DELETE FROM ventas.detalle_ventas WHERE id_transaccion = ANY(:ids)"),
+                             {'ids': ids})
+                conn.execute(text("DELETE FROM ventas.transacciones WHERE id_transaccion = ANY(:ids)"),
+                             {'ids': ids})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Utilidades comunes para los benchmarks
+Metaltronic S.A. - Pipeline ETL
+"""
+
+import time
+import tracemalloc
+
+
+def medir(funcion, *args, trazar_memoria=True, **kwargs):
+    """
+    Ejecutar una función midiendo tiempo y pico de memoria asignada
+
+    Args:
+        trazar_memoria (bool): Medir el pico con tracemalloc; desactivarlo
+            evita su sobrecarga en funciones que crean muchos objetos Python
+
+    Returns:
+        tuple: (resultado, segundos, pico de memoria en MB o None)
+    """
+    if not trazar_memoria:
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        return resultado, time.perf_counter() - inicio, None
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion(*args, **kwargs)
+    finally:
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return resultado, segundos, pico / 1024 / 1024
+
+
+def imprimir_resultados(titulo, filas):
+    """Imprimir una tabla de resultados (nombre, segundos, MB)"""
+    print(f"\n{titulo}")
+    print(f"{'caso':<40} {'segundos':>10} {'pico MB':>10}")
+    for nombre, segundos, pico_mb in filas:
+        print(f"{nombre:<40} {segundos:>10.3f} {pico_mb:>10.1f}")
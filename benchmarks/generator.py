@@ -0,0 +1,388 @@
+"""
+Generador determinista de datos sintéticos
+Metaltronic S.A. - Pipeline ETL
+
+Genera clientes, productos, transacciones, detalle_ventas y logs_ventas con
+la estructura de sql/init_postgres.sql y sql/init_mongo.js, a escalas de 10
+mil a 10 millones de líneas de detalle. Con la misma semilla y escala el
+resultado es siempre idéntico, sin importar el orden en que se pidan las
+tablas.
+
+Además de las tablas, entrega los DataFrames con la forma que devuelve la
+extracción (consulta de ventas con joins, inventario y logs proyectados),
+para medir el pipeline sin bases de datos.
+
+Uso:
+    python -m benchmarks.generator --lineas 100000 --salida /tmp/metaltronic_sintetico
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+import json
+import numpy as np
+import pandas as pd
+from src.extract import logs_cursor_to_frame
+
+# Catálogo base: categoría -> (materiales, productos, rango de precio)
+CATALOGO = {
+    'Tuberia': (['Acero Negro', 'Acero Galvanizado', 'Inoxidable'],
+                ['Tubo Cuadrado', 'Tubo Redondo', 'Tubo Rectangular'], (8.0, 90.0)),
+    'Lamina': (['Acero Negro', 'Acero Galvanizado', 'Aluminio'],
+               ['Plancha Lisa', 'Chapa Antideslizante', 'Lámina Perforada'], (25.0, 180.0)),
+    'Varilla': (['Acero Corrugado', 'Acero Liso'], ['Varilla Corrugada', 'Varilla Lisa'], (0.8, 12.0)),
+    'Perfil': (['Acero Negro', 'Acero Galvanizado'], ['Angulo', 'Canal U', 'Viga IPE', 'Platina'], (5.0, 120.0)),
+    'Soldadura': (['Rutilico', 'Cobre', 'Bajo Hidrógeno'], ['Electrodo', 'Cable Soldadura', 'Alambre MIG'], (0.3, 40.0)),
+    'Herramienta': (['Abrasivo', 'Acero Rápido'], ['Disco Corte', 'Disco Desbaste', 'Broca'], (1.5, 35.0)),
+    'Tornilleria': (['Acero Galvanizado', 'Inoxidable'], ['Perno Hexagonal', 'Tuerca', 'Arandela'], (0.05, 2.5))
+}
+PESO_CATEGORIAS = [0.22, 0.15, 0.18, 0.17, 0.12, 0.08, 0.08]
+
+CIUDADES = [
+    ('Ambato', 'Tungurahua'), ('Pelileo', 'Tungurahua'), ('Baños', 'Tungurahua'),
+    ('Riobamba', 'Chimborazo'), ('Latacunga', 'Cotopaxi'), ('Quito', 'Pichincha')
+]
+PESO_CIUDADES = [0.55, 0.1, 0.05, 0.12, 0.1, 0.08]
+
+TIPOS_CLIENTE = ['Constructora', 'Metalmecánica', 'Talleres', 'Industrias', 'Ferretería', 'Comercial']
+APELLIDOS = ['Andina', 'Tungurahua', 'Chimborazo', 'del Centro', 'Pérez', 'Sánchez', 'Vásquez',
+             'Mena', 'Villacís', 'Altamirano', 'Naranjo', 'Cevallos', 'Lascano', 'Núñez']
+SUFIJOS = ['Cía. Ltda.', 'S.A.', '']
+
+VENDEDORES = ['Ana García', 'Carlos López', 'María Rodríguez', 'Luis Pérez', 'Sofía Mena', 'Jorge Villacís']
+METODOS_PAGO = ['Efectivo', 'Transferencia', 'Cheque', 'Crédito']
+PESO_METODOS_PAGO = [0.3, 0.35, 0.15, 0.2]
+SUCURSALES = ['Ambato', 'Riobamba', 'Latacunga']
+PESO_SUCURSALES = [0.7, 0.2, 0.1]
+DESCUENTOS = [0.0, 0.5, 1.0, 1.5, 2.0, 5.0]
+PESO_DESCUENTOS = [0.8, 0.05, 0.05, 0.04, 0.04, 0.02]
+
+# Eventos de logs adicionales a las ventas completadas (proporción por venta)
+EVENTOS_ADICIONALES = {'cotizacion_creada': 0.08, 'venta_anulada': 0.02}
+
+IVA = 0.12
+LINEAS_POR_TRANSACCION = 2.5
+
+# Cada tabla usa su propio flujo aleatorio derivado de la semilla
+TABLAS = ['productos', 'clientes', 'transacciones', 'detalle_ventas', 'logs_ventas', 'lineas']
+
+def _popularidad(n, exponente):
+    """Pesos tipo Zipf: pocos elementos concentran la mayor parte de la demanda"""
+    pesos = 1.0 / np.arange(1, n + 1) ** exponente
+    return pesos / pesos.sum()
+
+class SyntheticDataGenerator:
+    """Clase para generar datos sintéticos del pipeline de forma determinista"""
+
+    def __init__(self, lineas=10000, fecha_inicio='2024-01-01', dias=365, semilla=42):
+        if lineas < 1:
+            raise ValueError("lineas debe ser mayor que cero")
+        self.lineas = int(lineas)
+        self.fecha_inicio = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+        self.dias = int(dias)
+        self.semilla = semilla
+        self._cache = {}
+
+        # Líneas por transacción: 1 + Poisson, recortado para sumar exactamente `lineas`
+        rng = self._rng('lineas')
+        conteos = 1 + rng.poisson(LINEAS_POR_TRANSACCION - 1, int(self.lineas / 1.5) + 10)
+        acumulado = np.cumsum(conteos)
+        self.num_transacciones = int(np.searchsorted(acumulado, self.lineas)) + 1
+        conteos = conteos[:self.num_transacciones]
+        conteos[-1] -= acumulado[self.num_transacciones - 1] - self.lineas
+        self._lineas_por_transaccion = conteos
+
+        self.num_clientes = int(np.clip(self.num_transacciones // 25, 20, 50000))
+        self.num_productos = int(np.clip(self.lineas // 500, 30, 5000))
+
+    def _rng(self, tabla):
+        return np.random.default_rng([self.semilla, TABLAS.index(tabla)])
+
+    def _cached(self, nombre, constructor):
+        if nombre not in self._cache:
+            self._cache[nombre] = constructor()
+        return self._cache[nombre]
+
+    # ========== TABLAS FUENTE ==========
+
+    def productos(self):
+        """Tabla inventario.productos"""
+        return self._cached('productos', self._build_productos)
+
+    def _build_productos(self):
+        rng = self._rng('productos')
+        n = self.num_productos
+        categorias = list(CATALOGO)
+        idx_categoria = rng.choice(len(categorias), n, p=PESO_CATEGORIAS)
+
+        materiales, nombres, precios = [], [], np.empty(n)
+        for i, c in enumerate(idx_categoria):
+            lista_materiales, bases, (minimo, maximo) = CATALOGO[categorias[c]]
+            materiales.append(lista_materiales[i % len(lista_materiales)])
+            nombres.append(f'{bases[i % len(bases)]} {10 + (i * 7) % 90}mm Ref. {i + 1:05d}')
+            precios[i] = minimo * (maximo / minimo) ** rng.random()
+
+        stock_minimo = rng.choice([8, 10, 15, 20, 25, 50, 100], n)
+        creacion = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, n), unit='s')
+        return pd.DataFrame({
+            'id_producto': np.arange(1, n + 1),
+            'codigo_producto': [f'MT-{i:05d}' for i in range(1, n + 1)],
+            'nombre_producto': nombres,
+            'categoria': np.array(categorias, dtype=object)[idx_categoria],
+            'material': materiales,
+            'peso_kg': rng.uniform(0.02, 35.0, n).round(3),
+            'precio_unitario': precios.round(2),
+            'stock_actual': (stock_minimo * rng.uniform(0, 12, n)).astype(int),
+            'stock_minimo': stock_minimo,
+            'fecha_creacion': creacion,
+            'fecha_actualizacion': creacion + pd.to_timedelta(rng.integers(0, 180 * 86400, n), unit='s'),
+            'activo': rng.random(n) < 0.97
+        })
+
+    def clientes(self):
+        """Tabla ventas.clientes"""
+        return self._cached('clientes', self._build_clientes)
+
+    def _build_clientes(self):
+        rng = self._rng('clientes')
+        n = self.num_clientes
+        combinaciones = len(TIPOS_CLIENTE) * len(APELLIDOS) * len(SUFIJOS)
+        nombres = []
+        for i in range(n):
+            tipo = TIPOS_CLIENTE[i % len(TIPOS_CLIENTE)]
+            apellido = APELLIDOS[(i // len(TIPOS_CLIENTE)) % len(APELLIDOS)]
+            sufijo = SUFIJOS[(i // (len(TIPOS_CLIENTE) * len(APELLIDOS))) % len(SUFIJOS)]
+            nombre = f'{tipo} {apellido} {sufijo}'.strip()
+            nombres.append(nombre if i < combinaciones else f'{nombre} #{i // combinaciones}')
+
+        ciudades = rng.choice(len(CIUDADES), n, p=PESO_CIUDADES)
+        return pd.DataFrame({
+            'id_cliente': np.arange(1, n + 1),
+            'cedula_ruc': [f'18{i:08d}001' for i in range(1, n + 1)],
+            'nombre_cliente': nombres,
+            'telefono': [f'03{v:07d}' for v in rng.integers(2000000, 3000000, n)],
+            'email': [f'compras{i}@cliente{i}.ec' for i in range(1, n + 1)],
+            'ciudad': [CIUDADES[c][0] for c in ciudades],
+            'provincia': [CIUDADES[c][1] for c in ciudades],
+            'fecha_registro': pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 730, n), unit='D'),
+            'activo': True
+        })
+
+    def detalle_ventas(self):
+        """Tabla ventas.detalle_ventas"""
+        return self._cached('detalle_ventas', self._build_detalle_ventas)
+
+    def _build_detalle_ventas(self):
+        rng = self._rng('detalle_ventas')
+        n = self.lineas
+        productos = self.productos()
+
+        id_producto = rng.choice(self.num_productos, n, p=_popularidad(self.num_productos, 0.9)) + 1
+        precio = productos['precio_unitario'].to_numpy()[id_producto - 1]
+        cantidad = np.maximum(1, rng.lognormal(2.5, 1.0, n).astype(int))
+        descuento = rng.choice(DESCUENTOS, n, p=PESO_DESCUENTOS)
+        return pd.DataFrame({
+            'id_detalle': np.arange(1, n + 1),
+            'id_transaccion': np.repeat(np.arange(1, self.num_transacciones + 1), self._lineas_por_transaccion),
+            'id_producto': id_producto,
+            'cantidad': cantidad,
+            'precio_unitario': precio,
+            'descuento': descuento,
+            'subtotal': (cantidad * precio * (1 - descuento / 100)).round(2)
+        })
+
+    def transacciones(self):
+        """Tabla ventas.transacciones (totales calculados desde el detalle)"""
+        return self._cached('transacciones', self._build_transacciones)
+
+    def _build_transacciones(self):
+        rng = self._rng('transacciones')
+        n = self.num_transacciones
+        detalle = self.detalle_ventas()
+
+        # Los identificadores crecen con la fecha, como en la base real
+        dias = np.sort(rng.integers(0, self.dias, n))
+        sucursal = rng.choice(len(SUCURSALES), n, p=PESO_SUCURSALES)
+        subtotal = np.bincount(detalle['id_transaccion'].to_numpy(),
+                               weights=detalle['subtotal'].to_numpy(), minlength=n + 1)[1:].round(2)
+        iva = (subtotal * IVA).round(2)
+        inicio = pd.Timestamp(self.fecha_inicio)
+        return pd.DataFrame({
+            'id_transaccion': np.arange(1, n + 1),
+            'numero_factura': [f'{s + 1:03d}-001-{i:09d}' for i, s in zip(range(1, n + 1), sucursal)],
+            'id_cliente': rng.choice(self.num_clientes, n, p=_popularidad(self.num_clientes, 0.7)) + 1,
+            'fecha_venta': inicio + pd.to_timedelta(dias, unit='D'),
+            'subtotal': subtotal,
+            'iva': iva,
+            'total': (subtotal + iva).round(2),
+            'metodo_pago': np.array(METODOS_PAGO, dtype=object)[
+                rng.choice(len(METODOS_PAGO), n, p=PESO_METODOS_PAGO)],
+            'vendedor': np.array(VENDEDORES, dtype=object)[rng.integers(0, len(VENDEDORES), n)],
+            'sucursal': np.array(SUCURSALES, dtype=object)[sucursal]
+        })
+
+    def logs_ventas(self, proyectado=False):
+        """
+        Documentos de la colección logs_ventas, generados al iterar
+
+        Args:
+            proyectado (bool): Entregar los documentos como los devuelve la
+                consulta con LOGS_PROJECTION (sin _id, productos ni metadatos,
+                con num_productos)
+
+        Yields:
+            dict: Documento de log
+        """
+        rng = self._rng('logs_ventas')
+        tx = self.transacciones()
+        detalle = self.detalle_ventas()
+        codigos = self.productos()['codigo_producto'].to_numpy()
+        limites = np.concatenate([[0], np.cumsum(self._lineas_por_transaccion)])
+        id_producto = detalle['id_producto'].to_numpy()
+        cantidades = detalle['cantidad'].to_numpy()
+
+        segundos = rng.integers(8 * 3600, 19 * 3600, len(tx))
+        extra = {evento: rng.random(len(tx)) < proporcion
+                 for evento, proporcion in EVENTOS_ADICIONALES.items()}
+        fechas = tx['fecha_venta'].dt.to_pydatetime()
+        columnas = zip(tx['numero_factura'], tx['id_cliente'], tx['vendedor'], tx['total'], tx['sucursal'])
+
+        for i, (factura, cliente, vendedor, total, sucursal) in enumerate(columnas):
+            eventos = ['venta_completada'] + [e for e in EVENTOS_ADICIONALES if extra[e][i]]
+            for evento in eventos:
+                documento = {
+                    'timestamp': fechas[i] + timedelta(seconds=int(segundos[i])),
+                    'evento': evento,
+                    'numero_factura': factura,
+                    'cliente_id': int(cliente),
+                    'vendedor': vendedor,
+                    'total': float(total)
+                }
+                if proyectado:
+                    documento['num_productos'] = int(limites[i + 1] - limites[i])
+                else:
+                    documento['productos'] = [
+                        {'codigo': codigos[p - 1], 'cantidad': int(q)}
+                        for p, q in zip(id_producto[limites[i]:limites[i + 1]],
+                                        cantidades[limites[i]:limites[i + 1]])
+                    ]
+                    documento['metadatos'] = {
+                        'ip_cliente': f'192.168.1.{10 + i % 200}',
+                        'sucursal': sucursal,
+                        'terminal': f'POS-{1 + i % 5:03d}'
+                    }
+                yield documento
+
+    # ========== DATASETS CON LA FORMA DE LA EXTRACCIÓN ==========
+
+    def sales_frame(self, decimales=False):
+        """
+        Ventas con la forma de SALES_QUERY_TEMPLATE (una fila por línea)
+
+        Args:
+            decimales (bool): Entregar las columnas DECIMAL como objetos
+                Decimal y fecha_venta como date, igual que psycopg2 (más lento
+                y con más memoria)
+
+        Returns:
+            pd.DataFrame: Ventas sin procesar
+        """
+        detalle = self.detalle_ventas()
+        tx = self.transacciones()
+        clientes = self.clientes()
+        productos = self.productos()
+
+        # Los identificadores son consecutivos desde 1: la fila es id - 1
+        fila_tx = detalle['id_transaccion'].to_numpy() - 1
+        fila_producto = detalle['id_producto'].to_numpy() - 1
+        fila_cliente = tx['id_cliente'].to_numpy()[fila_tx] - 1
+
+        def _tomar(tabla, columna, filas):
+            return tabla[columna].to_numpy()[filas]
+
+        df = pd.DataFrame({
+            'id_transaccion': detalle['id_transaccion'].to_numpy(),
+            'numero_factura': _tomar(tx, 'numero_factura', fila_tx),
+            'fecha_venta': _tomar(tx, 'fecha_venta', fila_tx),
+            'nombre_cliente': _tomar(clientes, 'nombre_cliente', fila_cliente),
+            'ciudad': _tomar(clientes, 'ciudad', fila_cliente),
+            'provincia': _tomar(clientes, 'provincia', fila_cliente),
+            'codigo_producto': _tomar(productos, 'codigo_producto', fila_producto),
+            'nombre_producto': _tomar(productos, 'nombre_producto', fila_producto),
+            'categoria': _tomar(productos, 'categoria', fila_producto),
+            'material': _tomar(productos, 'material', fila_producto),
+            'cantidad': detalle['cantidad'].to_numpy(),
+            'precio_unitario': detalle['precio_unitario'].to_numpy(),
+            'descuento': detalle['descuento'].to_numpy(),
+            'subtotal': detalle['subtotal'].to_numpy(),
+            'total_factura': _tomar(tx, 'total', fila_tx),
+            'metodo_pago': _tomar(tx, 'metodo_pago', fila_tx),
+            'vendedor': _tomar(tx, 'vendedor', fila_tx),
+            'sucursal': _tomar(tx, 'sucursal', fila_tx)
+        })
+
+        if decimales:
+            # Un objeto por valor distinto, compartido entre filas
+            for col in ['precio_unitario', 'descuento', 'subtotal', 'total_factura']:
+                valores, inverso = np.unique(df[col].to_numpy(), return_inverse=True)
+                objetos = np.array([Decimal(f'{v:.2f}') for v in valores], dtype=object)
+                df[col] = objetos[inverso]
+            valores, inverso = np.unique(df['fecha_venta'].to_numpy(), return_inverse=True)
+            objetos = np.array([pd.Timestamp(v).date() for v in valores], dtype=object)
+            df['fecha_venta'] = objetos[inverso]
+        return df
+
+    def inventory_frame(self):
+        """Inventario activo con la forma de INVENTORY_QUERY"""
+        productos = self.productos()
+        df = productos[productos['activo']].drop(columns='fecha_actualizacion')
+        df.insert(9, 'nivel_stock', np.select(
+            [df['stock_actual'] <= df['stock_minimo'], df['stock_actual'] <= df['stock_minimo'] * 2],
+            ['BAJO', 'MEDIO'], default='ALTO'
+        ))
+        return df.sort_values(['categoria', 'codigo_producto']).reset_index(drop=True)
+
+    def logs_frame(self, batch_size=5000):
+        """Logs con la forma de la extracción proyectada de MongoDB"""
+        return logs_cursor_to_frame(self.logs_ventas(proyectado=True), batch_size)
+
+    # ========== EXPORTACIÓN ==========
+
+    def export(self, directorio):
+        """
+        Escribir las tablas en CSV (para COPY) y los logs en JSON Lines
+
+        Returns:
+            dict: Tabla -> ruta del archivo
+        """
+        os.makedirs(directorio, exist_ok=True)
+        rutas = {}
+        for tabla in ['productos', 'clientes', 'transacciones', 'detalle_ventas']:
+            rutas[tabla] = os.path.join(directorio, f'{tabla}.csv')
+            getattr(self, tabla)().to_csv(rutas[tabla], index=False)
+
+        rutas['logs_ventas'] = os.path.join(directorio, 'logs_ventas.jsonl')
+        with open(rutas['logs_ventas'], 'w', encoding='utf-8') as archivo:
+            for documento in self.logs_ventas():
+                documento['timestamp'] = {'$date': documento['timestamp'].isoformat() + 'Z'}
+                archivo.write(json.dumps(documento, ensure_ascii=False) + '\n')
+        return rutas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lineas', type=int, default=100000, help='Líneas de detalle de ventas')
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--desde', default='2024-01-01')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', required=True, help='Directorio de salida')
+    args = parser.parse_args()
+
+    generador = SyntheticDataGenerator(args.lineas, args.desde, args.dias, args.semilla)
+    for tabla, ruta in generador.export(args.salida).items():
+        print(f"{tabla:<16} {ruta}")
+    print(f"\n{generador.num_productos} productos, {generador.num_clientes} clientes, "
+          f"{generador.num_transacciones} transacciones, {generador.lineas} líneas")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Backend en memoria para los benchmarks
+Metaltronic S.A. - Pipeline ETL
+
+Reemplaza a config.database.db_config en DataExtractor y DataLoader para
+medir su trabajo en Python sin bases de datos:
+
+- PostgreSQL: un engine cuyas conexiones ignoran las sentencias SQL y cuyo
+  COPY FROM STDIN consume el buffer CSV, de modo que se mide la preparación
+  y serialización de los datos pero no el servidor.
+- MongoDB: colecciones que codifican a BSON los documentos insertados (como
+  hace pymongo antes de enviarlos) y que leen logs_ventas del generador.
+"""
+
+from contextlib import contextmanager
+import bson
+from pymongo.results import BulkWriteResult
+
+
+class _SinkResult:
+    """Resultado vacío de una sentencia ignorada"""
+
+    rowcount = 0
+
+    def scalar(self):
+        return None
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+
+class _SinkCursor:
+    """Cursor DBAPI que consume los datos de COPY"""
+
+    def __init__(self, engine):
+        self._engine = engine
+
+    def copy_expert(self, sql, buffer):
+        self._engine.bytes_copiados += len(buffer.read().encode('utf-8'))
+
+    def close(self):
+        pass
+
+
+class _SinkDBAPIConnection:
+    def __init__(self, engine):
+        self._engine = engine
+
+    def cursor(self):
+        return _SinkCursor(self._engine)
+
+
+class _SinkConnection:
+    """Conexión SQLAlchemy que ignora las sentencias"""
+
+    def __init__(self, engine):
+        self.connection = _SinkDBAPIConnection(engine)
+        self._engine = engine
+
+    def execute(self, *args, **kwargs):
+        self._engine.sentencias += 1
+        return _SinkResult()
+
+
+class MemoryEngine:
+    """Engine en memoria con la interfaz usada por DataLoader"""
+
+    def __init__(self):
+        self.bytes_copiados = 0
+        self.sentencias = 0
+
+    @contextmanager
+    def begin(self):
+        yield _SinkConnection(self)
+
+    @contextmanager
+    def connect(self):
+        yield _SinkConnection(self)
+
+
+class MemoryCollection:
+    """Colección MongoDB en memoria"""
+
+    def __init__(self, fuente=None):
+        self._fuente = fuente
+        self.documentos_insertados = 0
+        self.bytes_insertados = 0
+
+    def _encode(self, documento):
+        self.bytes_insertados += len(bson.encode(documento))
+        self.documentos_insertados += 1
+
+    def find(self, filtro=None, proyeccion=None, batch_size=None, **kwargs):
+        """
+        Iterar los documentos de la fuente aplicando el filtro de timestamp
+
+        Con proyección se entregan los documentos ya proyectados por el
+        generador, como los devolvería el servidor.
+        """
+        if self._fuente is None:
+            return iter([])
+        rango = (filtro or {}).get('timestamp', {})
+        desde, hasta = rango.get('$gte'), rango.get('$lt')
+        return (
+            documento for documento in self._fuente(proyeccion is not None)
+            if (desde is None or documento['timestamp'] >= desde)
+            and (hasta is None or documento['timestamp'] < hasta)
+        )
+
+    def insert_one(self, documento):
+        self._encode(documento)
+
+    def insert_many(self, documentos, **kwargs):
+        for documento in documentos:
+            self._encode(documento)
+
+    def delete_many(self, filtro):
+        return _SinkResult()
+
+    def bulk_write(self, operaciones, **kwargs):
+        """Codificar los documentos de las operaciones de reemplazo"""
+        reemplazos = 0
+        for operacion in operaciones:
+            documento = getattr(operacion, '_doc', None)
+            if documento is not None:
+                self._encode(documento)
+                reemplazos += 1
+        return BulkWriteResult({'nInserted': 0, 'nUpserted': reemplazos, 'nMatched': 0,
+                                'nModified': 0, 'nRemoved': 0, 'upserted': []}, True)
+
+    def create_index(self, *args, **kwargs):
+        return None
+
+
+class MemoryDatabase:
+    """Base de datos MongoDB en memoria (colecciones creadas al usarlas)"""
+
+    def __init__(self, fuentes=None):
+        self._colecciones = {nombre: MemoryCollection(fuente) for nombre, fuente in (fuentes or {}).items()}
+
+    def __getitem__(self, nombre):
+        if nombre not in self._colecciones:
+            self._colecciones[nombre] = MemoryCollection()
+        return self._colecciones[nombre]
+
+
+class MemoryBackend:
+    """Reemplazo de db_config con PostgreSQL y MongoDB en memoria"""
+
+    def __init__(self, generador=None):
+        fuentes = {}
+        if generador is not None:
+            fuentes['logs_ventas'] = lambda proyectado: generador.logs_ventas(proyectado=proyectado)
+        self.engine = MemoryEngine()
+        self.mongo = MemoryDatabase(fuentes)
+
+    def get_postgres_engine(self):
+        return self.engine
+
+    def get_mongo_database(self):
+        return self.mongo
+
+    def get_connection_stats(self):
+        return {}
+
+    def reset_connection_stats(self):
+        pass
@@ -0,0 +1,118 @@
+"""
+Paridad del modo pushdown de logs
+Metaltronic S.A. - Pipeline ETL
+
+Compara el resumen de logs calculado en pandas (extract_logs_data +
+process_logs_data + summarize_logs) con el calculado por el pipeline de
+agregación de MongoDB (logs_summary_pipeline), para un rango de fechas. El
+pipeline se ejecuta sin la etapa $merge, por lo que no escribe en
+resumen_logs_diario.
+
+Por defecto usa la base MongoDB configurada en las variables de entorno.
+Con --local los logs se generan con benchmarks.generator en una base
+MongoDB en memoria (requiere el paquete mongomock).
+
+Uso:
+    python -m benchmarks.parity_logs_pushdown --desde 2024-01-01 --hasta 2024-12-31
+    python -m benchmarks.parity_logs_pushdown --local 100000
+"""
+
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from benchmarks.generator import SyntheticDataGenerator
+from src.extract import DataExtractor
+from src.load import logs_summary_pipeline, summarize_logs
+from src.transform import DataTransformer
+
+
+class LocalMongo:
+    """Reemplazo de db_config con una base mongomock cargada con logs sintéticos"""
+
+    def __init__(self, lineas):
+        import mongomock
+        self.db = mongomock.MongoClient()['metaltronic_mongo']
+        generador = SyntheticDataGenerator(lineas)
+        self.db['logs_ventas'].insert_many(generador.logs_ventas())
+        self.db['logs_ventas'].create_index('timestamp')
+        inicio = generador.fecha_inicio
+        self.rango = (inicio.isoformat(), inicio.replace(year=inicio.year + 10).isoformat())
+
+    def get_mongo_database(self):
+        return self.db
+
+
+def normalizar(documentos):
+    """Documentos ordenados por (fecha, evento), con los vendedores como conjunto"""
+    return sorted(
+        [{**documento, 'vendedores': sorted(documento['vendedores'])} for documento in documentos],
+        key=lambda documento: (documento['fecha'], documento['evento'])
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--desde')
+    parser.add_argument('--hasta')
+    parser.add_argument('--local', type=int, metavar='LINEAS',
+                        help='Generar logs para estas líneas de detalle en una base en memoria')
+    args = parser.parse_args()
+
+    extractor = DataExtractor()
+    if args.local:
+        extractor.db_config = LocalMongo(args.local)
+        desde, hasta = extractor.db_config.rango
+    elif args.desde and args.hasta:
+        desde, hasta = args.desde, args.hasta
+    else:
+        parser.error('Indique --desde y --hasta, o --local')
+    db = extractor.db_config.get_mongo_database()
+    fecha_procesamiento = datetime(2000, 1, 1)
+
+    # Ruta pandas: logs completos
+    inicio = time.perf_counter()
+    # mongomock no soporta $size en proyecciones: en local se leen documentos completos
+    logs = extractor.extract_logs_data(desde, hasta, projected=False if args.local else None)
+    documentos_pandas = []
+    if not logs.empty:
+        logs_processed = DataTransformer().process_logs_data(logs)
+        documentos_pandas = summarize_logs(logs_processed, fecha_procesamiento)
+    t_pandas = time.perf_counter() - inicio
+
+    # Ruta pushdown: resumen calculado en MongoDB
+    inicio = time.perf_counter()
+    pipeline = logs_summary_pipeline(
+        datetime.strptime(desde, '%Y-%m-%d'),
+        datetime.strptime(hasta, '%Y-%m-%d') + timedelta(days=1),
+        fecha_procesamiento
+    )
+    documentos_mongo = list(db['logs_ventas'].aggregate(pipeline, allowDiskUse=True))
+    t_mongo = time.perf_counter() - inicio
+
+    print(f"\nLogs {desde} a {hasta}: {len(logs)} eventos")
+    print(f"{'ruta':<12} {'segundos':>10} {'documentos transferidos':>25}")
+    print(f"{'pandas':<12} {t_pandas:>10.3f} {len(logs):>25}")
+    print(f"{'pushdown':<12} {t_mongo:>10.3f} {len(documentos_mongo):>25}")
+
+    esperado = normalizar(documentos_pandas)
+    obtenido = normalizar(documentos_mongo)
+    assert len(esperado) == len(obtenido), \
+        f"Documentos distintos: pandas {len(esperado)}, MongoDB {len(obtenido)}"
+
+    for doc_pandas, doc_mongo in zip(esperado, obtenido):
+        clave = (doc_pandas['fecha'], doc_pandas['evento'])
+        # Las sumas se acumulan en distinto orden
+        assert math.isclose(doc_pandas.pop('total_monto'), doc_mongo.pop('total_monto'),
+                            rel_tol=1e-9, abs_tol=1e-6), f"total_monto distinto en {clave}"
+        assert list(doc_pandas['distribucion_periodo'].items()) == list(doc_mongo['distribucion_periodo'].items()), \
+            f"distribucion_periodo distinta en {clave}"
+        assert {**doc_pandas, 'fecha': pd.Timestamp(doc_pandas['fecha'])} == \
+            {**doc_mongo, 'fecha': pd.Timestamp(doc_mongo['fecha'])}, f"Documento distinto en {clave}"
+
+    print(f"Paridad verificada: {len(esperado)} documentos (fecha, evento)")
+
+
+if __name__ == '__main__':
+    main()
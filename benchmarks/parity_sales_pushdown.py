@@ -0,0 +1,66 @@
+"""
+Paridad del modo pushdown de ventas
+Metaltronic S.A. - Pipeline ETL
+
+Compara el resumen diario y el análisis de inventario calculados en pandas
+(detalle completo extraído) con los calculados en PostgreSQL (sólo filas
+agregadas), para un rango de fechas. Requiere la base PostgreSQL configurada
+en las variables de entorno.
+
+Uso:
+    python -m benchmarks.parity_sales_pushdown --desde 2024-01-01 --hasta 2024-12-31
+"""
+
+import argparse
+import time
+import pandas as pd
+from src.extract import DataExtractor
+from src.transform import DataTransformer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--desde', required=True)
+    parser.add_argument('--hasta', required=True)
+    args = parser.parse_args()
+
+    extractor = DataExtractor()
+    transformer = DataTransformer()
+    inventario = extractor.extract_inventory_data(incremental=False)
+
+    # Ruta pandas: detalle completo
+    inicio = time.perf_counter()
+    ventas = extractor.extract_sales_data(args.desde, args.hasta)
+    ventas_clean = transformer.clean_sales_data(ventas)
+    resumen_pandas = transformer.aggregate_daily_sales(ventas_clean)
+    analisis_pandas = transformer.analyze_inventory_trends(inventario, ventas_clean)
+    t_pandas = time.perf_counter() - inicio
+
+    # Ruta pushdown: agregados calculados en PostgreSQL
+    inicio = time.perf_counter()
+    resumen_sql = extractor.extract_daily_summary(args.desde, args.hasta)
+    ventas_producto = extractor.extract_product_sales(args.desde, args.hasta)
+    analisis_sql = transformer.analyze_inventory_trends(inventario, ventas_producto=ventas_producto)
+    t_sql = time.perf_counter() - inicio
+
+    print(f"\nVentas {args.desde} a {args.hasta}: {len(ventas)} líneas de detalle")
+    print(f"{'ruta':<12} {'segundos':>10} {'filas transferidas':>20}")
+    print(f"{'pandas':<12} {t_pandas:>10.3f} {len(ventas):>20}")
+    print(f"{'pushdown':<12} {t_sql:>10.3f} {len(resumen_sql) + len(ventas_producto):>20}")
+
+    if resumen_pandas.empty:
+        assert resumen_sql.empty, "El resumen en PostgreSQL no está vacío"
+        print("Sin ventas en el rango")
+        return
+
+    # Las sumas en PostgreSQL son decimales exactos; en pandas, flotantes
+    pd.testing.assert_frame_equal(
+        resumen_pandas.drop(columns='fecha_procesamiento'), resumen_sql,
+        check_dtype=False, rtol=1e-9
+    )
+    pd.testing.assert_frame_equal(analisis_pandas, analisis_sql, check_dtype=False, rtol=1e-9)
+    print(f"Paridad verificada: {len(resumen_sql)} días, {len(analisis_sql)} productos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Configuración del pipeline ETL
+Metaltronic S.A. - Pipeline de Datos
+"""
+
+import os
+
+
+def env_bool(name, default):
+    """Leer una variable de entorno booleana"""
+    return os.getenv(name, default).strip().lower() in ('1', 'true', 'yes', 'si')
@@ -4,17 +4,69 @@ Metaltronic S.A. - Pipeline de Datos
 """
 
 import os
-from sqlalchemy import create_engine
+import atexit
+import threading
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 import pymongo
+from pymongo import monitoring
 from dotenv import load_dotenv
+from config import env_bool
 
 # Cargar variables de entorno
 load_dotenv()
 
+
+class _MongoPoolCounter(monitoring.ConnectionPoolListener):
+    """Listener de pymongo que registra conexiones abiertas vs reutilizadas"""
+
+    def __init__(self, config):
+        self._config = config
+        self._nuevas = set()
+
+    def connection_created(self, event):
+        self._nuevas.add((event.address, event.connection_id))
+
+    def connection_checked_out(self, event):
+        clave = (event.address, event.connection_id)
+        if clave in self._nuevas:
+            self._nuevas.discard(clave)
+            self._config._incrementar('mongo_conexiones_abiertas')
+        else:
+            self._config._incrementar('mongo_conexiones_reutilizadas')
+
+    def connection_closed(self, event):
+        self._nuevas.discard((event.address, event.connection_id))
+
+    # Eventos no utilizados, requeridos por la interfaz del listener
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
 class DatabaseConfig:
     """Clase para manejar configuraciones de base de datos"""
-    
+
     def __init__(self):
         # Configuración PostgreSQL
         self.postgres_config = {
@@ -24,7 +76,16 @@ class DatabaseConfig:
             'password': os.getenv('POSTGRES_PASSWORD', 'metaltronic_pass'),
             'database': os.getenv('POSTGRES_DB', 'metaltronic_db')
         }
-        
+
+        # Configuración del pool de conexiones PostgreSQL
+        self.postgres_pool_config = {
+            'pool_size': int(os.getenv('POSTGRES_POOL_SIZE', '5')),
+            'max_overflow': int(os.getenv('POSTGRES_MAX_OVERFLOW', '5')),
+            'pool_timeout': int(os.getenv('POSTGRES_POOL_TIMEOUT', '30')),
+            'pool_recycle': int(os.getenv('POSTGRES_POOL_RECYCLE', '1800')),
+            'pool_pre_ping': env_bool('POSTGRES_POOL_PRE_PING', 'true')
+        }
+
         # Configuración MongoDB
         self.mongo_config = {
             'host': os.getenv('MONGO_HOST', 'mongodb'),
@@ -33,38 +94,182 @@ class DatabaseConfig:
             'password': os.getenv('MONGO_PASSWORD', 'mongo_pass'),
             'database': os.getenv('MONGO_DB', 'metaltronic_mongo')
         }
-    
-    def get_postgres_engine(self):
-        """Crear conexión SQLAlchemy para PostgreSQL"""
-        connection_string = (
+
+        # Configuración del pool de conexiones MongoDB
+        self.mongo_pool_config = {
+            'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', '20')),
+            'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', '0')),
+            'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+        }
+
+        # Registro de engines y clientes compartidos por el proceso
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._engine = None
+        self._session_factory = None
+        self._mongo_client = None
+        self.reset_connection_stats()
+
+    def _check_fork(self):
+        """
+        Descartar engines y clientes heredados de un proceso padre.
+
+        Las conexiones abiertas antes de un fork no pueden compartirse entre
+        procesos; el hijo crea sus propios pools sin cerrar los del padre.
+        """
+        if os.getpid() == self._pid:
+            return
+
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        if self._engine is not None:
+            self._engine.dispose(close=False)
+        self._engine = None
+        self._session_factory = None
+        self._mongo_client = None
+        self._pid = os.getpid()
+        self.reset_connection_stats()
+
+    def _incrementar(self, contador, cantidad=1):
+        """Incrementar un contador de conexiones"""
+        with self._stats_lock:
+            self._stats[contador] += cantidad
+
+    def _registrar_eventos_pool(self, engine):
+        """Registrar listeners del pool para contar conexiones"""
+
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            connection_record.info['_nueva'] = True
+
+        @event.listens_for(engine, 'checkout')
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            if connection_record.info.pop('_nueva', False):
+                self._incrementar('postgres_conexiones_abiertas')
+            else:
+                self._incrementar('postgres_conexiones_reutilizadas')
+
+    def get_postgres_url(self):
+        """Construir URL de conexión para PostgreSQL"""
+        return (
             f"postgresql://{self.postgres_config['user']}:"
             f"{self.postgres_config['password']}@"
             f"{self.postgres_config['host']}:"
             f"{self.postgres_config['port']}/"
             f"{self.postgres_config['database']}"
         )
-        return create_engine(connection_string)
-    
+
+    def get_postgres_jdbc_url(self):
+        """Construir URL JDBC de PostgreSQL (lecturas con Spark)"""
+        return (
+            f"jdbc:postgresql://{self.postgres_config['host']}:"
+            f"{self.postgres_config['port']}/"
+            f"{self.postgres_config['database']}"
+        )
+
+    def get_postgres_engine(self):
+        """Obtener engine SQLAlchemy compartido (con pool) para PostgreSQL"""
+        self._check_fork()
+        with self._lock:
+            if self._engine is None:
+                self._engine = create_engine(
+                    self.get_postgres_url(),
+                    **self.postgres_pool_config
+                )
+                self._registrar_eventos_pool(self._engine)
+                self._incrementar('postgres_engines_creados')
+            else:
+                self._incrementar('postgres_engines_reutilizados')
+            return self._engine
+
     def get_postgres_session(self):
         """Crear sesión de PostgreSQL"""
         engine = self.get_postgres_engine()
-        Session = sessionmaker(bind=engine)
+        with self._lock:
+            if self._session_factory is None:
+                self._session_factory = sessionmaker(bind=engine)
+            Session = self._session_factory
         return Session()
-    
-    def get_mongo_client(self):
-        """Crear cliente MongoDB"""
-        connection_string = (
+
+    def get_mongo_url(self):
+        """Construir URL de conexión para MongoDB"""
+        return (
             f"mongodb://{self.mongo_config['user']}:"
             f"{self.mongo_config['password']}@"
             f"{self.mongo_config['host']}:"
             f"{self.mongo_config['port']}/"
         )
-        return pymongo.MongoClient(connection_string)
-    
+
+    def get_mongo_client(self):
+        """Obtener cliente MongoDB compartido (con pool)"""
+        self._check_fork()
+        with self._lock:
+            if self._mongo_client is None:
+                self._mongo_client = pymongo.MongoClient(
+                    self.get_mongo_url(),
+                    event_listeners=[_MongoPoolCounter(self)],
+                    **self.mongo_pool_config
+                )
+                self._incrementar('mongo_clientes_creados')
+            else:
+                self._incrementar('mongo_clientes_reutilizados')
+            return self._mongo_client
+
     def get_mongo_database(self):
         """Obtener base de datos MongoDB"""
         client = self.get_mongo_client()
         return client[self.mongo_config['database']]
 
+    def get_connection_stats(self):
+        """
+        Obtener contadores de conexiones del proceso actual
+
+        Returns:
+            dict: Engines/clientes y conexiones abiertas vs reutilizadas
+        """
+        self._check_fork()
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def reset_connection_stats(self):
+        """Reiniciar contadores de conexiones (por ejemplo al iniciar una tarea)"""
+        with self._stats_lock:
+            self._stats = {
+                'postgres_engines_creados': 0,
+                'postgres_engines_reutilizados': 0,
+                'postgres_conexiones_abiertas': 0,
+                'postgres_conexiones_reutilizadas': 0,
+                'mongo_clientes_creados': 0,
+                'mongo_clientes_reutilizados': 0,
+                'mongo_conexiones_abiertas': 0,
+                'mongo_conexiones_reutilizadas': 0
+            }
+
+    def dispose_postgres(self):
+        """Cerrar el pool de PostgreSQL del proceso actual"""
+        self._check_fork()
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+
+    def dispose_mongo(self):
+        """Cerrar el cliente MongoDB del proceso actual"""
+        self._check_fork()
+        with self._lock:
+            if self._mongo_client is not None:
+                self._mongo_client.close()
+            self._mongo_client = None
+
+    def dispose(self):
+        """Cerrar todos los pools de conexiones del proceso actual"""
+        self.dispose_postgres()
+        self.dispose_mongo()
+
 # Instancia global de configuración
 db_config = DatabaseConfig()
+
+# Cerrar pools al finalizar el proceso
+atexit.register(db_config.dispose)
@@ -0,0 +1,95 @@
+"""
+Configuración de parámetros de ejecución del pipeline
+Metaltronic S.A. - Pipeline de Datos
+"""
+
+import os
+from dotenv import load_dotenv
+from config import env_bool
+
+# Cargar variables de entorno
+load_dotenv()
+
+class PipelineConfig:
+    """Clase para manejar parámetros de ejecución del pipeline ETL"""
+
+    def __init__(self):
+        # Configuración de extracción
+        self.extract_config = {
+            'streaming': env_bool('EXTRACT_STREAMING', 'true'),
+            'chunk_size': int(os.getenv('EXTRACT_CHUNK_SIZE', '50000')),
+            'concurrent': env_bool('EXTRACT_CONCURRENT', 'true'),
+            'source_timeout': float(os.getenv('EXTRACT_SOURCE_TIMEOUT', '1800')),
+            'tolerate_errors': env_bool('EXTRACT_TOLERATE_ERRORS', 'false'),
+            'incremental': env_bool('EXTRACT_INCREMENTAL', 'false'),
+            'incremental_lookback_minutes': float(os.getenv('EXTRACT_INCREMENTAL_LOOKBACK_MINUTES', '10')),
+            'facts_only': env_bool('EXTRACT_FACTS_ONLY', 'false'),
+            'logs_projected': env_bool('EXTRACT_LOGS_PROJECTED', 'true'),
+            'mongo_batch_size': int(os.getenv('EXTRACT_MONGO_BATCH_SIZE', '5000')),
+            'inventory_cache': os.getenv('EXTRACT_INVENTORY_CACHE', 'stats').lower()
+        }
+
+        # Configuración de transformación
+        self.transform_config = {
+            'backend': os.getenv('TRANSFORM_BACKEND', 'pandas').lower(),
+            'pushdown': env_bool('TRANSFORM_PUSHDOWN', 'false'),
+            'logs_pushdown': env_bool('TRANSFORM_LOGS_PUSHDOWN', 'false'),
+            'compact': env_bool('TRANSFORM_COMPACT', 'false'),
+            'streaming': env_bool('TRANSFORM_STREAMING', 'false'),
+            'chunk_size': int(os.getenv('TRANSFORM_CHUNK_SIZE', '100000')),
+            'cache': env_bool('TRANSFORM_CACHE', 'true'),
+            'cache_dir': os.getenv('TRANSFORM_CACHE_DIR', '/opt/airflow/data/cache/transform'),
+            'cache_max_mb': float(os.getenv('TRANSFORM_CACHE_MAX_MB', '1024'))
+        }
+
+        # Configuración de carga
+        self.load_config = {
+            'method': os.getenv('LOAD_METHOD', 'copy').lower(),
+            'mode': os.getenv('LOAD_MODE', 'merge').lower(),
+            'copy_batch_size': int(os.getenv('LOAD_COPY_BATCH_SIZE', '100000')),
+            'quality_mode': os.getenv('QUALITY_REPORT_MODE', 'auto').lower(),
+            'quality_exact_max_rows': int(os.getenv('QUALITY_EXACT_MAX_ROWS', '200000')),
+            'quality_sample_size': int(os.getenv('QUALITY_SAMPLE_SIZE', '10000')),
+            'quality_hll_precision': int(os.getenv('QUALITY_HLL_PRECISION', '14'))
+        }
+
+        # Configuración del backfill por particiones de fechas
+        self.backfill_config = {
+            'workers': int(os.getenv('BACKFILL_WORKERS', '4')),
+            'db_connections': int(os.getenv('BACKFILL_DB_CONNECTIONS', '5')),
+            'partition_days': int(os.getenv('BACKFILL_PARTITION_DAYS', '7'))
+        }
+
+        # Configuración del motor Spark para backfills grandes
+        self.spark_config = {
+            'master': os.getenv('SPARK_MASTER', 'local[*]'),
+            'jdbc_partitions': int(os.getenv('SPARK_JDBC_PARTITIONS', '8')),
+            'partition_column': os.getenv('SPARK_PARTITION_COLUMN', 'fecha_venta').lower(),
+            'fetch_size': int(os.getenv('SPARK_JDBC_FETCH_SIZE', '10000')),
+            'shuffle_partitions': int(os.getenv('SPARK_SHUFFLE_PARTITIONS', '32')),
+            'driver_memory': os.getenv('SPARK_DRIVER_MEMORY', '2g'),
+            'jars': os.getenv('SPARK_JARS', '/opt/spark/jars/postgresql-42.6.0.jar')
+        }
+
+        # Configuración del staging entre tareas
+        self.staging_config = {
+            'base_dir': os.getenv('STAGING_DIR', '/opt/airflow/data'),
+            'format': os.getenv('STAGING_FORMAT', 'parquet').lower(),
+            'compression': os.getenv('STAGING_COMPRESSION', 'snappy')
+        }
+
+        # Configuración del modo fusionado (extracción, transformación y
+        # carga en una sola tarea)
+        self.fused_config = {
+            'audit': env_bool('FUSED_AUDIT', 'true')
+        }
+
+        # Configuración de métricas de rendimiento por etapa
+        self.metrics_config = {
+            'enabled': env_bool('METRICS_ENABLED', 'true'),
+            'collection': os.getenv('METRICS_COLLECTION', 'metricas_pipeline'),
+            'textfile_dir': os.getenv('METRICS_TEXTFILE_DIR', '/opt/airflow/data/metrics')
+        }
+
+# Instancia global de configuración
+pipeline_config = PipelineConfig()
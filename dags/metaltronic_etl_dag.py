@@ -5,7 +5,8 @@ Procesa datos de ventas, inventario y logs diariamente
 
 from datetime import datetime, timedelta
 from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.models.param import Param
+from airflow.operators.python import BranchPythonOperator, PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.operators.dummy import DummyOperator
 import sys
@@ -18,6 +19,7 @@ sys.path.append('/opt/airflow')
 from src.extract import extract_data_task
 from src.transform import transform_data_task
 from src.load import load_data_task
+from src.fused import etl_fused_task
 
 # Configuración por defecto del DAG
 default_args = {
@@ -38,7 +40,12 @@ dag = DAG(
     description='Pipeline ETL para procesar datos de ventas e inventario de Metaltronic S.A.',
     schedule_interval='0 6 * * *',  # Ejecutar todos los días a las 6:00 AM
     max_active_runs=1,
-    tags=['metaltronic', 'etl', 'ventas', 'inventario']
+    tags=['metaltronic', 'etl', 'ventas', 'inventario'],
+    params={
+        # 'tareas': extract/transform/load separadas; 'fusionado': una sola
+        # tarea en memoria con copias de staging asíncronas
+        'modo': Param('tareas', type='string', enum=['tareas', 'fusionado'])
+    }
 )
 
 # ========== TAREAS DEL PIPELINE ==========
@@ -66,6 +73,15 @@ create_directories = BashOperator(
     dag=dag
 )
 
+# Selección del modo de ejecución (parámetro `modo` de la ejecución)
+choose_mode = BranchPythonOperator(
+    task_id='choose_execution_mode',
+    python_callable=lambda **context: (
+        'etl_fused' if context['params'].get('modo') == 'fusionado' else 'extract_data'
+    ),
+    dag=dag
+)
+
 # ===== FASE DE EXTRACCIÓN =====
 extract_data = PythonOperator(
     task_id='extract_data',
@@ -78,7 +94,7 @@ extract_data = PythonOperator(
     - **PostgreSQL**: Datos de ventas, clientes, productos e inventario
     - **MongoDB**: Logs de transacciones y sesiones de usuario
     
-    **Salida**: Archivos CSV en `/data/raw/`
+    **Salida**: Archivos Parquet (o CSV) en `/data/raw/`
     """
 )
 
@@ -96,8 +112,8 @@ transform_data = PythonOperator(
     - Agregación de resúmenes diarios
     - Análisis de rotación de inventario
     
-    **Entrada**: Archivos CSV de `/data/raw/`
-    **Salida**: Archivos CSV en `/data/processed/`
+    **Entrada**: Archivos Parquet (o CSV) de `/data/raw/`
+    **Salida**: Archivos Parquet (o CSV) en `/data/processed/`
     """
 )
 
@@ -113,14 +129,31 @@ load_data = PythonOperator(
     - **PostgreSQL**: Resumen diario de ventas y análisis de inventario
     - **MongoDB**: Resumen de logs y reportes de calidad
     
-    **Entrada**: Archivos CSV de `/data/processed/`
+    **Entrada**: Archivos Parquet (o CSV) de `/data/processed/`; el reporte de calidad usa los datasets completos
     """
 )
 
-# Validación de datos cargados
+# ===== MODO FUSIONADO =====
+etl_fused = PythonOperator(
+    task_id='etl_fused',
+    python_callable=etl_fused_task,
+    dag=dag,
+    doc_md="""
+    ### ETL Fusionado
+    
+    Extracción, transformación y carga en un solo proceso, pasando los
+    DataFrames en memoria (parámetro `modo` = `fusionado`).
+    
+    **Salida**: Copias de auditoría en `/data/raw/` y `/data/processed/`,
+    escritas en segundo plano (desactivables con FUSED_AUDIT=false)
+    """
+)
+
+# Validación de datos cargados (tras cualquiera de los dos modos)
 validate_data = PythonOperator(
     task_id='validate_loaded_data',
     python_callable=lambda **context: validate_data_quality(context['ds']),
+    trigger_rule='none_failed_min_one_success',
     dag=dag
 )
 
@@ -154,6 +187,7 @@ def validate_data_quality(fecha_ejecucion):
             }
         })
         logger.info(f"Registros en logs MongoDB: {mongo_count}")
+        logger.info(f"Conexiones de la validación: {db_config.get_connection_stats()}")
         
         return "Validación completada exitosamente"
         
@@ -166,8 +200,8 @@ cleanup_temp_files = BashOperator(
     task_id='cleanup_temp_files',
     bash_command="""
     echo "Limpiando archivos temporales..."
-    find /opt/airflow/data/raw -name "*.csv" -mtime +7 -delete
-    find /opt/airflow/data/processed -name "*.csv" -mtime +7 -delete
+    find /opt/airflow/data/raw \( -name "*.csv" -o -name "*.parquet" \) -mtime +7 -delete
+    find /opt/airflow/data/processed \( -name "*.csv" -o -name "*.parquet" \) -mtime +7 -delete
     echo "Limpieza completada"
     """,
     dag=dag
@@ -189,16 +223,13 @@ end_task = DummyOperator(
 # ========== DEFINIR DEPENDENCIAS ==========
 
 # Flujo principal del pipeline
-(
-    [check_connections, create_directories] 
-    >> extract_data 
-    >> transform_data 
-    >> load_data 
-    >> validate_data 
-    >> cleanup_temp_files 
-    >> success_notification 
-    >> end_task
-)
+[check_connections, create_directories] >> choose_mode
+
+# Modo por tareas separadas o fusionado, según el parámetro `modo`
+choose_mode >> extract_data >> transform_data >> load_data >> validate_data
+choose_mode >> etl_fused >> validate_data
+
+validate_data >> cleanup_temp_files >> success_notification >> end_task
 
 # ========== CONFIGURACIÓN ADICIONAL ==========
 
@@ -240,5 +271,5 @@ def send_failure_alert(context):
     return "Alerta enviada"
 
 # Aplicar función de alerta a tareas críticas
-for task in [extract_data, transform_data, load_data]:
+for task in [extract_data, transform_data, load_data, etl_fused]:
     task.on_failure_callback = send_failure_alert
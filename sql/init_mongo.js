@@ -93,5 +93,7 @@ db.logs_ventas.createIndex({"evento": 1});
 db.logs_ventas.createIndex({"numero_factura": 1});
 db.sesiones_usuario.createIndex({"usuario_id": 1});
 db.sesiones_usuario.createIndex({"fecha_inicio": 1});
+db.resumen_logs_diario.createIndex({"fecha": 1, "evento": 1}, {"unique": true});
+db.metricas_pipeline.createIndex({"ds": 1, "tarea": 1});
 
 print("Inicialización de MongoDB completada para Metaltronic S.A.");
@@ -18,9 +18,23 @@ CREATE TABLE inventario.productos (
     stock_actual INTEGER DEFAULT 0,
     stock_minimo INTEGER DEFAULT 10,
     fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     activo BOOLEAN DEFAULT TRUE
 );
 
+-- Registrar la fecha de última modificación (extracción incremental)
+CREATE OR REPLACE FUNCTION inventario.registrar_fecha_actualizacion()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.fecha_actualizacion = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_productos_fecha_actualizacion
+    BEFORE UPDATE ON inventario.productos
+    FOR EACH ROW EXECUTE FUNCTION inventario.registrar_fecha_actualizacion();
+
 -- Tabla de clientes
 CREATE TABLE ventas.clientes (
     id_cliente SERIAL PRIMARY KEY,
@@ -31,9 +45,14 @@ CREATE TABLE ventas.clientes (
     ciudad VARCHAR(50),
     provincia VARCHAR(50) DEFAULT 'Tungurahua',
     fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     activo BOOLEAN DEFAULT TRUE
 );
 
+CREATE TRIGGER trg_clientes_fecha_actualizacion
+    BEFORE UPDATE ON ventas.clientes
+    FOR EACH ROW EXECUTE FUNCTION inventario.registrar_fecha_actualizacion();
+
 -- Tabla de ventas (transacciones)
 CREATE TABLE ventas.transacciones (
     id_transaccion SERIAL PRIMARY KEY,
@@ -46,9 +65,14 @@ CREATE TABLE ventas.transacciones (
     metodo_pago VARCHAR(30) NOT NULL,
     vendedor VARCHAR(100) NOT NULL,
     sucursal VARCHAR(50) DEFAULT 'Ambato',
-    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TRIGGER trg_transacciones_fecha_actualizacion
+    BEFORE UPDATE ON ventas.transacciones
+    FOR EACH ROW EXECUTE FUNCTION inventario.registrar_fecha_actualizacion();
+
 -- Tabla de detalle de ventas
 CREATE TABLE ventas.detalle_ventas (
     id_detalle SERIAL PRIMARY KEY,
@@ -60,6 +84,27 @@ CREATE TABLE ventas.detalle_ventas (
     subtotal DECIMAL(12,2) NOT NULL
 );
 
+-- Los cambios en el detalle marcan su transacción como modificada, de modo
+-- que la extracción incremental reprocesa el día de venta afectado
+CREATE OR REPLACE FUNCTION ventas.marcar_transaccion_modificada()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE ventas.transacciones SET fecha_actualizacion = CURRENT_TIMESTAMP
+        WHERE id_transaccion = OLD.id_transaccion;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        UPDATE ventas.transacciones SET fecha_actualizacion = CURRENT_TIMESTAMP
+        WHERE id_transaccion = NEW.id_transaccion;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_detalle_ventas_marcar_transaccion
+    AFTER INSERT OR UPDATE OR DELETE ON ventas.detalle_ventas
+    FOR EACH ROW EXECUTE FUNCTION ventas.marcar_transaccion_modificada();
+
 -- Tabla de resumen para analytics (destino ETL)
 CREATE TABLE analytics.resumen_ventas_diario (
     fecha_resumen DATE PRIMARY KEY,
@@ -72,6 +117,14 @@ CREATE TABLE analytics.resumen_ventas_diario (
     fecha_procesamiento TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Marcas de agua para la extracción incremental (estado del ETL)
+CREATE TABLE analytics.etl_watermarks (
+    fuente VARCHAR(100) PRIMARY KEY,
+    valor_confirmado VARCHAR(50),
+    valor_pendiente VARCHAR(50),
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Insertar datos de ejemplo
 
 -- Productos metalmecánicos
@@ -146,7 +199,10 @@ INSERT INTO ventas.detalle_ventas (id_transaccion, id_producto, cantidad, precio
 -- Crear índices para optimizar consultas
 CREATE INDEX idx_productos_categoria ON inventario.productos(categoria);
 CREATE INDEX idx_productos_activo ON inventario.productos(activo);
+CREATE INDEX idx_productos_marca_cambio ON inventario.productos((COALESCE(fecha_actualizacion, fecha_creacion)));
+CREATE INDEX idx_clientes_marca_cambio ON ventas.clientes((COALESCE(fecha_actualizacion, fecha_registro)));
 CREATE INDEX idx_transacciones_fecha ON ventas.transacciones(fecha_venta);
 CREATE INDEX idx_transacciones_cliente ON ventas.transacciones(id_cliente);
+CREATE INDEX idx_transacciones_marca_cambio ON ventas.transacciones((COALESCE(fecha_actualizacion, fecha_creacion)));
 CREATE INDEX idx_detalle_transaccion ON ventas.detalle_ventas(id_transaccion);
 CREATE INDEX idx_detalle_producto ON ventas.detalle_ventas(id_producto);
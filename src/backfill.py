@@ -0,0 +1,286 @@
+"""
+Módulo de Backfill por Particiones de Fechas
+Metaltronic S.A. - Pipeline ETL
+
+Reconstruye el resumen diario de ventas para un rango de fechas sin ejecutar
+un ciclo del DAG por día. El rango se divide en particiones que se extraen y
+transforman en un pool de procesos; los resultados se combinan y se cargan
+con una única escritura masiva.
+
+Con --motor spark (parámetro `motor` del DAG) el rango completo se procesa
+con src.spark_engine en lugar del pool de procesos.
+
+Uso:
+    python -m src.backfill --desde 2024-01-01 --hasta 2024-12-31 --workers 4
+    python -m src.backfill --desde 2020-01-01 --hasta 2024-12-31 --motor spark
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import pandas as pd
+from config.database import db_config
+from config.pipeline import pipeline_config
+from src.extract import DataExtractor
+from src.transform import DataTransformer
+from src.load import DataLoader
+from src.metrics import instrumented, instrumented_task
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def split_date_range(fecha_inicio, fecha_fin, dias_por_particion):
+    """
+    Dividir un rango de fechas en particiones contiguas
+
+    Args:
+        fecha_inicio (str): Fecha de inicio 'YYYY-MM-DD'
+        fecha_fin (str): Fecha de fin 'YYYY-MM-DD' (incluida)
+        dias_por_particion (int): Días por partición
+
+    Returns:
+        list: Tuplas (inicio, fin) en formato 'YYYY-MM-DD'
+    """
+    inicio = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+    fin = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
+    if fin < inicio:
+        raise ValueError(f"Rango de fechas inválido: {fecha_inicio} > {fecha_fin}")
+    if dias_por_particion < 1:
+        raise ValueError("dias_por_particion debe ser mayor que cero")
+
+    particiones = []
+    while inicio <= fin:
+        hasta = min(inicio + timedelta(days=dias_por_particion - 1), fin)
+        particiones.append((inicio.isoformat(), hasta.isoformat()))
+        inicio = hasta + timedelta(days=1)
+    return particiones
+
+def resolve_workers(workers, conexiones, particiones):
+    """
+    Calcular el número de procesos que respeta el presupuesto de conexiones
+
+    Cada worker usa una sola conexión a PostgreSQL y el proceso principal
+    reserva una para el inventario y la carga.
+    """
+    return max(1, min(workers, conexiones - 1, particiones))
+
+def combine_product_sales(parciales):
+    """
+    Combinar ventas por producto calculadas por partición
+
+    Las particiones no comparten fechas y cada transacción tiene una sola
+    fecha, por lo que cantidades, ingresos y transacciones distintas se suman.
+
+    Args:
+        parciales (list): DataFrames de DataTransformer.summarize_product_sales
+
+    Returns:
+        pd.DataFrame: Ventas por producto del rango completo
+    """
+    parciales = [df for df in parciales if not df.empty]
+    if not parciales:
+        return pd.DataFrame()
+    return (
+        pd.concat(parciales, ignore_index=True)
+        .groupby('codigo_producto', as_index=False)
+        .sum()
+    )
+
+def _init_worker():
+    """Limitar el pool de PostgreSQL de cada worker a una conexión"""
+    db_config.postgres_pool_config.update(pool_size=1, max_overflow=0)
+
+def process_partition(fecha_inicio, fecha_fin, pushdown=False):
+    """
+    Extraer y transformar las ventas de una partición
+
+    Se ejecuta dentro de un proceso del pool.
+
+    Args:
+        fecha_inicio (str): Fecha de inicio de la partición
+        fecha_fin (str): Fecha de fin de la partición
+        pushdown (bool): Calcular los agregados en PostgreSQL
+
+    Returns:
+        tuple: (resumen diario, ventas por producto)
+    """
+    extractor = DataExtractor()
+    transformer = DataTransformer()
+
+    if pushdown:
+        resumen = extractor.extract_daily_summary(fecha_inicio, fecha_fin)
+        ventas_producto = extractor.extract_product_sales(fecha_inicio, fecha_fin)
+        return resumen, ventas_producto
+
+    ventas = extractor.extract_sales_data(fecha_inicio, fecha_fin)
+    if ventas.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    ventas_clean = transformer.clean_sales_data(ventas)
+    return (
+        transformer.aggregate_daily_sales(ventas_clean),
+        transformer.summarize_product_sales(ventas_clean)
+    )
+
+class BackfillEngine:
+    """Clase para reconstruir el resumen diario de un rango de fechas en paralelo"""
+
+    def __init__(self, workers=None, conexiones=None, dias_por_particion=None, pushdown=None):
+        config = pipeline_config.backfill_config
+        self.workers = workers or config['workers']
+        self.conexiones = conexiones or config['db_connections']
+        self.dias_por_particion = dias_por_particion or config['partition_days']
+        self.pushdown = pipeline_config.transform_config['pushdown'] if pushdown is None else pushdown
+        self.last_backfill_stats = {}
+
+    @instrumented
+    def run(self, fecha_inicio, fecha_fin, incluir_inventario=False):
+        """
+        Ejecutar el backfill de un rango de fechas
+
+        Si alguna partición falla no se carga nada, de modo que una nueva
+        ejecución parte del mismo estado.
+
+        Args:
+            fecha_inicio (str): Fecha de inicio 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin 'YYYY-MM-DD'
+            incluir_inventario (bool): Recalcular también analytics.analisis_inventario
+                con las ventas de todo el rango
+
+        Returns:
+            dict: Estadísticas del backfill
+        """
+        try:
+            particiones = split_date_range(fecha_inicio, fecha_fin, self.dias_por_particion)
+            workers = resolve_workers(self.workers, self.conexiones, len(particiones))
+            logger.info(
+                f"Backfill de {fecha_inicio} a {fecha_fin}: {len(particiones)} particiones "
+                f"de {self.dias_por_particion} días, {workers} procesos"
+            )
+
+            inicio = time.perf_counter()
+            resumenes, ventas_producto, fallo = [], [], None
+
+            # spawn evita heredar conexiones e hilos del proceso principal
+            contexto = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=contexto,
+                                     initializer=_init_worker) as executor:
+                futures = {
+                    executor.submit(process_partition, desde, hasta, self.pushdown): (desde, hasta)
+                    for desde, hasta in particiones
+                }
+                for future in as_completed(futures):
+                    desde, hasta = futures[future]
+                    try:
+                        resumen, parcial = future.result()
+                    except Exception as e:
+                        fallo = (f'{desde}/{hasta}', e)
+                        logger.error(f"Error en la partición {desde} a {hasta}: {str(e)}")
+                        # No iniciar particiones pendientes: el resultado se descartará
+                        for pendiente in futures:
+                            pendiente.cancel()
+                        break
+                    resumenes.append(resumen)
+                    ventas_producto.append(parcial)
+                    logger.info(f"Partición {desde} a {hasta} procesada: {len(resumen)} días")
+            tiempo_particiones = time.perf_counter() - inicio
+
+            if fallo:
+                particion, error = fallo
+                raise RuntimeError(f"Falló la partición {particion}, no se cargaron datos") from error
+
+            # Carga combinada en una sola escritura
+            resumenes = [df for df in resumenes if not df.empty]
+            resumen = (
+                pd.concat(resumenes, ignore_index=True).sort_values('fecha_resumen').reset_index(drop=True)
+                if resumenes else pd.DataFrame()
+            )
+            loader = DataLoader()
+            loader.load_daily_summary(resumen)
+
+            productos = 0
+            if incluir_inventario:
+                ventas_rango = combine_product_sales(ventas_producto)
+                inventario = DataExtractor().extract_inventory_data(incremental=False)
+                analisis = DataTransformer().analyze_inventory_trends(
+                    inventario, ventas_producto=ventas_rango
+                )
+                loader.load_inventory_analysis(analisis)
+                productos = len(analisis)
+
+            self.last_backfill_stats = {
+                'fecha_inicio': fecha_inicio,
+                'fecha_fin': fecha_fin,
+                'particiones': len(particiones),
+                'procesos': workers,
+                'modo': 'pushdown' if self.pushdown else 'pandas',
+                'dias_cargados': len(resumen),
+                'productos_cargados': productos,
+                'tiempo_particiones_s': round(tiempo_particiones, 3),
+                'tiempo_total_s': round(time.perf_counter() - inicio, 3)
+            }
+            logger.info(f"Backfill completado: {self.last_backfill_stats}")
+            return self.last_backfill_stats
+
+        except Exception as e:
+            logger.error(f"Error en backfill: {str(e)}")
+            raise
+
+# Función helper para Airflow
+@instrumented_task('backfill')
+def backfill_task(**context):
+    """Task function para Airflow (parámetros en context['params'])"""
+    params = context.get('params') or {}
+    if params.get('motor') == 'spark':
+        # Importación diferida: sólo este modo requiere pyspark y Java
+        from src.spark_engine import SparkEngine
+        engine = SparkEngine(
+            master=params.get('spark_master'),
+            particiones=params.get('spark_partitions'),
+            conexiones=params.get('db_connections')
+        )
+    else:
+        engine = BackfillEngine(
+            workers=params.get('workers'),
+            conexiones=params.get('db_connections'),
+            dias_por_particion=params.get('partition_days'),
+            pushdown=params.get('pushdown')
+        )
+    return engine.run(
+        params['fecha_inicio'],
+        params['fecha_fin'],
+        incluir_inventario=params.get('incluir_inventario', False)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--desde', required=True, help="Fecha de inicio 'YYYY-MM-DD'")
+    parser.add_argument('--hasta', required=True, help="Fecha de fin 'YYYY-MM-DD'")
+    parser.add_argument('--workers', type=int, help="Procesos (por defecto BACKFILL_WORKERS)")
+    parser.add_argument('--conexiones', type=int,
+                        help="Conexiones PostgreSQL disponibles (por defecto BACKFILL_DB_CONNECTIONS)")
+    parser.add_argument('--dias-por-particion', type=int,
+                        help="Días por partición (por defecto BACKFILL_PARTITION_DAYS)")
+    parser.add_argument('--pushdown', action='store_true', default=None,
+                        help="Calcular los agregados en PostgreSQL")
+    parser.add_argument('--inventario', action='store_true',
+                        help="Recalcular también el análisis de inventario del rango")
+    parser.add_argument('--motor', choices=['procesos', 'spark'], default='procesos',
+                        help="Pool de procesos con pandas o Spark (lecturas JDBC particionadas)")
+    parser.add_argument('--spark-master', help="Master de Spark (por defecto SPARK_MASTER)")
+    parser.add_argument('--spark-particiones', type=int,
+                        help="Particiones JDBC de Spark (por defecto SPARK_JDBC_PARTITIONS)")
+    args = parser.parse_args()
+
+    if args.motor == 'spark':
+        from src.spark_engine import SparkEngine
+        engine = SparkEngine(args.spark_master, args.spark_particiones, args.conexiones)
+    else:
+        engine = BackfillEngine(args.workers, args.conexiones, args.dias_por_particion, args.pushdown)
+    engine.run(args.desde, args.hasta, incluir_inventario=args.inventario)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Módulo de Dimensiones en Caché
+Metaltronic S.A. - Pipeline ETL
+
+Mantiene en staging una copia de las dimensiones clientes y productos para la
+extracción de ventas sólo con hechos: en lugar de repetir nombre, ciudad,
+categoría, etc. en cada línea de detalle, las consultas traen los ids y las
+medidas y los atributos se unen en memoria.
+
+Cada actualización lee sólo las filas nuevas (clave mayor a la máxima en
+caché) o modificadas (marca de cambio mayor o igual a la máxima en caché,
+menos EXTRACT_INCREMENTAL_LOOKBACK_MINUTES) y quita de la caché las claves
+eliminadas, detectadas con una lectura de sólo claves.
+"""
+
+import logging
+import pandas as pd
+from sqlalchemy import text
+from config.database import db_config
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Dimensiones de ventas: tabla, clave, atributos y marca de cambio
+DIMENSIONS = {
+    'clientes': {
+        'tabla': 'ventas.clientes',
+        'clave': 'id_cliente',
+        'columnas': ['nombre_cliente', 'ciudad', 'provincia'],
+        'marca': 'COALESCE(fecha_actualizacion, fecha_registro)'
+    },
+    'productos': {
+        'tabla': 'inventario.productos',
+        'clave': 'id_producto',
+        'columnas': ['codigo_producto', 'nombre_producto', 'categoria', 'material'],
+        'marca': 'COALESCE(fecha_actualizacion, fecha_creacion)'
+    }
+}
+
+DIMENSION_QUERY_TEMPLATE = """
+SELECT {clave}, {columnas}, {marca} as marca_cambio
+FROM {tabla}
+WHERE {filtro}
+"""
+
+
+class DimensionStore:
+    """Clase para mantener dimensiones de ventas en caché"""
+
+    def __init__(self, store=None):
+        self.db_config = db_config
+        self.store = store or staging_store
+
+    def _read(self, nombre, filtro, params=None):
+        spec = DIMENSIONS[nombre]
+        query = DIMENSION_QUERY_TEMPLATE.format(
+            clave=spec['clave'], columnas=', '.join(spec['columnas']),
+            marca=spec['marca'], tabla=spec['tabla'], filtro=filtro
+        )
+        engine = self.db_config.get_postgres_engine()
+        return pd.read_sql_query(query, engine, params=params)
+
+    def _keys(self, nombre):
+        """Claves vigentes de una dimensión (lectura de sólo claves)"""
+        spec = DIMENSIONS[nombre]
+        engine = self.db_config.get_postgres_engine()
+        with engine.connect() as conn:
+            rows = conn.execute(text(f"SELECT {spec['clave']} FROM {spec['tabla']}"))
+            return [row[0] for row in rows]
+
+    def _save(self, nombre, df):
+        df = df.sort_values(DIMENSIONS[nombre]['clave']).reset_index(drop=True)
+        self.store.write(df, 'state', f'dim_{nombre}')
+        return df
+
+    def refresh(self, nombre):
+        """
+        Actualizar una dimensión con las filas nuevas o modificadas
+
+        Args:
+            nombre (str): 'clientes' o 'productos'
+
+        Returns:
+            pd.DataFrame: Dimensión completa (clave, atributos y marca_cambio)
+        """
+        try:
+            spec = DIMENSIONS[nombre]
+            clave = spec['clave']
+
+            cache = None
+            if self.store.exists('state', f'dim_{nombre}'):
+                cache = self.store.read('state', f'dim_{nombre}')
+            if cache is None or cache.empty:
+                df = self._save(nombre, self._read(nombre, 'TRUE'))
+                logger.info(f"Dimensión {nombre} extraída completa: {len(df)} filas")
+                return df
+
+            # La marca se asigna al modificar la fila, no al confirmar la
+            # transacción: se relee una ventana antes de la máxima en caché
+            margen = pd.Timedelta(minutes=pipeline_config.extract_config['incremental_lookback_minutes'])
+            cambios = self._read(
+                nombre, f"{spec['marca']} >= %s OR {clave} > %s",
+                ((cache['marca_cambio'].max() - margen).to_pydatetime(), int(cache[clave].max()))
+            )
+            vigentes = self._keys(nombre)
+            df = pd.concat([cache[~cache[clave].isin(cambios[clave])], cambios], ignore_index=True)
+            eliminadas = ~df[clave].isin(vigentes)
+            df = df[~eliminadas].sort_values(clave).reset_index(drop=True)
+            if not df.equals(cache):
+                self._save(nombre, df)
+            logger.info(
+                f"Dimensión {nombre} actualizada: {len(cambios)} filas leídas, "
+                f"{int(eliminadas.sum())} eliminadas, {len(df)} en caché"
+            )
+            return df
+
+        except Exception as e:
+            logger.error(f"Error actualizando dimensión {nombre}: {str(e)}")
+            raise
+
+    def ensure(self, nombre, dimension, claves):
+        """
+        Completar una dimensión con las claves referenciadas que no contiene
+
+        Cubre filas insertadas después de refresh() pero ya referenciadas por
+        los hechos extraídos.
+
+        Args:
+            nombre (str): 'clientes' o 'productos'
+            dimension (pd.DataFrame): Dimensión en memoria
+            claves (pd.Series): Claves referenciadas por los hechos
+
+        Returns:
+            pd.DataFrame: Dimensión con todas las claves disponibles
+        """
+        clave = DIMENSIONS[nombre]['clave']
+        faltantes = pd.Index(claves.dropna().unique()).difference(dimension[clave])
+        if faltantes.empty:
+            return dimension
+
+        nuevas = self._read(nombre, f'{clave} = ANY(%(claves)s)',
+                            {'claves': [int(c) for c in faltantes]})
+        logger.info(f"Dimensión {nombre}: {len(nuevas)} filas nuevas referenciadas por los hechos")
+        return self._save(nombre, pd.concat([dimension, nuevas], ignore_index=True))
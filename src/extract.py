@@ -3,73 +3,473 @@ Módulo de Extracción de Datos
 Metaltronic S.A. - Pipeline ETL
 """
 
+import glob
+import hashlib
+import os
+import threading
+import time
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
+from sqlalchemy import text
 from config.database import db_config
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+from src.metrics import instrumented, instrumented_task, metrics_collector
+from src.watermarks import WatermarkStore
+from src.dimensions import DimensionStore
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Origen común de las consultas de ventas (una fila por línea de detalle)
+SALES_FROM_TEMPLATE = """
+FROM ventas.transacciones t
+JOIN ventas.clientes c ON t.id_cliente = c.id_cliente
+JOIN ventas.detalle_ventas dv ON t.id_transaccion = dv.id_transaccion
+JOIN inventario.productos p ON dv.id_producto = p.id_producto
+WHERE {filtro}
+"""
+
+# Query SQL para extraer datos de ventas con joins
+SALES_QUERY_TEMPLATE = """
+SELECT 
+    t.id_transaccion,
+    t.numero_factura,
+    t.fecha_venta,
+    c.nombre_cliente,
+    c.ciudad,
+    c.provincia,
+    p.codigo_producto,
+    p.nombre_producto,
+    p.categoria,
+    p.material,
+    dv.cantidad,
+    dv.precio_unitario,
+    dv.descuento,
+    dv.subtotal,
+    t.total as total_factura,
+    t.metodo_pago,
+    t.vendedor,
+    t.sucursal
+""" + SALES_FROM_TEMPLATE + """
+ORDER BY t.fecha_venta, t.id_transaccion, dv.id_detalle
+"""
+
+# Columnas de SALES_QUERY_TEMPLATE, en su orden
+SALES_COLUMNS = [
+    'id_transaccion', 'numero_factura', 'fecha_venta', 'nombre_cliente', 'ciudad',
+    'provincia', 'codigo_producto', 'nombre_producto', 'categoria', 'material',
+    'cantidad', 'precio_unitario', 'descuento', 'subtotal', 'total_factura',
+    'metodo_pago', 'vendedor', 'sucursal'
+]
+
+# Ventas sólo con hechos (EXTRACT_FACTS_ONLY): ids de cliente y producto en
+# lugar de sus atributos, que se unen en memoria desde src.dimensions
+SALES_FACTS_QUERY_TEMPLATE = """
+SELECT 
+    t.id_transaccion,
+    t.numero_factura,
+    t.fecha_venta,
+    t.id_cliente,
+    dv.id_producto,
+    dv.cantidad,
+    dv.precio_unitario,
+    dv.descuento,
+    dv.subtotal,
+    t.total as total_factura,
+    t.metodo_pago,
+    t.vendedor,
+    t.sucursal
+FROM ventas.transacciones t
+JOIN ventas.detalle_ventas dv ON t.id_transaccion = dv.id_transaccion
+WHERE {filtro}
+ORDER BY t.fecha_venta, t.id_transaccion, dv.id_detalle
+"""
+
+# Resumen diario calculado en PostgreSQL (modo pushdown). Replica a
+# DataTransformer.aggregate_daily_sales: los empates de categoría y vendedor
+# se resuelven por primera aparición en el orden de SALES_QUERY_TEMPLATE y
+# los de cliente por orden alfabético (collation "C", como en Python).
+DAILY_SUMMARY_QUERY_TEMPLATE = """
+WITH lineas AS (
+    SELECT 
+        t.fecha_venta,
+        t.total,
+        t.vendedor,
+        c.nombre_cliente,
+        p.categoria,
+        dv.cantidad,
+        ROW_NUMBER() OVER (
+            PARTITION BY t.fecha_venta ORDER BY t.id_transaccion, dv.id_detalle
+        ) as posicion
+""" + SALES_FROM_TEMPLATE + """
+),
+totales AS (
+    SELECT 
+        fecha_venta,
+        SUM(total) as total_ventas,
+        AVG(total) as promedio_ticket,
+        COUNT(total) as total_transacciones,
+        SUM(cantidad) as productos_vendidos,
+        COUNT(DISTINCT nombre_cliente) as clientes_unicos
+    FROM lineas
+    GROUP BY fecha_venta
+),
+categorias AS (
+    SELECT DISTINCT ON (fecha_venta) fecha_venta, categoria
+    FROM (
+        SELECT fecha_venta, categoria, COUNT(*) as conteo, MIN(posicion) as primera
+        FROM lineas
+        WHERE categoria IS NOT NULL
+        GROUP BY fecha_venta, categoria
+    ) conteos
+    ORDER BY fecha_venta, conteo DESC, primera
+),
+vendedores AS (
+    SELECT DISTINCT ON (fecha_venta) fecha_venta, vendedor
+    FROM (
+        SELECT fecha_venta, vendedor, COUNT(*) as conteo, MIN(posicion) as primera
+        FROM lineas
+        WHERE vendedor IS NOT NULL
+        GROUP BY fecha_venta, vendedor
+    ) conteos
+    ORDER BY fecha_venta, conteo DESC, primera
+),
+clientes AS (
+    SELECT DISTINCT ON (fecha_venta) fecha_venta, nombre_cliente
+    FROM (
+        SELECT fecha_venta, nombre_cliente, COUNT(*) as conteo
+        FROM lineas
+        WHERE nombre_cliente IS NOT NULL
+        GROUP BY fecha_venta, nombre_cliente
+    ) conteos
+    ORDER BY fecha_venta, conteo DESC, nombre_cliente COLLATE "C"
+)
+SELECT 
+    tt.fecha_venta as fecha_resumen,
+    tt.total_ventas,
+    tt.promedio_ticket,
+    tt.total_transacciones,
+    tt.productos_vendidos,
+    tt.clientes_unicos,
+    ca.categoria as categoria_mas_vendida,
+    ve.vendedor as vendedor_top,
+    cl.nombre_cliente as cliente_mas_frecuente
+FROM totales tt
+LEFT JOIN categorias ca ON ca.fecha_venta = tt.fecha_venta
+LEFT JOIN vendedores ve ON ve.fecha_venta = tt.fecha_venta
+LEFT JOIN clientes cl ON cl.fecha_venta = tt.fecha_venta
+ORDER BY tt.fecha_venta
+"""
+
+# Ventas por producto calculadas en PostgreSQL (modo pushdown), igual que
+# DataTransformer.summarize_product_sales
+PRODUCT_SALES_QUERY_TEMPLATE = """
+SELECT 
+    p.codigo_producto,
+    SUM(dv.cantidad) as cantidad_vendida,
+    SUM(dv.subtotal) as ingresos_producto,
+    COUNT(DISTINCT t.id_transaccion) as num_transacciones
+""" + SALES_FROM_TEMPLATE + """
+GROUP BY p.codigo_producto
+ORDER BY p.codigo_producto
+"""
+
+SALES_QUERY = SALES_QUERY_TEMPLATE.format(filtro='t.fecha_venta BETWEEN %s AND %s')
+
+# Query SQL para extraer el inventario, con la marca de cambio de cada producto
+INVENTORY_QUERY_TEMPLATE = """
+SELECT 
+    id_producto,
+    codigo_producto,
+    nombre_producto,
+    categoria,
+    material,
+    peso_kg,
+    precio_unitario,
+    stock_actual,
+    stock_minimo,
+    CASE 
+        WHEN stock_actual <= stock_minimo THEN 'BAJO'
+        WHEN stock_actual <= stock_minimo * 2 THEN 'MEDIO'
+        ELSE 'ALTO'
+    END as nivel_stock,
+    fecha_creacion,
+    activo{columnas_extra}
+FROM inventario.productos
+WHERE {filtro}
+ORDER BY categoria, codigo_producto
+"""
+
+INVENTORY_QUERY = INVENTORY_QUERY_TEMPLATE.format(columnas_extra='', filtro='activo = true')
+
+# Consultas de validación de la foto de inventario en caché: conteo y marca
+# de cambio máxima (el trigger de productos actualiza fecha_actualizacion en
+# cada UPDATE) o checksum de todas las filas calculado en el servidor
+INVENTORY_FINGERPRINT_QUERIES = {
+    'stats': """
+SELECT COUNT(*), MAX(COALESCE(fecha_actualizacion, fecha_creacion))
+FROM inventario.productos
+""",
+    'checksum': """
+SELECT COUNT(*), md5(string_agg(md5(p::text), '' ORDER BY p.id_producto))
+FROM inventario.productos p
+"""
+}
+
+# Campos de logs utilizados por el pipeline; el número de productos se
+# calcula en el servidor para no transferir el arreglo completo
+LOGS_PROJECTION = {
+    '_id': 0,
+    'timestamp': 1,
+    'evento': 1,
+    'numero_factura': 1,
+    'cliente_id': 1,
+    'vendedor': 1,
+    'total': 1,
+    'num_productos': {'$size': {'$ifNull': ['$productos', []]}}
+}
+LOGS_FIELDS = [campo for campo, valor in LOGS_PROJECTION.items() if valor]
+
+# Marcas de agua de la extracción incremental. En transacciones y productos
+# la marca de cambio es la fecha de creación o de última modificación (los
+# triggers la actualizan; los cambios en detalle_ventas marcan su transacción)
+SALES_WATERMARK = 'ventas.transacciones.fecha_actualizacion'
+INVENTORY_WATERMARK = 'inventario.productos.fecha_actualizacion'
+MARCA_CAMBIO = "COALESCE(fecha_actualizacion, fecha_creacion)"
+
+def join_sales_dimensions(hechos, clientes, productos):
+    """
+    Unir hechos de ventas con sus dimensiones en el formato de SALES_QUERY_TEMPLATE
+    
+    Se conserva el orden de los hechos y, como los JOIN de la consulta
+    original, se descartan las líneas sin cliente o producto.
+    
+    Args:
+        hechos (pd.DataFrame): Resultado de SALES_FACTS_QUERY_TEMPLATE
+        clientes (pd.DataFrame): Dimensión de clientes (id_cliente y atributos)
+        productos (pd.DataFrame): Dimensión de productos (id_producto y atributos)
+    
+    Returns:
+        pd.DataFrame: Ventas con las columnas de SALES_COLUMNS
+    """
+    if hechos.empty:
+        return pd.DataFrame(columns=SALES_COLUMNS)
+    
+    posicion_cliente = pd.Index(clientes['id_cliente']).get_indexer(hechos['id_cliente'])
+    posicion_producto = pd.Index(productos['id_producto']).get_indexer(hechos['id_producto'])
+    validas = (posicion_cliente >= 0) & (posicion_producto >= 0)
+    
+    df = hechos.loc[validas].reset_index(drop=True)
+    for dimension, posiciones in [(clientes, posicion_cliente[validas]),
+                                  (productos, posicion_producto[validas])]:
+        for columna in dimension.columns:
+            if columna in SALES_COLUMNS:
+                df[columna] = dimension[columna].to_numpy()[posiciones]
+    return df[SALES_COLUMNS]
+
+def logs_documents_to_frame(documentos):
+    """Convertir documentos completos de logs a DataFrame (aplanando anidados)"""
+    logs_data = list(documentos)
+    if not logs_data:
+        return pd.DataFrame()
+    return pd.json_normalize(logs_data)
+
+def logs_cursor_to_frame(cursor, batch_size, campos=None):
+    """
+    Convertir un cursor de logs proyectados a DataFrame por lotes
+    
+    Cada lote se convierte a columnas tipadas antes de leer el siguiente, de
+    modo que sólo un lote vive como objetos Python a la vez.
+    
+    Args:
+        cursor: Iterable de documentos proyectados
+        batch_size (int): Documentos por lote
+        campos (list): Campos a construir (por defecto LOGS_FIELDS)
+    
+    Returns:
+        pd.DataFrame: Logs con una columna por campo
+    """
+    campos = campos or LOGS_FIELDS
+    bloques = []
+    columnas = {campo: [] for campo in campos}
+    pendientes = 0
+    
+    def _cerrar_bloque():
+        bloque = pd.DataFrame(columnas, columns=campos)
+        if 'timestamp' in bloque.columns:
+            bloque['timestamp'] = pd.to_datetime(bloque['timestamp'])
+        bloques.append(bloque)
+        for lista in columnas.values():
+            lista.clear()
+    
+    for documento in cursor:
+        for campo in campos:
+            columnas[campo].append(documento.get(campo))
+        pendientes += 1
+        if pendientes == batch_size:
+            _cerrar_bloque()
+            pendientes = 0
+    if pendientes:
+        _cerrar_bloque()
+    
+    if not bloques:
+        return pd.DataFrame()
+    if len(bloques) == 1:
+        return bloques[0]
+    return pd.concat(bloques, ignore_index=True)
+
 class DataExtractor:
     """Clase para extraer datos de diferentes fuentes"""
     
     def __init__(self):
         self.db_config = db_config
+        self.watermarks = WatermarkStore()
+        self.dimensions = DimensionStore()
+        self.last_extraction_stats = {}
+        # Evento de cancelación de la fuente que ejecuta cada hilo (run_sources)
+        self._hilo = threading.local()
+    
+    def cancelled(self):
+        """
+        Verificar si run_sources canceló la fuente del hilo actual
+        
+        Las fuentes que escriben por bloques lo consultan antes de cada
+        escritura para no seguir escribiendo después de un timeout.
+        """
+        evento = getattr(self._hilo, 'cancelado', None)
+        return evento is not None and evento.is_set()
+    
+    def _resolve_dates(self, fecha_inicio=None, fecha_fin=None):
+        """Completar fechas no especificadas con el último día"""
+        if not fecha_inicio:
+            fecha_inicio = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        if not fecha_fin:
+            fecha_fin = datetime.now().strftime('%Y-%m-%d')
+        return fecha_inicio, fecha_fin
+    
+    def _sales_template(self):
+        """Consulta de ventas según el modo (completa o sólo hechos)"""
+        if pipeline_config.extract_config['facts_only']:
+            return SALES_FACTS_QUERY_TEMPLATE
+        return SALES_QUERY_TEMPLATE
+    
+    def _sales_dimensions(self):
+        """Actualizar las dimensiones en caché (modo sólo hechos)"""
+        return {nombre: self.dimensions.refresh(nombre) for nombre in ['clientes', 'productos']}
+    
+    def _join_dimensions(self, hechos, dimensiones):
+        """Completar dimensiones con claves nuevas y unirlas a los hechos"""
+        dimensiones['clientes'] = self.dimensions.ensure('clientes', dimensiones['clientes'], hechos['id_cliente'])
+        dimensiones['productos'] = self.dimensions.ensure('productos', dimensiones['productos'], hechos['id_producto'])
+        return join_sales_dimensions(hechos, dimensiones['clientes'], dimensiones['productos'])
+    
+    def _sales_query(self, fecha_inicio, fecha_fin, fechas=None, template=SALES_QUERY_TEMPLATE):
+        """Construir una consulta de ventas para un rango o una lista de fechas"""
+        if fechas is not None:
+            query = template.format(filtro='t.fecha_venta = ANY(%(fechas)s::date[])')
+            return query, {'fechas': list(fechas)}
+        return template.format(filtro='t.fecha_venta BETWEEN %s AND %s'), (fecha_inicio, fecha_fin)
+    
+    @instrumented
+    def plan_incremental_sales(self):
+        """
+        Determinar las fechas de venta con transacciones nuevas o modificadas
+        
+        Compara la marca de cambio de las transacciones (creación, o última
+        modificación de la transacción o de su detalle) contra la marca de agua
+        confirmada, de modo que las transacciones que llegan tarde (con
+        fecha_venta antigua) y las corregidas también se detectan. Se
+        reprocesan sólo los días afectados, completos, para que los resúmenes
+        diarios sigan siendo correctos. La nueva marca queda pendiente hasta
+        que la carga la confirme.
+        
+        La marca se asigna al inicio de la transacción que escribe, no al
+        confirmarla: se relee una ventana de EXTRACT_INCREMENTAL_LOOKBACK_MINUTES
+        antes de la marca, que debe superar la duración de la transacción de
+        escritura más larga. Las transacciones eliminadas no se detectan.
+        
+        Returns:
+            list: Fechas 'YYYY-MM-DD' a extraer, o None si no hay marca previa
+                (en ese caso se usa el rango de fechas de la ejecución)
+        """
+        try:
+            marca = self.watermarks.get(SALES_WATERMARK)
+            engine = self.db_config.get_postgres_engine()
+            
+            with engine.connect() as conn:
+                maximo = conn.execute(
+                    text(f"SELECT MAX({MARCA_CAMBIO}) FROM ventas.transacciones")
+                ).scalar()
+                
+                if marca is None:
+                    fechas = None
+                else:
+                    margen = pd.Timedelta(minutes=pipeline_config.extract_config['incremental_lookback_minutes'])
+                    desde = pd.Timestamp(marca) - margen
+                    rows = conn.execute(
+                        text(f"""
+                        SELECT DISTINCT fecha_venta
+                        FROM ventas.transacciones
+                        WHERE {MARCA_CAMBIO} >= :desde
+                        ORDER BY fecha_venta
+                        """),
+                        {"desde": desde.to_pydatetime()}
+                    ).fetchall()
+                    fechas = [row[0].strftime('%Y-%m-%d') for row in rows]
+            
+            # La ventana releída no debe hacer retroceder la marca
+            if maximo is not None and (marca is None or pd.Timestamp(maximo) > pd.Timestamp(marca)):
+                self.watermarks.set(SALES_WATERMARK, pd.Timestamp(maximo).isoformat(), pendiente=True)
+            
+            if fechas is None:
+                logger.info("Sin marca de agua previa de ventas, se usa el rango de la ejecución")
+            else:
+                logger.info(f"Fechas con transacciones nuevas o modificadas desde {desde.isoformat()} "
+                            f"(marca {marca}): {fechas}")
+            return fechas
+            
+        except Exception as e:
+            logger.error(f"Error planificando extracción incremental de ventas: {str(e)}")
+            raise
     
-    def extract_sales_data(self, fecha_inicio=None, fecha_fin=None):
+    @instrumented
+    def extract_sales_data(self, fecha_inicio=None, fecha_fin=None, fechas=None):
         """
         Extraer datos de ventas desde PostgreSQL
         
         Args:
             fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
             fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+            fechas (list): Fechas específicas a extraer (reemplaza al rango)
         
         Returns:
             pd.DataFrame: DataFrame con datos de ventas
         """
         try:
             # Si no se especifica fecha, usar último día
-            if not fecha_inicio:
-                fecha_inicio = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            if not fecha_fin:
-                fecha_fin = datetime.now().strftime('%Y-%m-%d')
-            
-            logger.info(f"Extrayendo datos de ventas desde {fecha_inicio} hasta {fecha_fin}")
-            
-            # Query SQL para extraer datos de ventas con joins
-            query = """
-            SELECT 
-                t.id_transaccion,
-                t.numero_factura,
-                t.fecha_venta,
-                c.nombre_cliente,
-                c.ciudad,
-                c.provincia,
-                p.codigo_producto,
-                p.nombre_producto,
-                p.categoria,
-                p.material,
-                dv.cantidad,
-                dv.precio_unitario,
-                dv.descuento,
-                dv.subtotal,
-                t.total as total_factura,
-                t.metodo_pago,
-                t.vendedor,
-                t.sucursal
-            FROM ventas.transacciones t
-            JOIN ventas.clientes c ON t.id_cliente = c.id_cliente
-            JOIN ventas.detalle_ventas dv ON t.id_transaccion = dv.id_transaccion
-            JOIN inventario.productos p ON dv.id_producto = p.id_producto
-            WHERE t.fecha_venta BETWEEN %s AND %s
-            ORDER BY t.fecha_venta, t.id_transaccion
-            """
+            fecha_inicio, fecha_fin = self._resolve_dates(fecha_inicio, fecha_fin)
+            
+            if fechas is not None and not fechas:
+                logger.info("No hay fechas de ventas pendientes de extraer")
+                return pd.DataFrame()
+            
+            if fechas is None:
+                logger.info(f"Extrayendo datos de ventas desde {fecha_inicio} hasta {fecha_fin}")
+            else:
+                logger.info(f"Extrayendo datos de ventas para las fechas {fechas}")
             
             # Ejecutar consulta
+            template = self._sales_template()
+            dimensiones = self._sales_dimensions() if template is SALES_FACTS_QUERY_TEMPLATE else None
             engine = self.db_config.get_postgres_engine()
-            df = pd.read_sql_query(query, engine, params=[fecha_inicio, fecha_fin])
+            query, params = self._sales_query(fecha_inicio, fecha_fin, fechas, template=template)
+            df = pd.read_sql_query(query, engine, params=params)
+            if dimensiones is not None:
+                df = self._join_dimensions(df, dimensiones)
             
             logger.info(f"Extraídos {len(df)} registros de ventas")
             return df
@@ -78,41 +478,155 @@ class DataExtractor:
             logger.error(f"Error extrayendo datos de ventas: {str(e)}")
             raise
     
-    def extract_inventory_data(self):
+    @instrumented
+    def extract_sales_data_chunks(self, fecha_inicio=None, fecha_fin=None, chunk_size=None,
+                                  fechas=None):
+        """
+        Extraer datos de ventas desde PostgreSQL por bloques
+        
+        Usa un cursor del lado del servidor, de modo que la memoria utilizada
+        depende del tamaño del bloque y no del rango de fechas.
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+            chunk_size (int): Registros por bloque (por defecto EXTRACT_CHUNK_SIZE)
+            fechas (list): Fechas específicas a extraer (reemplaza al rango)
+        
+        Yields:
+            pd.DataFrame: Bloques de datos de ventas
+        """
+        try:
+            fecha_inicio, fecha_fin = self._resolve_dates(fecha_inicio, fecha_fin)
+            chunk_size = chunk_size or pipeline_config.extract_config['chunk_size']
+            
+            if fechas is not None and not fechas:
+                logger.info("No hay fechas de ventas pendientes de extraer")
+                return
+            
+            logger.info(
+                f"Extrayendo datos de ventas por bloques de {chunk_size} "
+                + (f"desde {fecha_inicio} hasta {fecha_fin}" if fechas is None else f"para las fechas {fechas}")
+            )
+            
+            template = self._sales_template()
+            dimensiones = self._sales_dimensions() if template is SALES_FACTS_QUERY_TEMPLATE else None
+            engine = self.db_config.get_postgres_engine()
+            query, params = self._sales_query(fecha_inicio, fecha_fin, fechas, template=template)
+            total_registros = 0
+            
+            with engine.connect().execution_options(
+                stream_results=True, max_row_buffer=chunk_size
+            ) as conn:
+                for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+                    if chunk.empty:
+                        continue
+                    if dimensiones is not None:
+                        chunk = self._join_dimensions(chunk, dimensiones)
+                    total_registros += len(chunk)
+                    yield chunk
+            
+            logger.info(f"Extraídos {total_registros} registros de ventas por bloques")
+            
+        except Exception as e:
+            logger.error(f"Error extrayendo datos de ventas por bloques: {str(e)}")
+            raise
+    
+    @instrumented
+    def extract_daily_summary(self, fecha_inicio=None, fecha_fin=None, fechas=None):
+        """
+        Calcular el resumen diario de ventas en PostgreSQL (modo pushdown)
+        
+        Sólo se transfiere una fila por día, con las mismas columnas que
+        DataTransformer.aggregate_daily_sales (sin fecha_procesamiento).
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+            fechas (list): Fechas específicas a resumir (reemplaza al rango)
+        
+        Returns:
+            pd.DataFrame: Resumen diario de ventas
+        """
+        try:
+            df = self._read_sales_aggregate(DAILY_SUMMARY_QUERY_TEMPLATE, fecha_inicio, fecha_fin, fechas)
+            if not df.empty:
+                df['fecha_resumen'] = pd.to_datetime(df['fecha_resumen'])
+                for col in ['total_ventas', 'promedio_ticket']:
+                    df[col] = df[col].astype(float)
+            
+            logger.info(f"Resumen diario calculado en PostgreSQL: {len(df)} días")
+            return df
+            
+        except Exception as e:
+            logger.error(f"Error extrayendo resumen diario: {str(e)}")
+            raise
+    
+    @instrumented
+    def extract_product_sales(self, fecha_inicio=None, fecha_fin=None, fechas=None):
+        """
+        Calcular las ventas por producto en PostgreSQL (modo pushdown)
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+            fechas (list): Fechas específicas a resumir (reemplaza al rango)
+        
+        Returns:
+            pd.DataFrame: Ventas por producto, como DataTransformer.summarize_product_sales
+        """
+        try:
+            df = self._read_sales_aggregate(PRODUCT_SALES_QUERY_TEMPLATE, fecha_inicio, fecha_fin, fechas)
+            if not df.empty:
+                df['ingresos_producto'] = df['ingresos_producto'].astype(float)
+            
+            logger.info(f"Ventas por producto calculadas en PostgreSQL: {len(df)} productos")
+            return df
+            
+        except Exception as e:
+            logger.error(f"Error extrayendo ventas por producto: {str(e)}")
+            raise
+    
+    def _read_sales_aggregate(self, template, fecha_inicio, fecha_fin, fechas):
+        """Ejecutar una consulta agregada de ventas para un rango o lista de fechas"""
+        fecha_inicio, fecha_fin = self._resolve_dates(fecha_inicio, fecha_fin)
+        if fechas is not None and not fechas:
+            logger.info("No hay fechas de ventas pendientes de resumir")
+            return pd.DataFrame()
+        
+        engine = self.db_config.get_postgres_engine()
+        query, params = self._sales_query(fecha_inicio, fecha_fin, fechas, template=template)
+        return pd.read_sql_query(query, engine, params=params)
+    
+    @instrumented
+    def extract_inventory_data(self, incremental=None):
         """
         Extraer datos de inventario desde PostgreSQL
         
+        En modo completo se reutiliza la última foto del catálogo mientras su
+        huella no cambie (EXTRACT_INVENTORY_CACHE: stats, checksum u off).
+        
+        Args:
+            incremental (bool): Leer sólo productos modificados desde la última
+                marca de agua (por defecto EXTRACT_INCREMENTAL)
+        
         Returns:
             pd.DataFrame: DataFrame con datos de inventario
         """
         try:
-            logger.info("Extrayendo datos de inventario")
+            if incremental is None:
+                incremental = pipeline_config.extract_config['incremental']
+            if incremental:
+                return self._extract_inventory_incremental()
             
-            query = """
-            SELECT 
-                id_producto,
-                codigo_producto,
-                nombre_producto,
-                categoria,
-                material,
-                peso_kg,
-                precio_unitario,
-                stock_actual,
-                stock_minimo,
-                CASE 
-                    WHEN stock_actual <= stock_minimo THEN 'BAJO'
-                    WHEN stock_actual <= stock_minimo * 2 THEN 'MEDIO'
-                    ELSE 'ALTO'
-                END as nivel_stock,
-                fecha_creacion,
-                activo
-            FROM inventario.productos
-            WHERE activo = true
-            ORDER BY categoria, codigo_producto
-            """
+            modo_cache = pipeline_config.extract_config['inventory_cache']
+            if modo_cache != 'off':
+                return self._extract_inventory_cached(modo_cache)
+            
+            logger.info("Extrayendo datos de inventario")
             
             engine = self.db_config.get_postgres_engine()
-            df = pd.read_sql_query(query, engine)
+            df = pd.read_sql_query(INVENTORY_QUERY, engine)
             
             logger.info(f"Extraídos {len(df)} productos del inventario")
             return df
@@ -121,23 +635,141 @@ class DataExtractor:
             logger.error(f"Error extrayendo datos de inventario: {str(e)}")
             raise
     
-    def extract_logs_data(self, fecha_inicio=None, fecha_fin=None):
+    def inventory_fingerprint(self, modo='stats'):
+        """
+        Calcular la huella del catálogo de productos sin transferirlo
+        
+        Args:
+            modo (str): 'stats' (conteo y marca de cambio máxima) o 'checksum'
+                (hash de todas las filas calculado en PostgreSQL)
+        
+        Returns:
+            str: Huella que cambia cuando cambia el resultado de INVENTORY_QUERY
+        """
+        if modo not in INVENTORY_FINGERPRINT_QUERIES:
+            raise ValueError(
+                f"Validación de caché de inventario no soportada: {modo}. "
+                f"Opciones: off, {', '.join(INVENTORY_FINGERPRINT_QUERIES)}"
+            )
+        engine = self.db_config.get_postgres_engine()
+        with engine.connect() as conn:
+            filas, valor = conn.execute(text(INVENTORY_FINGERPRINT_QUERIES[modo])).fetchone()
+        
+        # La consulta forma parte de la huella: cambiarla invalida la foto
+        huella = hashlib.sha256(f'{INVENTORY_QUERY}|{modo}|{filas}|{valor}'.encode('utf-8'))
+        return huella.hexdigest()[:16]
+    
+    def _extract_inventory_cached(self, modo):
+        """
+        Extraer el inventario reutilizando la última foto si el catálogo no cambió
+        
+        La foto se guarda en staging con la huella en el nombre, de modo que
+        sólo se reutiliza una foto tomada con esa misma huella. Si el catálogo
+        cambia entre la huella y la lectura, la foto queda más nueva que su
+        huella y la siguiente ejecución la vuelve a extraer.
+        """
+        nombre = f'inventario_cache_{self.inventory_fingerprint(modo)}'
+        if staging_store.exists('state', nombre):
+            df = staging_store.read('state', nombre)
+            logger.info(f"Inventario sin cambios ({modo}), se reutiliza la foto: {len(df)} productos")
+            return df
+        
+        logger.info("Catálogo modificado o sin foto previa, extrayendo datos de inventario")
+        engine = self.db_config.get_postgres_engine()
+        df = pd.read_sql_query(INVENTORY_QUERY, engine)
+        
+        vigente = staging_store.write(df, 'state', nombre)
+        directorio = os.path.dirname(vigente)
+        for path in glob.glob(os.path.join(directorio, 'inventario_cache_*')):
+            if path != vigente:
+                os.remove(path)
+        
+        logger.info(f"Extraídos {len(df)} productos del inventario")
+        return df
+    
+    def _extract_inventory_incremental(self):
+        """
+        Extraer el inventario aplicando sólo los cambios desde la marca de agua
+        
+        Los productos modificados (incluidos los desactivados) se combinan con
+        la última foto del catálogo guardada en staging, de modo que el
+        resultado es el inventario activo completo.
+        
+        La marca de cambio la asigna el trigger al ejecutar el UPDATE, no al
+        confirmar la transacción, por lo que se relee una ventana de
+        EXTRACT_INCREMENTAL_LOOKBACK_MINUTES antes de la marca; los productos
+        releídos reemplazan su fila en la foto. Los productos eliminados (o
+        desactivados sin pasar por el trigger) se detectan con una lectura de
+        sólo claves. La nueva marca queda pendiente hasta que la carga la
+        confirme.
+        """
+        marca = self.watermarks.get(INVENTORY_WATERMARK)
+        engine = self.db_config.get_postgres_engine()
+        
+        if marca is None or not staging_store.exists('state', 'inventario_snapshot'):
+            logger.info("Extrayendo inventario completo para iniciar la foto incremental")
+            query = INVENTORY_QUERY_TEMPLATE.format(
+                columnas_extra=f",\n    {MARCA_CAMBIO} as marca_cambio", filtro='activo = true'
+            )
+            cambios = pd.read_sql_query(query, engine)
+            df = cambios
+        else:
+            margen = pd.Timedelta(minutes=pipeline_config.extract_config['incremental_lookback_minutes'])
+            desde = pd.Timestamp(marca) - margen
+            query = INVENTORY_QUERY_TEMPLATE.format(
+                columnas_extra=f",\n    {MARCA_CAMBIO} as marca_cambio", filtro=f"{MARCA_CAMBIO} >= %s"
+            )
+            cambios = pd.read_sql_query(query, engine, params=(desde.to_pydatetime(),))
+            logger.info(f"Productos modificados desde {desde.isoformat()} (marca {marca}): {len(cambios)}")
+            
+            with engine.connect() as conn:
+                vigentes = {
+                    row[0] for row in conn.execute(
+                        text("SELECT codigo_producto FROM inventario.productos WHERE activo = true")
+                    )
+                }
+            
+            snapshot = staging_store.read('state', 'inventario_snapshot')
+            snapshot = snapshot[~snapshot['codigo_producto'].isin(cambios['codigo_producto'])]
+            eliminados = ~snapshot['codigo_producto'].isin(vigentes)
+            if eliminados.any():
+                logger.info(f"Productos eliminados o inactivos desde la última foto: {int(eliminados.sum())}")
+                snapshot = snapshot[~eliminados]
+            df = pd.concat([snapshot, cambios], ignore_index=True)
+            df = df[df['activo'].astype(bool)]
+            df = df.drop_duplicates(subset='codigo_producto', keep='last')
+        
+        df = df.sort_values(['categoria', 'codigo_producto']).reset_index(drop=True)
+        staging_store.write(df, 'state', 'inventario_snapshot')
+        
+        if not cambios.empty:
+            nueva_marca = pd.Timestamp(cambios['marca_cambio'].max())
+            # La ventana releída no debe hacer retroceder la marca
+            if marca is None or nueva_marca > pd.Timestamp(marca):
+                self.watermarks.set(INVENTORY_WATERMARK, nueva_marca.isoformat(), pendiente=True)
+        
+        logger.info(f"Extraídos {len(df)} productos del inventario (incremental)")
+        return df.drop(columns='marca_cambio')
+    
+    @instrumented
+    def extract_logs_data(self, fecha_inicio=None, fecha_fin=None, projected=None):
         """
         Extraer datos de logs desde MongoDB
         
         Args:
             fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
             fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+            projected (bool): Leer sólo los campos usados por el pipeline,
+                construyendo columnas por lotes (por defecto EXTRACT_LOGS_PROJECTED)
         
         Returns:
             pd.DataFrame: DataFrame con datos de logs
         """
         try:
             # Si no se especifica fecha, usar último día
-            if not fecha_inicio:
-                fecha_inicio = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            if not fecha_fin:
-                fecha_fin = datetime.now().strftime('%Y-%m-%d')
+            fecha_inicio, fecha_fin = self._resolve_dates(fecha_inicio, fecha_fin)
+            if projected is None:
+                projected = pipeline_config.extract_config['logs_projected']
             
             logger.info(f"Extrayendo logs desde {fecha_inicio} hasta {fecha_fin}")
             
@@ -148,36 +780,136 @@ class DataExtractor:
             # Crear filtro de fechas
             start_date = datetime.strptime(fecha_inicio, '%Y-%m-%d')
             end_date = datetime.strptime(fecha_fin, '%Y-%m-%d') + timedelta(days=1)
-            
-            # Query MongoDB
-            cursor = collection.find({
+            filtro = {
                 'timestamp': {
                     '$gte': start_date,
                     '$lt': end_date
                 }
-            })
+            }
             
-            # Convertir a DataFrame
-            logs_data = list(cursor)
-            if logs_data:
-                df = pd.json_normalize(logs_data)
+            # Query MongoDB y conversión a DataFrame
+            if projected:
+                batch_size = pipeline_config.extract_config['mongo_batch_size']
+                cursor = collection.find(filtro, LOGS_PROJECTION, batch_size=batch_size)
+                df = logs_cursor_to_frame(cursor, batch_size)
+            else:
+                df = logs_documents_to_frame(collection.find(filtro))
+            
+            if not df.empty:
                 logger.info(f"Extraídos {len(df)} registros de logs")
-                return df
             else:
                 logger.info("No se encontraron logs para el período especificado")
-                return pd.DataFrame()
+            return df
                 
         except Exception as e:
             logger.error(f"Error extrayendo datos de logs: {str(e)}")
             raise
     
-    def extract_all_data(self, fecha_inicio=None, fecha_fin=None):
+    @instrumented
+    def run_sources(self, fuentes, concurrent=None, timeout=None, tolerate_errors=None):
+        """
+        Ejecutar la extracción de varias fuentes midiendo sus tiempos
+        
+        En modo concurrente cada fuente corre en su propio hilo, con un tiempo
+        máximo contado desde el inicio. El error o timeout de una fuente no
+        interrumpe a las demás; al finalizar se reportan todos los errores.
+        Un hilo que excede el timeout no puede detenerse: se marca como
+        cancelado (ver cancelled) y sigue en segundo plano hasta su próximo
+        punto de control o hasta que su consulta termina.
+        
+        Args:
+            fuentes (dict): Nombre de la fuente -> función sin argumentos
+            concurrent (bool): Ejecutar en paralelo (por defecto EXTRACT_CONCURRENT)
+            timeout (float): Segundos máximos por fuente (por defecto EXTRACT_SOURCE_TIMEOUT)
+            tolerate_errors (bool): Omitir fuentes fallidas en lugar de lanzar error
+        
+        Returns:
+            dict: Nombre de la fuente -> resultado (sólo fuentes exitosas)
+        """
+        config = pipeline_config.extract_config
+        concurrent = config['concurrent'] if concurrent is None else concurrent
+        timeout = config['source_timeout'] if timeout is None else timeout
+        tolerate_errors = config['tolerate_errors'] if tolerate_errors is None else tolerate_errors
+        
+        resultados, errores, tiempos = {}, {}, {}
+        cancelaciones = {nombre: threading.Event() for nombre in fuentes}
+        # Etapas de métricas en curso, para que los hilos sumen sus bytes a ellas
+        etapas = metrics_collector.context()
+        
+        def _medir(nombre, funcion):
+            self._hilo.cancelado = cancelaciones[nombre]
+            t0 = time.perf_counter()
+            try:
+                return metrics_collector.run_in_context(etapas, funcion)
+            finally:
+                tiempos[nombre] = time.perf_counter() - t0
+                self._hilo.cancelado = None
+        
+        inicio = time.perf_counter()
+        if concurrent and len(fuentes) > 1:
+            executor = ThreadPoolExecutor(max_workers=len(fuentes), thread_name_prefix='extract')
+            futures = {nombre: executor.submit(_medir, nombre, funcion)
+                       for nombre, funcion in fuentes.items()}
+            try:
+                for nombre, future in futures.items():
+                    restante = None
+                    if timeout:
+                        restante = max(0.0, timeout - (time.perf_counter() - inicio))
+                    try:
+                        resultados[nombre] = future.result(timeout=restante)
+                    except FuturesTimeoutError:
+                        future.cancel()
+                        cancelaciones[nombre].set()
+                        tiempos.setdefault(nombre, float(timeout))
+                        errores[nombre] = TimeoutError(f"Tiempo máximo de {timeout}s excedido")
+                    except Exception as e:
+                        errores[nombre] = e
+            finally:
+                # Fuentes que siguen en curso al salir (timeout o interrupción)
+                for nombre, future in futures.items():
+                    if not future.done():
+                        cancelaciones[nombre].set()
+                executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for nombre, funcion in fuentes.items():
+                try:
+                    resultados[nombre] = _medir(nombre, funcion)
+                except Exception as e:
+                    errores[nombre] = e
+        tiempo_total = time.perf_counter() - inicio
+        
+        suma_fuentes = sum(tiempos.values())
+        self.last_extraction_stats = {
+            'modo': 'concurrente' if concurrent else 'secuencial',
+            'tiempo_total_s': round(tiempo_total, 3),
+            'tiempo_fuentes_s': {nombre: round(t, 3) for nombre, t in tiempos.items()},
+            'suma_fuentes_s': round(suma_fuentes, 3),
+            'ganancia_solapamiento_s': round(suma_fuentes - tiempo_total, 3),
+            'errores': {nombre: str(e) for nombre, e in errores.items()}
+        }
+        logger.info(f"Tiempos de extracción: {self.last_extraction_stats}")
+        
+        if errores:
+            for nombre, e in errores.items():
+                logger.error(f"Error extrayendo {nombre}: {str(e)}")
+            if not tolerate_errors:
+                raise RuntimeError(
+                    f"Falló la extracción de: {', '.join(errores)}"
+                ) from next(iter(errores.values()))
+        
+        return resultados
+    
+    @instrumented
+    def extract_all_data(self, fecha_inicio=None, fecha_fin=None, concurrent=None, incremental=None):
         """
         Extraer todos los datos necesarios para el ETL
         
         Args:
             fecha_inicio (str): Fecha de inicio
             fecha_fin (str): Fecha de fin
+            concurrent (bool): Extraer las fuentes en paralelo (por defecto EXTRACT_CONCURRENT)
+            incremental (bool): Extracción incremental por marcas de agua
+                (por defecto EXTRACT_INCREMENTAL)
         
         Returns:
             dict: Diccionario con todos los DataFrames
@@ -185,11 +917,25 @@ class DataExtractor:
         try:
             logger.info("Iniciando extracción completa de datos")
             
-            data = {
-                'ventas': self.extract_sales_data(fecha_inicio, fecha_fin),
-                'inventario': self.extract_inventory_data(),
-                'logs': self.extract_logs_data(fecha_inicio, fecha_fin)
+            if incremental is None:
+                incremental = pipeline_config.extract_config['incremental']
+            fechas = self.plan_incremental_sales() if incremental else None
+            
+            fuentes = {
+                'ventas': lambda: self.extract_sales_data(fecha_inicio, fecha_fin, fechas=fechas),
+                'inventario': lambda: self.extract_inventory_data(incremental=incremental)
             }
+            # Las ventas incrementales son las de los días con cambios: el análisis
+            # de inventario usa las ventas por producto del rango de la ejecución
+            if incremental:
+                fuentes['ventas_inventario'] = lambda: self.extract_product_sales(fecha_inicio, fecha_fin)
+            # En modo pushdown de logs el resumen se calcula en MongoDB al cargar
+            if not pipeline_config.transform_config['logs_pushdown']:
+                fuentes['logs'] = lambda: self.extract_logs_data(fecha_inicio, fecha_fin)
+            resultados = self.run_sources(fuentes, concurrent=concurrent)
+            
+            # Las fuentes omitidas por error quedan como DataFrames vacíos
+            data = {nombre: resultados.get(nombre, pd.DataFrame()) for nombre in fuentes}
             
             logger.info("Extracción completa finalizada")
             return data
@@ -198,23 +944,75 @@ class DataExtractor:
             logger.error(f"Error en extracción completa: {str(e)}")
             raise
 
+@instrumented
+def _write_sales_chunks(extractor, fecha_ejecucion, fechas=None):
+    """
+    Escribir los bloques de ventas al staging a medida que llegan
+    
+    Si run_sources cancela la fuente (timeout), se deja de leer y el archivo
+    temporal se descarta sin publicarse, de modo que un hilo abandonado no
+    compite con el reintento de la tarea por la misma ruta de staging.
+    """
+    def _verificar_cancelacion():
+        if extractor.cancelled():
+            raise RuntimeError("Extracción de ventas cancelada: no se publica el archivo de staging")
+    
+    with staging_store.open_writer('raw', 'ventas', fecha_ejecucion) as writer:
+        for chunk in extractor.extract_sales_data_chunks(fecha_ejecucion, fecha_ejecucion,
+                                                         fechas=fechas):
+            _verificar_cancelacion()
+            writer.write(chunk)
+        _verificar_cancelacion()
+    
+    if writer.total_registros:
+        logger.info(f"Datos de ventas guardados en {writer.path}: {writer.total_registros} registros")
+    return writer.total_registros
+
 # Función helper para Airflow
+@instrumented_task('extract')
 def extract_data_task(**context):
     """Task function para Airflow"""
     extractor = DataExtractor()
     fecha_ejecucion = context['ds']  # Fecha de ejecución del DAG
+    db_config.reset_connection_stats()
     
-    # Extraer datos
-    data = extractor.extract_all_data(fecha_ejecucion, fecha_ejecucion)
-    
-    # Guardar datos en archivos temporales (simular S3)
-    import os
-    os.makedirs('/opt/airflow/data/raw', exist_ok=True)
+    pushdown = pipeline_config.transform_config['pushdown']
+    if pushdown or pipeline_config.extract_config['streaming']:
+        fechas = None
+        if pipeline_config.extract_config['incremental']:
+            fechas = extractor.plan_incremental_sales()
+        
+        if pushdown:
+            # Ventas agregadas en PostgreSQL: sólo se transfieren filas resumidas
+            fuentes = {
+                'resumen_diario': lambda: extractor.extract_daily_summary(
+                    fecha_ejecucion, fecha_ejecucion, fechas),
+                'ventas_producto': lambda: extractor.extract_product_sales(
+                    fecha_ejecucion, fecha_ejecucion, fechas)
+            }
+        else:
+            # Ventas por bloques directo a staging
+            fuentes = {'ventas': lambda: _write_sales_chunks(extractor, fecha_ejecucion, fechas)}
+        
+        # En paralelo con las demás fuentes
+        fuentes['inventario'] = extractor.extract_inventory_data
+        if pipeline_config.extract_config['incremental']:
+            # Ventas por producto del día para el análisis de inventario
+            fuentes['ventas_inventario'] = lambda: extractor.extract_product_sales(
+                fecha_ejecucion, fecha_ejecucion)
+        if not pipeline_config.transform_config['logs_pushdown']:
+            fuentes['logs'] = lambda: extractor.extract_logs_data(fecha_ejecucion, fecha_ejecucion)
+        data = extractor.run_sources(fuentes)
+        data.pop('ventas', None)
+    else:
+        # Extraer datos
+        data = extractor.extract_all_data(fecha_ejecucion, fecha_ejecucion)
     
+    # Guardar datos en staging (simular S3)
     for key, df in data.items():
         if not df.empty:
-            file_path = f'/opt/airflow/data/raw/{key}_{fecha_ejecucion}.csv'
-            df.to_csv(file_path, index=False)
+            file_path = staging_store.write(df, 'raw', key, fecha_ejecucion)
             logger.info(f"Datos de {key} guardados en {file_path}")
     
+    logger.info(f"Conexiones de la tarea de extracción: {db_config.get_connection_stats()}")
     return "Extracción completada"
@@ -0,0 +1,200 @@
+"""
+Módulo de Ejecución Fusionada del ETL
+Metaltronic S.A. - Pipeline ETL
+
+Alternativa a las tareas extract_data, transform_data y load_data para
+ejecuciones diarias cortas: las tres fases corren en un solo proceso y los
+DataFrames pasan de una a otra en memoria, sin escribir y volver a leer
+staging entre tareas.
+
+Los datasets 'raw' y 'processed' se siguen guardando en staging como copia
+de auditoría y recuperación, pero en un hilo en segundo plano que se
+solapa con la transformación y la carga. La tarea espera a que las copias
+terminen antes de finalizar; con FUSED_AUDIT=false no se escriben.
+
+Todo el día se mantiene en memoria: EXTRACT_STREAMING y TRANSFORM_STREAMING
+no se aplican en este modo.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from config.database import db_config
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+from src.metrics import instrumented, instrumented_task, metrics_collector
+from src.extract import DataExtractor
+from src.transform import DataTransformer
+from src.load import DataLoader
+from src.watermarks import WatermarkStore
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@instrumented
+def _write_audit_copy(store, df, etapa, nombre, fecha):
+    """Guardar la copia de staging de un dataset (en el hilo de auditoría)"""
+    return store.write(df, etapa, nombre, fecha)
+
+
+class AuditWriter:
+    """Escritor en segundo plano de las copias de staging del modo fusionado"""
+
+    def __init__(self, fecha_ejecucion, store=None, enabled=None):
+        self.fecha_ejecucion = fecha_ejecucion
+        self.store = store or staging_store
+        self.enabled = pipeline_config.fused_config['audit'] if enabled is None else enabled
+        self.archivos = {}
+        self.errores = {}
+        self.tiempo_espera_s = 0.0
+        self._pendientes = {}
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix='auditoria')
+            if self.enabled else None
+        )
+
+    def write(self, df, etapa, nombre):
+        """
+        Encolar la copia de un dataset
+
+        El DataFrame no debe modificarse después: el hilo de auditoría lo lee
+        mientras el ETL continúa.
+        """
+        if not self.enabled or df.empty:
+            return
+        # Los bytes de la copia se suman también a la etapa de la tarea
+        self._pendientes[f'{etapa}/{nombre}'] = self._executor.submit(
+            metrics_collector.run_in_context, metrics_collector.context(),
+            _write_audit_copy, self.store, df, etapa, nombre, self.fecha_ejecucion
+        )
+
+    def close(self):
+        """
+        Esperar las copias pendientes
+
+        Los errores de las copias se registran pero no interrumpen el ETL:
+        los datos ya se cargaron o la tarea ya está fallando por otra causa.
+
+        Returns:
+            dict: Dataset ('etapa/nombre') -> ruta del archivo escrito
+        """
+        if self._executor is None:
+            return self.archivos
+
+        inicio = time.perf_counter()
+        for clave, future in self._pendientes.items():
+            try:
+                self.archivos[clave] = future.result()
+            except Exception as e:
+                self.errores[clave] = str(e)
+                logger.error(f"Error guardando copia de auditoría de {clave}: {str(e)}")
+        self._executor.shutdown()
+        self._executor = None
+        self._pendientes = {}
+        self.tiempo_espera_s = time.perf_counter() - inicio
+        return self.archivos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # También si el ETL falla: las copias escritas permiten reanudar con
+        # las tareas separadas
+        self.close()
+        return False
+
+
+def extract_fused(extractor, fecha_ejecucion):
+    """
+    Extraer los datos del día en memoria (como extract_data_task)
+
+    Returns:
+        dict: Datasets 'raw' por nombre
+    """
+    if not pipeline_config.transform_config['pushdown']:
+        return extractor.extract_all_data(fecha_ejecucion, fecha_ejecucion)
+
+    # Ventas agregadas en PostgreSQL
+    fechas = None
+    if pipeline_config.extract_config['incremental']:
+        fechas = extractor.plan_incremental_sales()
+    fuentes = {
+        'resumen_diario': lambda: extractor.extract_daily_summary(
+            fecha_ejecucion, fecha_ejecucion, fechas),
+        'ventas_producto': lambda: extractor.extract_product_sales(
+            fecha_ejecucion, fecha_ejecucion, fechas),
+        'inventario': extractor.extract_inventory_data
+    }
+    if pipeline_config.extract_config['incremental']:
+        # Ventas por producto del día para el análisis de inventario
+        fuentes['ventas_inventario'] = lambda: extractor.extract_product_sales(
+            fecha_ejecucion, fecha_ejecucion)
+    if not pipeline_config.transform_config['logs_pushdown']:
+        fuentes['logs'] = lambda: extractor.extract_logs_data(fecha_ejecucion, fecha_ejecucion)
+    resultados = extractor.run_sources(fuentes)
+    return {nombre: resultados.get(nombre, pd.DataFrame()) for nombre in fuentes}
+
+
+def _transformer():
+    """Transformador del backend configurado (TRANSFORM_BACKEND)"""
+    if pipeline_config.transform_config['backend'] == 'polars':
+        from src.transform_polars import PolarsTransformer
+        return PolarsTransformer()
+    return DataTransformer()
+
+
+def load_inputs(transformed_data):
+    """
+    Datasets que recibe load_all_data, los mismos que load_data_task lee de
+    staging
+
+    Se pasan completos: el reporte de calidad se calcula sobre todas las
+    columnas y cada carga proyecta sus LOAD_COLUMNS.
+    """
+    data_types = ['resumen_diario', 'analisis_inventario']
+    if not pipeline_config.transform_config['logs_pushdown']:
+        data_types.append('logs_processed')
+
+    return {data_type: transformed_data.get(data_type, pd.DataFrame()) for data_type in data_types}
+
+
+# Función helper para Airflow
+@instrumented_task('fused')
+def etl_fused_task(**context):
+    """Task function para Airflow: extracción, transformación y carga en memoria"""
+    fecha_ejecucion = context['ds']
+    db_config.reset_connection_stats()
+
+    with AuditWriter(fecha_ejecucion) as auditoria:
+        raw_data = extract_fused(DataExtractor(), fecha_ejecucion)
+        for nombre, df in raw_data.items():
+            auditoria.write(df, 'raw', nombre)
+        logger.info(f"Datos extraídos: {', '.join(f'{k}={len(v)}' for k, v in raw_data.items())}")
+
+        transformed_data = _transformer().transform_all_data(raw_data)
+        # Las ventas sin procesar ya no se usan (la copia las mantiene hasta escribirlas)
+        del raw_data
+        for nombre, df in transformed_data.items():
+            auditoria.write(df, 'processed', nombre)
+
+        loader = DataLoader()
+        loader.load_all_data(load_inputs(transformed_data))
+
+        # Resumen de logs calculado directamente en MongoDB
+        if pipeline_config.transform_config['logs_pushdown']:
+            loader.load_logs_summary_pushdown(fecha_ejecucion, fecha_ejecucion)
+
+        # Confirmar las marcas de agua sólo después de una carga exitosa
+        if pipeline_config.extract_config['incremental']:
+            WatermarkStore().confirm()
+
+    if auditoria.enabled:
+        logger.info(
+            f"Copias de auditoría: {len(auditoria.archivos)} escritas, {len(auditoria.errores)} con error, "
+            f"espera al final {auditoria.tiempo_espera_s:.3f} s"
+        )
+    logger.info(f"Conexiones de la tarea fusionada: {db_config.get_connection_stats()}")
+    return "ETL fusionado completado"
@@ -3,25 +3,325 @@ Módulo de Carga de Datos
 Metaltronic S.A. - Pipeline ETL
 """
 
+import io
+from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import logging
+from pymongo import DeleteMany, ReplaceOne
 from sqlalchemy import text
 from config.database import db_config
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+from src.metrics import instrumented, instrumented_task, metrics_collector
+from src.quality import approximate_summary, exact_summary
+from src.transform import LOGS_PERIODS
+from src.watermarks import WatermarkStore
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CREATE_INVENTORY_ANALYSIS_TABLE = """
+CREATE TABLE IF NOT EXISTS analytics.analisis_inventario (
+    codigo_producto VARCHAR(20) PRIMARY KEY,
+    nombre_producto VARCHAR(200),
+    categoria VARCHAR(50),
+    stock_actual INTEGER,
+    cantidad_vendida INTEGER,
+    ingresos_producto DECIMAL(12,2),
+    rotacion_inventario DECIMAL(8,4),
+    dias_stock DECIMAL(8,2),
+    performance VARCHAR(20),
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+def copy_dataframe(conn, df, tabla, batch_size=None):
+    """
+    Cargar un DataFrame con COPY FROM STDIN
+    
+    Los datos se serializan a CSV en un buffer en memoria por lotes, de modo
+    que el buffer no crece con el total de filas.
+    
+    Args:
+        conn: Conexión SQLAlchemy (la carga participa de su transacción)
+        df (pd.DataFrame): Datos con los nombres de columna de la tabla destino
+        tabla (str): Tabla destino 'esquema.tabla'
+        batch_size (int): Filas por lote (por defecto LOAD_COPY_BATCH_SIZE)
+    """
+    batch_size = batch_size or pipeline_config.load_config['copy_batch_size']
+    columnas = ', '.join(df.columns)
+    copy_sql = f"COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv)"
+    
+    cursor = conn.connection.cursor()
+    try:
+        for inicio in range(0, len(df), batch_size):
+            buffer = io.StringIO()
+            df.iloc[inicio:inicio + batch_size].to_csv(buffer, index=False, header=False)
+            metrics_collector.record_bytes(escritos=buffer.tell())
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+def ensure_logs_summary_indexes(collection):
+    """Crear (si no existen) los índices de resumen_logs_diario"""
+    collection.create_index([('fecha', 1), ('evento', 1)], unique=True)
+
+def summarize_logs(df_logs, fecha_procesamiento=None):
+    """
+    Resumir logs procesados por fecha y evento en documentos para MongoDB
+
+    Cada agregación se calcula en bloque sobre el número de grupo de cada
+    fila: vendedores únicos por grupo (en orden de aparición) y distribución
+    de periodos del día como tabla de conteos, ordenada de mayor a menor
+    como value_counts (con las categorías sin eventos cuando periodo_dia es
+    categórico).
+
+    Args:
+        df_logs (pd.DataFrame): Logs procesados
+        fecha_procesamiento (pd.Timestamp): Marca de procesamiento (por
+            defecto, ahora)
+
+    Returns:
+        list: Documentos con tipos nativos, ordenados por fecha y evento
+    """
+    grupos = df_logs.groupby(['fecha', 'evento'], sort=True)
+    resumen = grupos.agg(total_monto=('total', 'sum'),
+                         num_eventos=('numero_factura', 'count')).reset_index()
+    if resumen.empty:
+        return []
+
+    codigos = grupos.ngroup()
+    validas = codigos.notna().to_numpy()
+    codigos = codigos[validas].astype('int64')
+
+    # Vendedores únicos por grupo: pares (grupo, vendedor) sin repetir,
+    # ordenados por grupo y cortados en una lista por grupo
+    pares = pd.DataFrame({'grupo': codigos, 'vendedor': df_logs['vendedor'][validas]}).drop_duplicates()
+    pares = pares.sort_values('grupo', kind='stable')
+    cortes = np.cumsum(np.bincount(pares['grupo'], minlength=len(resumen)))[:-1]
+    vendedores = [parte.tolist() for parte in np.split(pares['vendedor'].to_numpy(), cortes)]
+
+    # Conteos de periodo del día por grupo (grupos x periodos)
+    periodos = df_logs['periodo_dia'][validas]
+    categorico = isinstance(periodos.dtype, pd.CategoricalDtype)
+    tabla = periodos.groupby(codigos, observed=False).value_counts().unstack(fill_value=0)
+    tabla = tabla.reindex(range(len(resumen)), fill_value=0)
+    etiquetas = [str(p) for p in tabla.columns]
+    conteos = tabla.to_numpy()
+    orden = np.argsort(-conteos, axis=1, kind='stable')
+    distribuciones = [
+        {etiquetas[j]: int(fila[j]) for j in indices if categorico or fila[j]}
+        for fila, indices in zip(conteos, orden)
+    ]
+
+    fecha_procesamiento = fecha_procesamiento or pd.Timestamp.now()
+    return [
+        {
+            'fecha': fecha, 'evento': evento, 'total_monto': total, 'num_eventos': num,
+            'vendedores': lista, 'distribucion_periodo': distribucion,
+            'fecha_procesamiento': fecha_procesamiento
+        }
+        for fecha, evento, total, num, lista, distribucion in zip(
+            pd.to_datetime(resumen['fecha']).tolist(), resumen['evento'].tolist(),
+            resumen['total_monto'].tolist(), resumen['num_eventos'].tolist(),
+            vendedores, distribuciones
+        )
+    ]
+
+def logs_summary_pipeline(fecha_inicio, fecha_fin, fecha_procesamiento):
+    """
+    Pipeline de agregación de MongoDB equivalente a summarize_logs
+
+    Calcula en el servidor, desde logs_ventas, el mismo resumen por fecha y
+    evento que process_logs_data + summarize_logs: la fecha y el periodo del
+    día salen del timestamp y la distribución de periodos incluye los
+    periodos sin eventos, ordenada de mayor a menor.
+
+    Args:
+        fecha_inicio (datetime): Inicio del rango (inclusive)
+        fecha_fin (datetime): Fin del rango (exclusive)
+        fecha_procesamiento (datetime): Marca de procesamiento de los documentos
+
+    Returns:
+        list: Etapas del pipeline (sin la etapa de salida)
+    """
+    hora = {'$hour': '$timestamp'}
+    periodo = {'$switch': {
+        'branches': [{'case': {'$lte': [hora, limite]}, 'then': i}
+                     for i, (limite, _) in enumerate(LOGS_PERIODS[:-1])],
+        'default': len(LOGS_PERIODS) - 1
+    }}
+    conteos = {f'periodo_{i}': {'$sum': {'$cond': [{'$eq': [periodo, i]}, 1, 0]}}
+               for i in range(len(LOGS_PERIODS))}
+    return [
+        # Usa el índice de timestamp; como groupby, descarta eventos nulos
+        {'$match': {'timestamp': {'$gte': fecha_inicio, '$lt': fecha_fin}, 'evento': {'$ne': None}}},
+        {'$group': {
+            '_id': {
+                'fecha': {'$dateFromParts': {
+                    'year': {'$year': '$timestamp'}, 'month': {'$month': '$timestamp'},
+                    'day': {'$dayOfMonth': '$timestamp'}
+                }},
+                'evento': '$evento'
+            },
+            'total_monto': {'$sum': '$total'},
+            'num_eventos': {'$sum': {'$cond': [{'$gt': ['$numero_factura', None]}, 1, 0]}},
+            'vendedores': {'$addToSet': '$vendedor'},
+            **conteos
+        }},
+        # Un documento por periodo para ordenar la distribución como value_counts
+        {'$project': {
+            'total_monto': 1, 'num_eventos': 1, 'vendedores': 1,
+            'periodos': {'$objectToArray': {nombre: f'$periodo_{i}'
+                                            for i, (_, nombre) in enumerate(LOGS_PERIODS)}}
+        }},
+        {'$unwind': {'path': '$periodos', 'includeArrayIndex': 'orden'}},
+        {'$sort': {'_id.fecha': 1, '_id.evento': 1, 'periodos.v': -1, 'orden': 1}},
+        {'$group': {
+            '_id': '$_id',
+            'total_monto': {'$first': '$total_monto'},
+            'num_eventos': {'$first': '$num_eventos'},
+            'vendedores': {'$first': '$vendedores'},
+            'periodos': {'$push': {'k': '$periodos.k', 'v': '$periodos.v'}}
+        }},
+        {'$project': {
+            '_id': 0,
+            'fecha': '$_id.fecha',
+            'evento': '$_id.evento',
+            'total_monto': 1,
+            'num_eventos': 1,
+            'vendedores': 1,
+            'distribucion_periodo': {'$arrayToObject': '$periodos'},
+            'fecha_procesamiento': {'$literal': fecha_procesamiento}
+        }}
+    ]
+
+def supports_copy(conn):
+    """Verificar si el driver de la conexión soporta COPY FROM STDIN"""
+    cursor = conn.connection.cursor()
+    try:
+        return hasattr(cursor, 'copy_expert')
+    finally:
+        cursor.close()
+
 class DataLoader:
     """Clase para cargar datos transformados a destinos finales"""
     
+    # Columnas que utiliza cada carga. El reporte de calidad se calcula sobre
+    # los datasets completos, no sobre esta proyección
+    LOAD_COLUMNS = {
+        'resumen_diario': [
+            'fecha_resumen', 'total_ventas', 'total_transacciones',
+            'productos_vendidos', 'cliente_mas_frecuente',
+            'categoria_mas_vendida', 'promedio_ticket'
+        ],
+        'analisis_inventario': [
+            'codigo_producto', 'nombre_producto', 'categoria',
+            'stock_actual', 'cantidad_vendida', 'ingresos_producto',
+            'rotacion_inventario', 'dias_stock', 'performance'
+        ],
+        'logs_processed': [
+            'fecha', 'evento', 'total', 'numero_factura', 'vendedor', 'periodo_dia'
+        ]
+    }
+    
     def __init__(self):
         self.db_config = db_config
     
+    def _bulk_insert(self, df, schema, tabla, conn=None):
+        """
+        Insertar un DataFrame en una tabla de PostgreSQL
+        
+        Usa COPY FROM STDIN (LOAD_METHOD=copy); si el driver no soporta COPY,
+        o con LOAD_METHOD=insert, usa INSERT multi-fila con to_sql.
+        
+        Args:
+            df (pd.DataFrame): Datos a insertar
+            schema (str): Esquema destino (None para tablas temporales)
+            tabla (str): Tabla destino
+            conn: Conexión con transacción abierta (por defecto se abre una)
+        
+        Returns:
+            str: Método utilizado ('copy' o 'insert')
+        """
+        if conn is None:
+            engine = self.db_config.get_postgres_engine()
+            with engine.begin() as conn:
+                return self._bulk_insert(df, schema, tabla, conn)
+        
+        if pipeline_config.load_config['method'] == 'copy':
+            if supports_copy(conn):
+                copy_dataframe(conn, df, f'{schema}.{tabla}' if schema else tabla)
+                return 'copy'
+            logger.warning("El driver no soporta COPY, se usa INSERT multi-fila")
+        
+        df.to_sql(
+            name=tabla,
+            schema=schema,
+            con=conn,
+            if_exists='append',
+            index=False,
+            method='multi'
+        )
+        return 'insert'
+    
+    def _merge_into(self, df, schema, tabla, clave, columna_actualizacion, eliminar_ausentes=False):
+        """
+        Cargar un DataFrame actualizando por clave en una sola transacción
+        
+        Los datos se cargan en bloque a una tabla temporal y se aplican con un
+        único INSERT ... ON CONFLICT DO UPDATE, sin ventana en la que la tabla
+        destino quede sin datos.
+        
+        Args:
+            df (pd.DataFrame): Datos a cargar
+            schema (str): Esquema destino
+            tabla (str): Tabla destino
+            clave (str): Columna con restricción única usada para el merge
+            columna_actualizacion (str): Columna de fecha a refrescar en cada merge
+            eliminar_ausentes (bool): Eliminar en la misma transacción las filas
+                cuya clave no viene en df (df es la foto completa de la tabla)
+        
+        Returns:
+            str: Método utilizado para la carga a la tabla temporal
+        """
+        df = df.drop_duplicates(subset=[clave], keep='last')
+        temporal = f'tmp_{tabla}'
+        columnas = ', '.join(df.columns)
+        actualizaciones = ', '.join(f'{c} = EXCLUDED.{c}' for c in df.columns if c != clave)
+        
+        engine = self.db_config.get_postgres_engine()
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE TEMP TABLE {temporal} (LIKE {schema}.{tabla} INCLUDING DEFAULTS) ON COMMIT DROP"
+            ))
+            metodo = self._bulk_insert(df, None, temporal, conn)
+            conn.execute(text(f"""
+                INSERT INTO {schema}.{tabla} ({columnas})
+                SELECT {columnas} FROM {temporal}
+                ON CONFLICT ({clave}) DO UPDATE
+                SET {actualizaciones}, {columna_actualizacion} = CURRENT_TIMESTAMP
+            """))
+            if eliminar_ausentes:
+                result = conn.execute(text(f"""
+                    DELETE FROM {schema}.{tabla} t
+                    WHERE NOT EXISTS (SELECT 1 FROM {temporal} s WHERE s.{clave} = t.{clave})
+                """))
+                logger.info(f"Eliminados {result.rowcount} registros ausentes de {schema}.{tabla}")
+        return f'merge+{metodo}'
+    
+    @instrumented
     def load_daily_summary(self, df_resumen):
         """
         Cargar resumen diario a PostgreSQL
         
+        Con LOAD_MODE=merge (por defecto) las fechas existentes se actualizan
+        en una sola transacción; con LOAD_MODE=replace se eliminan y se
+        vuelven a insertar.
+        
         Args:
             df_resumen (pd.DataFrame): DataFrame con resumen diario
         """
@@ -32,48 +332,51 @@ class DataLoader:
                 logger.warning("DataFrame de resumen diario está vacío")
                 return
             
-            # Obtener conexión
-            engine = self.db_config.get_postgres_engine()
-            
-            # Limpiar datos existentes para las fechas a cargar
-            fechas_a_cargar = df_resumen['fecha_resumen'].unique()
-            
-            with engine.connect() as conn:
-                for fecha in fechas_a_cargar:
-                    delete_query = text(
-                        "DELETE FROM analytics.resumen_ventas_diario WHERE fecha_resumen = :fecha"
-                    )
-                    conn.execute(delete_query, {"fecha": fecha})
-                conn.commit()
-                logger.info(f"Eliminados registros existentes para {len(fechas_a_cargar)} fechas")
-            
             # Preparar datos para inserción
-            df_to_load = df_resumen[[
-                'fecha_resumen', 'total_ventas', 'total_transacciones', 
-                'productos_vendidos', 'cliente_mas_frecuente', 
-                'categoria_mas_vendida', 'promedio_ticket'
-            ]].copy()
-            
-            # Cargar datos nuevos
-            df_to_load.to_sql(
-                name='resumen_ventas_diario',
-                schema='analytics',
-                con=engine,
-                if_exists='append',
-                index=False,
-                method='multi'
+            df_to_load = df_resumen[self.LOAD_COLUMNS['resumen_diario']].copy()
+            df_to_load[['total_transacciones', 'productos_vendidos']] = (
+                df_to_load[['total_transacciones', 'productos_vendidos']].round().astype('Int64')
             )
             
-            logger.info(f"Cargados {len(df_to_load)} registros de resumen diario")
+            if pipeline_config.load_config['mode'] == 'merge':
+                metodo = self._merge_into(
+                    df_to_load, 'analytics', 'resumen_ventas_diario',
+                    clave='fecha_resumen', columna_actualizacion='fecha_procesamiento'
+                )
+            else:
+                # Obtener conexión
+                engine = self.db_config.get_postgres_engine()
+                
+                # Limpiar datos existentes para las fechas a cargar
+                fechas_a_cargar = df_resumen['fecha_resumen'].unique()
+                
+                with engine.begin() as conn:
+                    for fecha in fechas_a_cargar:
+                        delete_query = text(
+                            "DELETE FROM analytics.resumen_ventas_diario WHERE fecha_resumen = :fecha"
+                        )
+                        conn.execute(delete_query, {"fecha": fecha})
+                    logger.info(f"Eliminados registros existentes para {len(fechas_a_cargar)} fechas")
+                
+                # Cargar datos nuevos
+                metodo = self._bulk_insert(df_to_load, 'analytics', 'resumen_ventas_diario')
+            
+            logger.info(f"Cargados {len(df_to_load)} registros de resumen diario ({metodo})")
             
         except Exception as e:
             logger.error(f"Error cargando resumen diario: {str(e)}")
             raise
     
+    @instrumented
     def load_inventory_analysis(self, df_analisis):
         """
         Cargar análisis de inventario a PostgreSQL
         
+        Con LOAD_MODE=merge (por defecto) los productos se actualizan por
+        codigo_producto y los que ya no están en el análisis (desactivados o
+        eliminados) se borran en la misma transacción; con LOAD_MODE=replace
+        la tabla se vacía y se recarga.
+        
         Args:
             df_analisis (pd.DataFrame): DataFrame con análisis de inventario
         """
@@ -87,56 +390,39 @@ class DataLoader:
             # Crear tabla si no existe
             engine = self.db_config.get_postgres_engine()
             
-            create_table_query = """
-            CREATE TABLE IF NOT EXISTS analytics.analisis_inventario (
-                codigo_producto VARCHAR(20) PRIMARY KEY,
-                nombre_producto VARCHAR(200),
-                categoria VARCHAR(50),
-                stock_actual INTEGER,
-                cantidad_vendida INTEGER,
-                ingresos_producto DECIMAL(12,2),
-                rotacion_inventario DECIMAL(8,4),
-                dias_stock DECIMAL(8,2),
-                performance VARCHAR(20),
-                fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """
-            
-            with engine.connect() as conn:
-                conn.execute(text(create_table_query))
-                conn.commit()
-            
-            # Limpiar tabla existente
-            with engine.connect() as conn:
-                conn.execute(text("TRUNCATE TABLE analytics.analisis_inventario"))
-                conn.commit()
+            with engine.begin() as conn:
+                conn.execute(text(CREATE_INVENTORY_ANALYSIS_TABLE))
             
             # Preparar datos para carga
-            df_to_load = df_analisis[[
-                'codigo_producto', 'nombre_producto', 'categoria',
-                'stock_actual', 'cantidad_vendida', 'ingresos_producto',
-                'rotacion_inventario', 'dias_stock', 'performance'
-            ]].copy()
+            df_to_load = df_analisis[self.LOAD_COLUMNS['analisis_inventario']].copy()
             
             # Limpiar valores infinitos
             df_to_load['dias_stock'] = df_to_load['dias_stock'].replace([float('inf')], 999)
-            
-            # Cargar datos
-            df_to_load.to_sql(
-                name='analisis_inventario',
-                schema='analytics',
-                con=engine,
-                if_exists='append',
-                index=False,
-                method='multi'
+            df_to_load[['stock_actual', 'cantidad_vendida']] = (
+                df_to_load[['stock_actual', 'cantidad_vendida']].round().astype('Int64')
             )
             
-            logger.info(f"Cargados {len(df_to_load)} registros de análisis de inventario")
+            if pipeline_config.load_config['mode'] == 'merge':
+                metodo = self._merge_into(
+                    df_to_load, 'analytics', 'analisis_inventario',
+                    clave='codigo_producto', columna_actualizacion='fecha_actualizacion',
+                    eliminar_ausentes=True
+                )
+            else:
+                # Limpiar tabla existente
+                with engine.begin() as conn:
+                    conn.execute(text("TRUNCATE TABLE analytics.analisis_inventario"))
+                
+                # Cargar datos
+                metodo = self._bulk_insert(df_to_load, 'analytics', 'analisis_inventario')
+            
+            logger.info(f"Cargados {len(df_to_load)} registros de análisis de inventario ({metodo})")
             
         except Exception as e:
             logger.error(f"Error cargando análisis de inventario: {str(e)}")
             raise
     
+    @instrumented
     def load_logs_summary(self, df_logs):
         """
         Cargar resumen de logs a MongoDB
@@ -152,40 +438,84 @@ class DataLoader:
                 return
             
             # Crear resumen por fecha y evento
-            logs_summary = df_logs.groupby(['fecha', 'evento']).agg({
-                'total': 'sum',
-                'numero_factura': 'count',
-                'vendedor': lambda x: list(set(x)),
-                'periodo_dia': lambda x: x.value_counts().to_dict()
-            }).reset_index()
-            
-            logs_summary.columns = ['fecha', 'evento', 'total_monto', 'num_eventos', 'vendedores', 'distribucion_periodo']
-            
-            # Convertir a formato para MongoDB
-            logs_records = logs_summary.to_dict('records')
-            
-            # Procesar fechas para MongoDB
-            for record in logs_records:
-                record['fecha'] = pd.to_datetime(record['fecha'])
-                record['fecha_procesamiento'] = pd.Timestamp.now()
+            logs_records = summarize_logs(df_logs)
             
             # Conectar a MongoDB y guardar
             db = self.db_config.get_mongo_database()
             collection = db['resumen_logs_diario']
+            ensure_logs_summary_indexes(collection)
             
-            # Eliminar registros existentes para las fechas
-            fechas_a_cargar = [record['fecha'] for record in logs_records]
-            collection.delete_many({'fecha': {'$in': fechas_a_cargar}})
+            # Upsert por (fecha, evento) y eliminación de los eventos de las
+            # fechas cargadas que ya no aparecen: una recarga deja el mismo
+            # estado y cada operación usa el índice (fecha, evento)
+            eventos_por_fecha = {}
+            operaciones = []
+            for record in logs_records:
+                eventos_por_fecha.setdefault(record['fecha'], []).append(record['evento'])
+                operaciones.append(ReplaceOne(
+                    {'fecha': record['fecha'], 'evento': record['evento']}, record, upsert=True
+                ))
+            for fecha, eventos in eventos_por_fecha.items():
+                operaciones.append(DeleteMany({'fecha': fecha, 'evento': {'$nin': eventos}}))
+            if not operaciones:
+                return
             
-            # Insertar nuevos registros
-            if logs_records:
-                collection.insert_many(logs_records)
-                logger.info(f"Cargados {len(logs_records)} registros de resumen de logs")
+            resultado = collection.bulk_write(operaciones, ordered=False)
+            logger.info(f"Cargados {len(logs_records)} registros de resumen de logs "
+                        f"({resultado.upserted_count} nuevos, {resultado.modified_count} actualizados, "
+                        f"{resultado.deleted_count} eliminados)")
             
         except Exception as e:
             logger.error(f"Error cargando resumen de logs: {str(e)}")
             raise
     
+    @instrumented
+    def load_logs_summary_pushdown(self, fecha_inicio, fecha_fin):
+        """
+        Calcular y cargar el resumen de logs en MongoDB (modo pushdown)
+        
+        El resumen se agrega desde logs_ventas y se escribe en
+        resumen_logs_diario con $merge, sin transferir los logs al pipeline.
+        
+        Args:
+            fecha_inicio (str): Fecha de inicio en formato 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin en formato 'YYYY-MM-DD'
+        """
+        try:
+            logger.info(f"Calculando resumen de logs en MongoDB desde {fecha_inicio} hasta {fecha_fin}")
+            
+            start_date = datetime.strptime(fecha_inicio, '%Y-%m-%d')
+            end_date = datetime.strptime(fecha_fin, '%Y-%m-%d') + timedelta(days=1)
+            fecha_procesamiento = pd.Timestamp.now().to_pydatetime()
+            
+            db = self.db_config.get_mongo_database()
+            collection = db['resumen_logs_diario']
+            ensure_logs_summary_indexes(collection)
+            
+            pipeline = logs_summary_pipeline(start_date, end_date, fecha_procesamiento)
+            pipeline.append({'$merge': {
+                'into': 'resumen_logs_diario',
+                'on': ['fecha', 'evento'],
+                'whenMatched': 'merge',
+                'whenNotMatched': 'insert'
+            }})
+            db['logs_ventas'].aggregate(pipeline, allowDiskUse=True)
+            
+            # Eventos de las fechas cargadas que ya no aparecen en los logs
+            eliminados = collection.delete_many({
+                'fecha': {'$gte': start_date, '$lt': end_date},
+                'fecha_procesamiento': {'$ne': fecha_procesamiento}
+            }).deleted_count
+            
+            cargados = collection.count_documents({'fecha': {'$gte': start_date, '$lt': end_date}})
+            logger.info(f"Cargados {cargados} registros de resumen de logs en MongoDB ({eliminados} eliminados)")
+            return cargados
+            
+        except Exception as e:
+            logger.error(f"Error cargando resumen de logs en MongoDB: {str(e)}")
+            raise
+    
+    @instrumented
     def generate_data_quality_report(self, transformed_data):
         """
         Generar reporte de calidad de datos
@@ -204,15 +534,18 @@ class DataLoader:
                 'resumen_datasets': {}
             }
             
+            config = pipeline_config.load_config
             for dataset_name, df in transformed_data.items():
                 if not df.empty:
-                    quality_report['resumen_datasets'][dataset_name] = {
-                        'total_registros': len(df),
-                        'columnas': len(df.columns),
-                        'valores_nulos': df.isnull().sum().sum(),
-                        'duplicados': df.duplicated().sum(),
-                        'memoria_mb': df.memory_usage(deep=True).sum() / 1024 / 1024
-                    }
+                    # auto: exacto en datasets pequeños, aproximado en los grandes
+                    aproximado = config['quality_mode'] == 'approximate' or (
+                        config['quality_mode'] == 'auto' and len(df) > config['quality_exact_max_rows'])
+                    if aproximado:
+                        resumen = approximate_summary(df, config['quality_sample_size'],
+                                                      config['quality_hll_precision'])
+                    else:
+                        resumen = exact_summary(df)
+                    quality_report['resumen_datasets'][dataset_name] = resumen
             
             # Guardar reporte en MongoDB
             db = self.db_config.get_mongo_database()
@@ -226,6 +559,7 @@ class DataLoader:
             logger.error(f"Error generando reporte de calidad: {str(e)}")
             raise
     
+    @instrumented
     def load_all_data(self, transformed_data):
         """
         Cargar todos los datos transformados
@@ -258,19 +592,25 @@ class DataLoader:
             raise
 
 # Función helper para Airflow
+@instrumented_task('load')
 def load_data_task(**context):
     """Task function para Airflow"""
     loader = DataLoader()
     fecha_ejecucion = context['ds']
+    db_config.reset_connection_stats()
     
     # Cargar datos transformados
     transformed_data = {}
-    data_types = ['resumen_diario', 'analisis_inventario', 'logs_processed']
+    logs_pushdown = pipeline_config.transform_config['logs_pushdown']
+    data_types = ['resumen_diario', 'analisis_inventario']
+    if not logs_pushdown:
+        data_types.append('logs_processed')
     
+    # Datasets completos: el reporte de calidad usa todas las columnas y
+    # cada carga selecciona las suyas (DataLoader.LOAD_COLUMNS)
     for data_type in data_types:
         try:
-            file_path = f'/opt/airflow/data/processed/{data_type}_{fecha_ejecucion}.csv'
-            transformed_data[data_type] = pd.read_csv(file_path)
+            transformed_data[data_type] = staging_store.read('processed', data_type, fecha_ejecucion)
             logger.info(f"Cargados datos transformados de {data_type}: {len(transformed_data[data_type])} registros")
         except FileNotFoundError:
             logger.warning(f"No se encontró archivo transformado para {data_type}")
@@ -279,4 +619,13 @@ def load_data_task(**context):
     # Cargar todos los datos
     loader.load_all_data(transformed_data)
     
+    # Resumen de logs calculado directamente en MongoDB
+    if logs_pushdown:
+        loader.load_logs_summary_pushdown(fecha_ejecucion, fecha_ejecucion)
+    
+    # Confirmar las marcas de agua sólo después de una carga exitosa
+    if pipeline_config.extract_config['incremental']:
+        WatermarkStore().confirm()
+    
+    logger.info(f"Conexiones de la tarea de carga: {db_config.get_connection_stats()}")
     return "Carga completada"
@@ -0,0 +1,349 @@
+"""
+Módulo de Métricas de Rendimiento
+Metaltronic S.A. - Pipeline ETL
+
+Instrumenta los métodos de extracción, transformación y carga. Por cada
+ejecución de un método se registra el tiempo de reloj y de CPU, las filas de
+entrada y salida, las filas por segundo, los bytes leídos y escritos y el
+pico de memoria residente del proceso.
+
+Al terminar cada tarea del DAG las métricas se guardan en MongoDB (colección
+metricas_pipeline, una entrada por etapa y `ds`) y se exportan como archivo
+de texto de Prometheus para el textfile collector de node_exporter.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.database import db_config
+from config.pipeline import pipeline_config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Métricas exportadas a Prometheus: campo del registro -> (nombre, descripción)
+PROMETHEUS_METRICS = {
+    'tiempo_s': ('metaltronic_etl_stage_duration_seconds', 'Tiempo de reloj de la etapa'),
+    'cpu_s': ('metaltronic_etl_stage_cpu_seconds', 'Tiempo de CPU del hilo de la etapa'),
+    'filas_entrada': ('metaltronic_etl_stage_rows_in', 'Filas recibidas por la etapa'),
+    'filas_salida': ('metaltronic_etl_stage_rows_out', 'Filas producidas por la etapa'),
+    'filas_por_segundo': ('metaltronic_etl_stage_rows_per_second', 'Filas procesadas por segundo'),
+    'bytes_leidos': ('metaltronic_etl_stage_bytes_read', 'Bytes leídos de archivos de staging'),
+    'bytes_escritos': ('metaltronic_etl_stage_bytes_written', 'Bytes escritos a staging y COPY'),
+    'rss_pico_bytes': ('metaltronic_etl_stage_peak_rss_bytes', 'Pico de memoria residente del proceso'),
+    'errores': ('metaltronic_etl_stage_errors', 'Ejecuciones de la etapa que fallaron')
+}
+
+
+def count_rows(valor, contar_enteros=False):
+    """
+    Contar filas de un DataFrame o de un diccionario de DataFrames
+
+    Args:
+        valor: Valor a contar
+        contar_enteros (bool): Interpretar enteros como conteos de filas
+            (funciones que devuelven el total de registros escritos)
+
+    Returns:
+        int: Número de filas (0 si el valor no representa filas)
+    """
+    if isinstance(valor, pd.DataFrame):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sum(count_rows(v, contar_enteros) for v in valor.values())
+    if contar_enteros and isinstance(valor, (int, np.integer)) and not isinstance(valor, bool):
+        return int(valor)
+    return 0
+
+
+def peak_rss_bytes():
+    """
+    Pico de memoria residente del proceso desde su inicio
+
+    Es un máximo acumulado: una etapa reporta el pico alcanzado hasta su
+    fin, por lo que refleja su consumo cuando supera al de las anteriores.
+    """
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class MetricsCollector:
+    """Clase para registrar y publicar métricas de rendimiento por etapa"""
+
+    def __init__(self, enabled=None, collection=None, textfile_dir=None):
+        config = pipeline_config.metrics_config
+        self.enabled = config['enabled'] if enabled is None else enabled
+        self.collection = collection or config['collection']
+        self.textfile_dir = textfile_dir or config['textfile_dir']
+        self.db_config = db_config
+        self._registros = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _etapas_activas(self):
+        """Pila de etapas en curso del hilo actual"""
+        if not hasattr(self._local, 'etapas'):
+            self._local.etapas = []
+        return self._local.etapas
+
+    def _nueva_etapa(self, nombre, filas_entrada=0):
+        return {
+            'etapa': nombre,
+            'estado': 'ok',
+            'inicio': datetime.now(),
+            'tiempo_s': 0.0,
+            'cpu_s': 0.0,
+            'filas_entrada': filas_entrada,
+            'filas_salida': 0,
+            'bytes_leidos': 0,
+            'bytes_escritos': 0
+        }
+
+    def _medir(self, etapa, funcion, *args, **kwargs):
+        """Ejecutar un tramo de una etapa acumulando sus tiempos"""
+        etapas = self._etapas_activas()
+        etapas.append(etapa)
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        try:
+            return funcion(*args, **kwargs)
+        except StopIteration:
+            raise
+        except Exception:
+            etapa['estado'] = 'error'
+            raise
+        finally:
+            etapa['tiempo_s'] += time.perf_counter() - inicio
+            etapa['cpu_s'] += time.thread_time() - inicio_cpu
+            etapas.pop()
+
+    def _registrar(self, etapa):
+        """Cerrar una etapa y agregarla a los registros de la tarea"""
+        filas = max(etapa['filas_entrada'], etapa['filas_salida'])
+        etapa['filas_por_segundo'] = round(filas / etapa['tiempo_s'], 1) if etapa['tiempo_s'] else 0.0
+        etapa['tiempo_s'] = round(etapa['tiempo_s'], 6)
+        etapa['cpu_s'] = round(etapa['cpu_s'], 6)
+        etapa['rss_pico_bytes'] = peak_rss_bytes()
+        with self._lock:
+            self._registros.append(etapa)
+
+    def context(self):
+        """Etapas en curso del hilo actual, para continuarlas en otro hilo (ver run_in_context)"""
+        return list(self._etapas_activas())
+
+    def run_in_context(self, etapas, funcion, *args, **kwargs):
+        """
+        Ejecutar una función en un hilo de trabajo dentro de las etapas dadas
+
+        La pila de etapas es por hilo: sin esto, los bytes registrados en
+        hilos de un ThreadPoolExecutor no se suman a la etapa que los lanzó.
+        Las etapas deben capturarse con context() en el hilo que encola.
+        """
+        propias = self._etapas_activas()
+        anteriores = list(propias)
+        propias[:] = etapas
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            propias[:] = anteriores
+
+    def record_bytes(self, leidos=0, escritos=0):
+        """
+        Sumar bytes de E/S a las etapas en curso del hilo actual
+
+        Se acumulan en todas las etapas anidadas, de modo que un método que
+        llama a otro instrumentado también reporta los bytes de este. Una
+        etapa puede recibir bytes de varios hilos (run_in_context).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            for etapa in self._etapas_activas():
+                etapa['bytes_leidos'] += int(leidos)
+                etapa['bytes_escritos'] += int(escritos)
+
+    def call(self, nombre, funcion, args, kwargs):
+        """Ejecutar una función registrando sus métricas"""
+        filas_entrada = sum(count_rows(valor) for valor in list(args) + list(kwargs.values()))
+        etapa = self._nueva_etapa(nombre, filas_entrada)
+        try:
+            resultado = self._medir(etapa, funcion, *args, **kwargs)
+            etapa['filas_salida'] = count_rows(resultado, contar_enteros=True)
+            return resultado
+        finally:
+            self._registrar(etapa)
+
+    def iterate(self, nombre, generador):
+        """
+        Recorrer un generador registrando sus métricas
+
+        Sólo se mide el tiempo dentro del generador, no el del código que
+        consume cada bloque.
+        """
+        etapa = self._nueva_etapa(nombre)
+        try:
+            while True:
+                try:
+                    bloque = self._medir(etapa, next, generador)
+                except StopIteration:
+                    return
+                etapa['filas_salida'] += count_rows(bloque, contar_enteros=True)
+                yield bloque
+        finally:
+            generador.close()
+            self._registrar(etapa)
+
+    def records(self):
+        """Copia de los registros de la tarea en curso"""
+        with self._lock:
+            return list(self._registros)
+
+    def reset(self):
+        """Descartar los registros acumulados"""
+        with self._lock:
+            self._registros = []
+
+    def summarize(self, registros=None):
+        """
+        Agregar los registros por etapa (un método puede ejecutarse varias veces)
+
+        Returns:
+            dict: Etapa -> métricas sumadas (pico de memoria: máximo)
+        """
+        resumen = {}
+        for registro in self.records() if registros is None else registros:
+            total = resumen.setdefault(registro['etapa'], {
+                'ejecuciones': 0, 'errores': 0, 'tiempo_s': 0.0, 'cpu_s': 0.0,
+                'filas_entrada': 0, 'filas_salida': 0, 'bytes_leidos': 0,
+                'bytes_escritos': 0, 'rss_pico_bytes': 0
+            })
+            total['ejecuciones'] += 1
+            total['errores'] += registro['estado'] == 'error'
+            for campo in ['tiempo_s', 'cpu_s', 'filas_entrada', 'filas_salida',
+                          'bytes_leidos', 'bytes_escritos']:
+                total[campo] += registro[campo]
+            total['rss_pico_bytes'] = max(total['rss_pico_bytes'], registro['rss_pico_bytes'])
+        for total in resumen.values():
+            filas = max(total['filas_entrada'], total['filas_salida'])
+            total['filas_por_segundo'] = round(filas / total['tiempo_s'], 1) if total['tiempo_s'] else 0.0
+        return resumen
+
+    def to_prometheus(self, tarea, registros=None):
+        """
+        Formatear las métricas de una tarea en formato de texto de Prometheus
+
+        Returns:
+            str: Contenido del archivo .prom
+        """
+        resumen = self.summarize(registros)
+        lineas = []
+        for campo, (metrica, descripcion) in PROMETHEUS_METRICS.items():
+            lineas.append(f'# HELP {metrica} {descripcion}')
+            lineas.append(f'# TYPE {metrica} gauge')
+            for etapa, total in sorted(resumen.items()):
+                lineas.append(f'{metrica}{{tarea="{tarea}",etapa="{etapa}"}} {total[campo]}')
+        lineas.append('# HELP metaltronic_etl_task_last_run_timestamp_seconds Fin de la última ejecución de la tarea')
+        lineas.append('# TYPE metaltronic_etl_task_last_run_timestamp_seconds gauge')
+        lineas.append(f'metaltronic_etl_task_last_run_timestamp_seconds{{tarea="{tarea}"}} {time.time():.3f}')
+        return '\n'.join(lineas) + '\n'
+
+    def write_textfile(self, tarea, registros=None):
+        """
+        Escribir el archivo de Prometheus de una tarea (reemplazo atómico)
+
+        Returns:
+            str: Ruta del archivo escrito
+        """
+        os.makedirs(self.textfile_dir, exist_ok=True)
+        path = os.path.join(self.textfile_dir, f'metaltronic_etl_{tarea}.prom')
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as archivo:
+            archivo.write(self.to_prometheus(tarea, registros))
+        os.replace(f'{path}.tmp', path)
+        return path
+
+    def flush(self, tarea, ds=None, run_id=None):
+        """
+        Publicar las métricas de la tarea en MongoDB y Prometheus
+
+        Un error al publicar se registra pero no interrumpe la tarea: las
+        métricas no deben hacer fallar una carga de datos correcta.
+
+        Args:
+            tarea (str): Nombre de la tarea ('extract', 'transform', 'load', ...)
+            ds (str): Fecha de ejecución del DAG
+            run_id (str): Identificador de la ejecución del DAG
+        """
+        registros = self.records()
+        self.reset()
+        if not registros:
+            return
+
+        documentos = [{'ds': ds, 'run_id': run_id, 'tarea': tarea, **registro} for registro in registros]
+        try:
+            db = self.db_config.get_mongo_database()
+            db[self.collection].insert_many(documentos)
+        except Exception as e:
+            logger.error(f"Error guardando métricas en MongoDB: {str(e)}")
+
+        try:
+            path = self.write_textfile(tarea, registros)
+            logger.info(f"Métricas de {tarea} exportadas a {path}")
+        except Exception as e:
+            logger.error(f"Error exportando métricas a Prometheus: {str(e)}")
+
+# Instancia global de métricas
+metrics_collector = MetricsCollector()
+
+def instrumented(funcion):
+    """
+    Decorador que registra las métricas de cada llamada a un método
+
+    La etapa se nombra con el nombre calificado de la función
+    (por ejemplo 'DataTransformer.clean_sales_data'). Los generadores se
+    miden bloque a bloque.
+    """
+    nombre = funcion.__qualname__
+
+    if inspect.isgeneratorfunction(funcion):
+        @functools.wraps(funcion)
+        def envoltura_generador(*args, **kwargs):
+            if not metrics_collector.enabled:
+                return funcion(*args, **kwargs)
+            return metrics_collector.iterate(nombre, funcion(*args, **kwargs))
+        return envoltura_generador
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not metrics_collector.enabled:
+            return funcion(*args, **kwargs)
+        return metrics_collector.call(nombre, funcion, args, kwargs)
+    return envoltura
+
+def instrumented_task(tarea):
+    """
+    Decorador para las task functions de Airflow
+
+    Mide la tarea completa como una etapa más y, al terminar (también si
+    falla), publica las métricas de todas sus etapas con el `ds` del contexto.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(**context):
+            if not metrics_collector.enabled:
+                return funcion(**context)
+            metrics_collector.reset()
+            try:
+                return metrics_collector.call(funcion.__name__, funcion, (), context)
+            finally:
+                metrics_collector.flush(tarea, context.get('ds'), context.get('run_id'))
+        return envoltura
+    return decorador
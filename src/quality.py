@@ -0,0 +1,206 @@
+"""
+Módulo de Métricas de Calidad de Datos
+Metaltronic S.A. - Pipeline ETL
+
+Calcula el resumen de calidad de cada dataset para el reporte que guarda
+DataLoader.generate_data_quality_report, en dos modos:
+
+- exacto: duplicados con df.duplicated() y memoria con
+  memory_usage(deep=True), que recorre cada objeto Python.
+- aproximado: duplicados por huellas hash de filas, valores distintos por
+  columna con HyperLogLog y memoria de las columnas de objetos estimada sobre
+  una muestra. Cada estimación se reporta con su cota de error.
+
+Todos los valores devueltos son tipos nativos de Python (serializables a BSON).
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+# Bits de hash usados por las huellas de fila y los sketches
+HASH_BITS = 64
+
+
+def column_hashes(serie):
+    """
+    Calcular la huella hash de 64 bits de cada valor de una columna
+
+    Las columnas con valores no hashables (por ejemplo listas) se convierten
+    a texto antes de calcular la huella.
+    """
+    try:
+        return pd.util.hash_pandas_object(serie, index=False).to_numpy()
+    except TypeError:
+        return pd.util.hash_pandas_object(serie.astype(str), index=False).to_numpy()
+
+
+def combine_hashes(fila, columna):
+    """Combinar la huella acumulada de cada fila con la de una columna más"""
+    with np.errstate(over='ignore'):
+        return fila ^ (columna + np.uint64(0x9E3779B97F4A7C15)
+                       + (fila << np.uint64(6)) + (fila >> np.uint64(2)))
+
+
+class HyperLogLog:
+    """
+    Sketch HyperLogLog para estimar valores distintos
+
+    Usa 2^precision registros; el error relativo estándar es
+    1.04 / sqrt(2^precision) (0.81% con precisión 14). Los sketches con la
+    misma precisión se pueden combinar.
+    """
+
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("La precisión de HyperLogLog debe estar entre 4 y 18")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registros = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Error relativo estándar de la estimación"""
+        return 1.04 / np.sqrt(self.m)
+
+    def add_hashes(self, hashes):
+        """Agregar huellas hash de 64 bits (np.uint64)"""
+        if len(hashes) == 0:
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bits_resto = HASH_BITS - self.precision
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+
+        # Posición del primer bit en 1 de los bits restantes (exacto en
+        # float64 porque el resto tiene a lo sumo 60 bits y sólo importa su
+        # potencia de dos más alta)
+        rangos = np.full(len(hashes), bits_resto + 1, dtype=np.uint8)
+        distintos_de_cero = resto > 0
+        rangos[distintos_de_cero] = (
+            bits_resto - np.floor(np.log2(resto[distintos_de_cero].astype(np.float64)))
+        ).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rangos)
+        return self
+
+    def merge(self, otro):
+        """Combinar con otro sketch de la misma precisión"""
+        if otro.precision != self.precision:
+            raise ValueError("Sólo se pueden combinar sketches con la misma precisión")
+        np.maximum(self.registros, otro.registros, out=self.registros)
+        return self
+
+    def count(self):
+        """Estimar el número de valores distintos"""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimacion = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = int(np.count_nonzero(self.registros == 0))
+        # Corrección para cardinalidades bajas (linear counting)
+        if estimacion <= 2.5 * self.m and vacios:
+            estimacion = self.m * np.log(self.m / vacios)
+        return int(round(estimacion))
+
+
+def exact_summary(df):
+    """
+    Resumen de calidad exacto de un dataset
+
+    Returns:
+        dict: Registros, columnas, nulos, duplicados y memoria en MB
+    """
+    return {
+        'modo': 'exacto',
+        'total_registros': int(len(df)),
+        'columnas': int(len(df.columns)),
+        'valores_nulos': int(df.isnull().sum().sum()),
+        'duplicados': int(df.duplicated().sum()),
+        'memoria_mb': float(df.memory_usage(deep=True).sum() / 1024 / 1024)
+    }
+
+
+def estimate_memory(df, sample_size, seed=0):
+    """
+    Estimar la memoria de un DataFrame midiendo los objetos sobre una muestra
+
+    Las columnas de tipos nativos se miden exactas; en las columnas de
+    objetos Python se mide el tamaño de los objetos de una muestra aleatoria
+    y se extrapola al total.
+
+    Returns:
+        tuple: (bytes estimados, semiamplitud del intervalo de confianza del
+            95% en bytes)
+    """
+    total = int(df.memory_usage(index=True, deep=False).sum())
+    columnas_objeto = [c for c in df.columns if df[c].dtype == object]
+    n = len(df)
+    if not columnas_objeto or n == 0:
+        return total, 0.0
+
+    k = min(sample_size, n)
+    posiciones = np.random.default_rng(seed).choice(n, size=k, replace=False)
+    muestra = df[columnas_objeto].iloc[posiciones]
+
+    # Tamaño de los objetos de todas las columnas de objetos, por fila
+    por_fila = np.zeros(k)
+    for columna in columnas_objeto:
+        por_fila += np.fromiter((sys.getsizeof(v) for v in muestra[columna].to_numpy()),
+                                dtype=np.float64, count=k)
+
+    total += n * por_fila.mean()
+    if k == n:
+        return int(total), 0.0
+    correccion = np.sqrt((n - k) / (n - 1))
+    error = 1.96 * n * por_fila.std(ddof=1) / np.sqrt(k) * correccion
+    return int(total), float(error)
+
+
+def approximate_summary(df, sample_size=10000, precision=14, seed=0):
+    """
+    Resumen de calidad aproximado de un dataset
+
+    Args:
+        df (pd.DataFrame): Dataset
+        sample_size (int): Filas muestreadas para estimar la memoria
+        precision (int): Precisión de los sketches HyperLogLog
+        seed (int): Semilla del muestreo (reportes reproducibles)
+
+    Returns:
+        dict: Resumen con las estimaciones y sus cotas de error
+    """
+    n = len(df)
+    nulos = df.isnull().sum()
+
+    # Una pasada de hash por columna alimenta el sketch de la columna y la
+    # huella de fila usada para contar duplicados
+    filas = np.zeros(n, dtype=np.uint64)
+    distintos = {}
+    error_distintos = 0.0
+    for columna in df.columns:
+        hashes = column_hashes(df[columna])
+        filas = combine_hashes(filas, hashes)
+        if nulos[columna]:
+            hashes = hashes[df[columna].notna().to_numpy()]
+        sketch = HyperLogLog(precision).add_hashes(hashes)
+        distintos[str(columna)] = sketch.count()
+        error_distintos = sketch.relative_error
+
+    duplicados = n - len(pd.unique(filas))
+    # Pares de filas distintas con la misma huella (colisiones) esperados
+    colisiones = n * (n - 1) / 2 / 2 ** HASH_BITS
+
+    memoria, error_memoria = estimate_memory(df, sample_size, seed)
+
+    return {
+        'modo': 'aproximado',
+        'total_registros': int(n),
+        'columnas': int(len(df.columns)),
+        'valores_nulos': int(nulos.sum()),
+        'nulos_por_columna': {str(c): int(v) for c, v in nulos.items()},
+        'duplicados': int(duplicados),
+        'duplicados_colisiones_esperadas': float(colisiones),
+        'valores_distintos': distintos,
+        'valores_distintos_error_relativo': float(error_distintos),
+        'memoria_mb': memoria / 1024 / 1024,
+        'memoria_mb_error_95': error_memoria / 1024 / 1024,
+        'memoria_filas_muestra': int(min(sample_size, n))
+    }
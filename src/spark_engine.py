@@ -0,0 +1,370 @@
+"""
+Módulo del Motor Spark para Backfills
+Metaltronic S.A. - Pipeline ETL
+
+Implementación en PySpark de la extracción y transformación de ventas para
+reprocesar rangos de varios años. Las ventas se leen de PostgreSQL por JDBC
+en particiones paralelas (por fecha_venta o id_transaccion) y el resumen
+diario y el análisis de inventario se calculan con agregaciones de Spark
+equivalentes a DataTransformer.aggregate_daily_sales y
+analyze_inventory_trends. Sólo los resultados (una fila por día y por
+producto) pasan a pandas para cargarse con DataLoader.
+
+Con SPARK_MASTER=local[*] se ejecuta en un solo equipo con todos sus núcleos;
+con la URL de un cluster (spark://..., yarn, k8s://...) el mismo código
+escala horizontalmente. Se selecciona con el parámetro `motor` del DAG de
+backfill o con `python -m src.backfill --motor spark`.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from pyspark import StorageLevel
+from pyspark.sql import SparkSession, Window, functions as F
+from sqlalchemy import text
+from config.database import db_config
+from config.pipeline import pipeline_config
+from src.extract import SALES_FROM_TEMPLATE, INVENTORY_QUERY
+from src.load import DataLoader
+from src.metrics import instrumented
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columnas de ventas usadas por las agregaciones. id_detalle reproduce el
+# orden de SALES_QUERY_TEMPLATE para resolver empates por primera aparición
+# (la consulta no lleva ORDER BY: Spark lee las particiones en paralelo)
+SPARK_SALES_QUERY_TEMPLATE = """
+SELECT
+    t.id_transaccion,
+    dv.id_detalle,
+    t.fecha_venta,
+    c.nombre_cliente,
+    p.codigo_producto,
+    p.categoria,
+    dv.cantidad,
+    dv.subtotal,
+    t.total as total_factura,
+    t.vendedor
+""" + SALES_FROM_TEMPLATE
+
+SALES_ID_BOUNDS_QUERY = """
+SELECT MIN(id_transaccion), MAX(id_transaccion)
+FROM ventas.transacciones
+WHERE fecha_venta BETWEEN :desde AND :hasta
+"""
+
+PARTITION_COLUMNS = ['fecha_venta', 'id_transaccion']
+
+PERFORMANCE_LEVELS = [(0.1, 'Bajo'), (0.5, 'Medio'), (1.0, 'Alto'), (float('inf'), 'Muy Alto')]
+
+
+def get_spark_session(master=None):
+    """
+    Obtener (o crear) la sesión de Spark del proceso
+
+    Args:
+        master (str): URL del master; por defecto SPARK_MASTER
+
+    Returns:
+        SparkSession: Sesión con el driver JDBC de PostgreSQL y Arrow habilitado
+    """
+    config = pipeline_config.spark_config
+    return (
+        SparkSession.builder
+        .appName('metaltronic_backfill')
+        .master(master or config['master'])
+        .config('spark.jars', config['jars'])
+        .config('spark.driver.memory', config['driver_memory'])
+        .config('spark.sql.shuffle.partitions', str(config['shuffle_partitions']))
+        .config('spark.sql.execution.arrow.pyspark.enabled', 'true')
+        .getOrCreate()
+    )
+
+
+def _top_value(ventas, columna, orden_alfabetico=False):
+    """
+    Valor más frecuente por fecha; ante empates gana la primera aparición
+    (menor id_transaccion, id_detalle) o el primero alfabéticamente
+    """
+    conteos = (
+        ventas.where(F.col(columna).isNotNull())
+        .groupBy('fecha_venta', columna)
+        .agg(F.count(F.lit(1)).alias('conteo'),
+             F.min(F.struct('id_transaccion', 'id_detalle')).alias('primera'))
+    )
+    desempate = F.col(columna) if orden_alfabetico else F.col('primera')
+    ventana = Window.partitionBy('fecha_venta').orderBy(F.desc('conteo'), desempate)
+    return (
+        conteos.withColumn('posicion', F.row_number().over(ventana))
+        .where(F.col('posicion') == 1)
+        .select('fecha_venta', columna)
+    )
+
+
+class SparkEngine:
+    """Clase para reconstruir el resumen diario de un rango de fechas con Spark"""
+
+    def __init__(self, master=None, particiones=None, conexiones=None, partition_column=None):
+        config = pipeline_config.spark_config
+        self.db_config = db_config
+        self.master = master or config['master']
+        # Cada partición JDBC abre una conexión: se limitan al presupuesto de
+        # conexiones, reservando una para el inventario y la carga
+        conexiones = conexiones or pipeline_config.backfill_config['db_connections']
+        self.particiones = max(1, min(particiones or config['jdbc_partitions'], conexiones - 1))
+        self.partition_column = partition_column or config['partition_column']
+        self.last_backfill_stats = {}
+
+        if self.partition_column not in PARTITION_COLUMNS:
+            raise ValueError(
+                f"Columna de partición no soportada: {self.partition_column}. "
+                f"Opciones: {', '.join(PARTITION_COLUMNS)}"
+            )
+
+    def _jdbc_options(self):
+        config = pipeline_config.spark_config
+        return {
+            'url': self.db_config.get_postgres_jdbc_url(),
+            'user': self.db_config.postgres_config['user'],
+            'password': self.db_config.postgres_config['password'],
+            'driver': 'org.postgresql.Driver',
+            'fetchsize': str(config['fetch_size'])
+        }
+
+    def _partition_bounds(self, fecha_inicio, fecha_fin):
+        """
+        Límites de la columna de partición para el rango
+
+        Returns:
+            tuple: (inferior, superior), o None si no hay ventas en el rango
+        """
+        if self.partition_column == 'fecha_venta':
+            fin = datetime.strptime(fecha_fin, '%Y-%m-%d') + timedelta(days=1)
+            return fecha_inicio, fin.strftime('%Y-%m-%d')
+
+        engine = self.db_config.get_postgres_engine()
+        with engine.connect() as conn:
+            minimo, maximo = conn.execute(
+                text(SALES_ID_BOUNDS_QUERY), {'desde': fecha_inicio, 'hasta': fecha_fin}
+            ).fetchone()
+        if minimo is None:
+            return None
+        return str(minimo), str(maximo + 1)
+
+    def read_sales(self, spark, fecha_inicio, fecha_fin):
+        """
+        Leer las líneas de ventas de un rango por JDBC en particiones paralelas
+
+        Args:
+            spark (SparkSession): Sesión de Spark
+            fecha_inicio (str): Fecha de inicio 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin 'YYYY-MM-DD' (incluida)
+
+        Returns:
+            pyspark.sql.DataFrame: Ventas con los importes como double, o
+                None si no hay ventas en el rango
+        """
+        # Las fechas se validan antes de incluirlas en la consulta
+        for fecha in (fecha_inicio, fecha_fin):
+            datetime.strptime(fecha, '%Y-%m-%d')
+        limites = self._partition_bounds(fecha_inicio, fecha_fin)
+        if limites is None:
+            return None
+
+        query = SPARK_SALES_QUERY_TEMPLATE.format(
+            filtro=f"t.fecha_venta BETWEEN '{fecha_inicio}' AND '{fecha_fin}' "
+                   "AND t.numero_factura IS NOT NULL"
+        )
+        ventas = (
+            spark.read.format('jdbc')
+            .options(**self._jdbc_options())
+            .option('dbtable', f'({query}) ventas')
+            .option('partitionColumn', self.partition_column)
+            .option('lowerBound', limites[0])
+            .option('upperBound', limites[1])
+            .option('numPartitions', self.particiones)
+            .load()
+        )
+        # Como clean_sales_data: importes DECIMAL como flotantes
+        return ventas.select(
+            'id_transaccion', 'id_detalle', 'fecha_venta', 'nombre_cliente', 'codigo_producto',
+            'categoria', 'vendedor', 'cantidad',
+            F.col('subtotal').cast('double').alias('subtotal'),
+            F.col('total_factura').cast('double').alias('total_factura')
+        )
+
+    def read_inventory(self, spark):
+        """Leer el inventario activo por JDBC (una sola partición)"""
+        return (
+            spark.read.format('jdbc')
+            .options(**self._jdbc_options())
+            .option('query', INVENTORY_QUERY)
+            .load()
+        )
+
+    @instrumented
+    def aggregate_daily_sales(self, ventas):
+        """
+        Crear el resumen diario de ventas (como DataTransformer.aggregate_daily_sales)
+
+        Args:
+            ventas (pyspark.sql.DataFrame): Ventas de read_sales
+
+        Returns:
+            pd.DataFrame: Resumen diario de ventas
+        """
+        try:
+            totales = ventas.groupBy('fecha_venta').agg(
+                F.sum('total_factura').alias('total_ventas'),
+                F.avg('total_factura').alias('promedio_ticket'),
+                F.count('total_factura').alias('total_transacciones'),
+                F.sum('cantidad').alias('productos_vendidos'),
+                F.countDistinct('nombre_cliente').alias('clientes_unicos')
+            )
+            resumen = (
+                totales
+                .join(_top_value(ventas, 'categoria')
+                      .withColumnRenamed('categoria', 'categoria_mas_vendida'), 'fecha_venta', 'left')
+                .join(_top_value(ventas, 'vendedor')
+                      .withColumnRenamed('vendedor', 'vendedor_top'), 'fecha_venta', 'left')
+                .join(_top_value(ventas, 'nombre_cliente', orden_alfabetico=True)
+                      .withColumnRenamed('nombre_cliente', 'cliente_mas_frecuente'), 'fecha_venta', 'left')
+                .withColumnRenamed('fecha_venta', 'fecha_resumen')
+                .orderBy('fecha_resumen')
+            )
+
+            daily_summary = resumen.toPandas()
+            daily_summary['fecha_resumen'] = pd.to_datetime(daily_summary['fecha_resumen'])
+            daily_summary['fecha_procesamiento'] = datetime.now()
+
+            logger.info(f"Resumen diario creado con Spark: {len(daily_summary)} días")
+            return daily_summary
+
+        except Exception as e:
+            logger.error(f"Error creando resumen diario con Spark: {str(e)}")
+            raise
+
+    def summarize_product_sales(self, ventas):
+        """Ventas por producto (como DataTransformer.summarize_product_sales)"""
+        return (
+            ventas.where(F.col('codigo_producto').isNotNull())
+            .groupBy('codigo_producto')
+            .agg(
+                F.sum('cantidad').alias('cantidad_vendida'),
+                F.sum('subtotal').alias('ingresos_producto'),
+                F.countDistinct('id_transaccion').alias('num_transacciones')
+            )
+        )
+
+    @instrumented
+    def analyze_inventory_trends(self, inventario, ventas_producto):
+        """
+        Analizar inventario vs ventas (como DataTransformer.analyze_inventory_trends)
+
+        Args:
+            inventario (pyspark.sql.DataFrame): Inventario de read_inventory
+            ventas_producto (pyspark.sql.DataFrame): Ventas por producto
+
+        Returns:
+            pd.DataFrame: Análisis de inventario
+        """
+        try:
+            analisis = (
+                inventario.join(ventas_producto, 'codigo_producto', 'left')
+                .fillna(0, subset=['cantidad_vendida', 'ingresos_producto', 'num_transacciones'])
+            )
+            # Las divisiones por cero dan null en Spark (infinito o NaN en
+            # pandas, que se reemplazan por los mismos valores)
+            analisis = analisis.withColumn(
+                'rotacion_inventario',
+                F.coalesce(F.col('cantidad_vendida') / F.col('stock_actual'), F.lit(0.0))
+            ).withColumn(
+                'dias_stock',
+                F.coalesce(F.col('stock_actual') / F.col('cantidad_vendida') * 30, F.lit(999.0))
+            )
+
+            (limite, etiqueta), *resto = PERFORMANCE_LEVELS
+            performance = F.when(F.col('rotacion_inventario') <= limite, etiqueta)
+            for limite, etiqueta in resto:
+                performance = performance.when(F.col('rotacion_inventario') <= limite, etiqueta)
+            analisis = analisis.withColumn('performance', performance)
+
+            # Orden de INVENTORY_QUERY
+            inventory_analysis = analisis.orderBy('categoria', 'codigo_producto').toPandas()
+            inventory_analysis['performance'] = pd.Categorical(
+                inventory_analysis['performance'],
+                categories=[etiqueta for _, etiqueta in PERFORMANCE_LEVELS], ordered=True
+            )
+
+            logger.info(f"Análisis de inventario completado con Spark: {len(inventory_analysis)} productos")
+            return inventory_analysis
+
+        except Exception as e:
+            logger.error(f"Error analizando inventario con Spark: {str(e)}")
+            raise
+
+    @instrumented
+    def run(self, fecha_inicio, fecha_fin, incluir_inventario=False):
+        """
+        Ejecutar el backfill de un rango de fechas con Spark
+
+        Args:
+            fecha_inicio (str): Fecha de inicio 'YYYY-MM-DD'
+            fecha_fin (str): Fecha de fin 'YYYY-MM-DD'
+            incluir_inventario (bool): Recalcular también analytics.analisis_inventario
+                con las ventas de todo el rango
+
+        Returns:
+            dict: Estadísticas del backfill
+        """
+        try:
+            if fecha_fin < fecha_inicio:
+                raise ValueError(f"Rango de fechas inválido: {fecha_inicio} > {fecha_fin}")
+            logger.info(
+                f"Backfill con Spark ({self.master}) de {fecha_inicio} a {fecha_fin}: "
+                f"{self.particiones} particiones JDBC por {self.partition_column}"
+            )
+
+            inicio = time.perf_counter()
+            spark = get_spark_session(self.master)
+            ventas = self.read_sales(spark, fecha_inicio, fecha_fin)
+
+            resumen, analisis = pd.DataFrame(), pd.DataFrame()
+            if ventas is not None:
+                # El resumen y las ventas por producto leen las ventas una sola vez
+                ventas = ventas.persist(StorageLevel.MEMORY_AND_DISK)
+                try:
+                    resumen = self.aggregate_daily_sales(ventas)
+                    if incluir_inventario:
+                        analisis = self.analyze_inventory_trends(
+                            self.read_inventory(spark), self.summarize_product_sales(ventas)
+                        )
+                finally:
+                    ventas.unpersist()
+            tiempo_spark = time.perf_counter() - inicio
+
+            loader = DataLoader()
+            loader.load_daily_summary(resumen)
+            if incluir_inventario:
+                loader.load_inventory_analysis(analisis)
+
+            self.last_backfill_stats = {
+                'fecha_inicio': fecha_inicio,
+                'fecha_fin': fecha_fin,
+                'particiones': self.particiones,
+                'master': self.master,
+                'modo': 'spark',
+                'dias_cargados': len(resumen),
+                'productos_cargados': len(analisis),
+                'tiempo_spark_s': round(tiempo_spark, 3),
+                'tiempo_total_s': round(time.perf_counter() - inicio, 3)
+            }
+            logger.info(f"Backfill completado: {self.last_backfill_stats}")
+            return self.last_backfill_stats
+
+        except Exception as e:
+            logger.error(f"Error en backfill con Spark: {str(e)}")
+            raise
@@ -0,0 +1,251 @@
+"""
+Módulo de Staging de Datos
+Metaltronic S.A. - Pipeline ETL
+
+Almacena los datasets intermedios que se intercambian las tareas del DAG.
+El formato por defecto es Parquet (columnar, comprimido y con tipos); CSV
+se mantiene como opción de compatibilidad.
+"""
+
+import os
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config.pipeline import pipeline_config
+from src.metrics import metrics_collector
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Extensión de archivo por formato soportado
+STAGING_FORMATS = {
+    'parquet': '.parquet',
+    'csv': '.csv'
+}
+
+
+def _to_arrow_table(df):
+    """
+    Convertir un DataFrame a tabla Arrow
+
+    Las columnas de objetos que Arrow no puede representar (por ejemplo
+    ObjectId de MongoDB) se convierten a texto, igual que al escribir CSV.
+    """
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _widen_schema(schema):
+    """
+    Ampliar un esquema inferido del primer bloque para admitir los siguientes
+
+    Los decimales se llevan a la precisión máxima (conservando la escala) y
+    las columnas completamente nulas se tratan como texto.
+    """
+    fields = []
+    for field in schema:
+        if pa.types.is_decimal(field.type):
+            field = field.with_type(pa.decimal128(38, field.type.scale))
+        elif pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class StagingWriter:
+    """Escritor incremental de un dataset de staging (por bloques)"""
+
+    def __init__(self, path, formato, compression):
+        self.path = path
+        self.formato = formato
+        self.compression = compression
+        self.total_registros = 0
+        # Temporal por proceso: varios workers pueden publicar el mismo dataset
+        self._tmp_path = f'{path}.{os.getpid()}.tmp'
+        self._parquet_writer = None
+
+    def write(self, df):
+        """Agregar un bloque de datos al archivo"""
+        if df.empty:
+            return
+
+        if self.formato == 'parquet':
+            if self._parquet_writer is None:
+                table = _to_arrow_table(df)
+                self._schema = _widen_schema(table.schema)
+                self._parquet_writer = pq.ParquetWriter(
+                    self._tmp_path, self._schema, compression=self.compression
+                )
+            table = _to_arrow_table(df).cast(self._schema)
+            self._parquet_writer.write_table(table)
+        else:
+            primer_bloque = self.total_registros == 0
+            df.to_csv(self._tmp_path, mode='w' if primer_bloque else 'a',
+                      header=primer_bloque, index=False)
+
+        self.total_registros += len(df)
+
+    def close(self, publicar=True):
+        """Cerrar el archivo y publicarlo sólo si está completo"""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+        if publicar and self.total_registros:
+            os.replace(self._tmp_path, self.path)
+            metrics_collector.record_bytes(escritos=os.path.getsize(self.path))
+        elif os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(publicar=exc_type is None)
+        return False
+
+
+class StagingStore:
+    """Clase para guardar y leer datasets intermedios entre tareas"""
+
+    def __init__(self, base_dir=None, formato=None, compression=None):
+        config = pipeline_config.staging_config
+        self.base_dir = base_dir or config['base_dir']
+        self.formato = formato or config['format']
+        self.compression = compression or config['compression']
+
+        if self.formato not in STAGING_FORMATS:
+            raise ValueError(
+                f"Formato de staging no soportado: {self.formato}. "
+                f"Opciones: {', '.join(STAGING_FORMATS)}"
+            )
+
+    def path(self, etapa, nombre, fecha=None, formato=None):
+        """
+        Construir la ruta de un dataset de staging
+
+        Args:
+            etapa (str): Etapa del pipeline ('raw', 'processed', ...)
+            nombre (str): Nombre del dataset
+            fecha (str): Fecha de ejecución 'YYYY-MM-DD' (opcional)
+            formato (str): Formato del archivo (por defecto el configurado)
+
+        Returns:
+            str: Ruta del archivo
+        """
+        formato = formato or self.formato
+        archivo = f'{nombre}_{fecha}' if fecha else nombre
+        return os.path.join(self.base_dir, etapa, f'{archivo}{STAGING_FORMATS[formato]}')
+
+    def find(self, etapa, nombre, fecha=None):
+        """
+        Buscar un dataset existente, priorizando el formato configurado
+
+        Returns:
+            tuple: (ruta, formato) o (None, None) si no existe
+        """
+        formatos = [self.formato] + [f for f in STAGING_FORMATS if f != self.formato]
+        for formato in formatos:
+            path = self.path(etapa, nombre, fecha, formato)
+            if os.path.exists(path):
+                return path, formato
+        return None, None
+
+    def exists(self, etapa, nombre, fecha=None):
+        """Verificar si existe un dataset de staging"""
+        return self.find(etapa, nombre, fecha)[0] is not None
+
+    def open_writer(self, etapa, nombre, fecha=None):
+        """
+        Abrir un escritor incremental para un dataset
+
+        Returns:
+            StagingWriter: Escritor a usar como context manager
+        """
+        path = self.path(etapa, nombre, fecha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return StagingWriter(path, self.formato, self.compression)
+
+    def write(self, df, etapa, nombre, fecha=None):
+        """
+        Guardar un DataFrame completo en staging
+
+        Returns:
+            str: Ruta del archivo escrito
+        """
+        with self.open_writer(etapa, nombre, fecha) as writer:
+            writer.write(df)
+        return writer.path
+
+    def read(self, etapa, nombre, fecha=None, columns=None):
+        """
+        Leer un dataset de staging
+
+        Args:
+            etapa (str): Etapa del pipeline
+            nombre (str): Nombre del dataset
+            fecha (str): Fecha de ejecución (opcional)
+            columns (list): Columnas a leer; las que no existan se omiten
+
+        Returns:
+            pd.DataFrame: Datos leídos
+
+        Raises:
+            FileNotFoundError: Si el dataset no existe en ningún formato
+        """
+        path, formato = self.find(etapa, nombre, fecha)
+        if path is None:
+            raise FileNotFoundError(self.path(etapa, nombre, fecha))
+        metrics_collector.record_bytes(leidos=os.path.getsize(path))
+
+        if formato == 'parquet':
+            if columns is not None:
+                disponibles = set(pq.read_schema(path).names)
+                columns = [c for c in columns if c in disponibles]
+            return pq.read_table(path, columns=columns).to_pandas()
+
+        if columns is not None:
+            seleccion = set(columns)
+            return pd.read_csv(path, usecols=lambda c: c in seleccion)
+        return pd.read_csv(path)
+
+    def read_chunks(self, etapa, nombre, fecha=None, chunk_size=100000):
+        """
+        Leer un dataset de staging por bloques
+
+        Args:
+            etapa (str): Etapa del pipeline
+            nombre (str): Nombre del dataset
+            fecha (str): Fecha de ejecución (opcional)
+            chunk_size (int): Registros por bloque
+
+        Yields:
+            pd.DataFrame: Bloques de datos en el orden del archivo
+
+        Raises:
+            FileNotFoundError: Si el dataset no existe en ningún formato
+        """
+        path, formato = self.find(etapa, nombre, fecha)
+        if path is None:
+            raise FileNotFoundError(self.path(etapa, nombre, fecha))
+        metrics_collector.record_bytes(leidos=os.path.getsize(path))
+
+        if formato == 'parquet':
+            archivo = pq.ParquetFile(path)
+            for batch in archivo.iter_batches(batch_size=chunk_size):
+                yield pa.Table.from_batches([batch]).to_pandas()
+        else:
+            yield from pd.read_csv(path, chunksize=chunk_size)
+
+# Instancia global de staging
+staging_store = StagingStore()
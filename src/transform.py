@@ -7,23 +7,252 @@ import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+from src.metrics import instrumented, instrumented_task
+from src.transform_cache import TransformCache
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columnas de baja cardinalidad que se representan como categóricas en el
+# esquema compacto de ventas
+COMPACT_CATEGORY_COLUMNS = [
+    'nombre_cliente', 'ciudad', 'provincia', 'codigo_producto', 'nombre_producto',
+    'categoria', 'material', 'metodo_pago', 'vendedor', 'sucursal', 'tipo_pago',
+    'dia_semana'
+]
+
+# Tipos de ancho fijo para identificadores y partes de fecha. Las cantidades
+# se mantienen en int64 para que las sumas agregadas no cambien de tipo.
+COMPACT_DTYPES = {
+    'id_transaccion': 'int32',
+    'año': 'int16',
+    'mes': 'int8',
+    'trimestre': 'int8'
+}
+
+# Periodos del día de los logs: última hora (inclusive) de cada periodo
+LOGS_PERIODS = [(6, 'Madrugada'), (12, 'Mañana'), (18, 'Tarde'), (24, 'Noche')]
+
+def memory_mb(df):
+    """Memoria ocupada por un DataFrame en MB (incluye objetos Python)"""
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+def compact_sales_frame(df):
+    """
+    Convertir las ventas limpias a un esquema compacto en memoria
+    
+    Las columnas de texto de baja cardinalidad pasan a categóricas y los
+    identificadores y partes de fecha a enteros pequeños. Los valores no
+    cambian, sólo su representación.
+    
+    Args:
+        df (pd.DataFrame): Ventas limpias
+    
+    Returns:
+        pd.DataFrame: Ventas con tipos compactos
+    """
+    df = df.copy(deep=False)
+    for col in COMPACT_CATEGORY_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    for col, dtype in COMPACT_DTYPES.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            info = np.iinfo(dtype)
+            if df[col].empty or (df[col].min() >= info.min and df[col].max() <= info.max):
+                df[col] = df[col].astype(dtype)
+    return df
+
+def counts_by_date(df, columna, orden_alfabetico=False):
+    """
+    Contar las ocurrencias de cada valor de una columna por fecha de venta
+    
+    Args:
+        df (pd.DataFrame): Ventas con columna 'fecha_venta'
+        columna (str): Columna a contar (los nulos se omiten)
+        orden_alfabetico (bool): Ordenar los valores alfabéticamente; si es
+            False se conserva el orden de primera aparición
+    
+    Returns:
+        pd.DataFrame: Columnas fecha_venta, <columna> y conteo
+    """
+    return (
+        df.groupby(['fecha_venta', columna], sort=orden_alfabetico, observed=True)
+        .size()
+        .reset_index(name='conteo')
+    )
+
+def top_value_by_date(conteos, columna):
+    """
+    Obtener el valor más frecuente por fecha a partir de counts_by_date
+    
+    Ante empates gana el primer valor en el orden de los conteos (primera
+    aparición, o alfabético si se contaron con orden_alfabetico=True).
+    
+    Returns:
+        pd.Series: Valor más frecuente indexado por fecha_venta
+    """
+    top = (
+        conteos.sort_values('conteo', ascending=False, kind='mergesort')
+        .drop_duplicates('fecha_venta')
+    )
+    top = top.set_index('fecha_venta')[columna]
+    if isinstance(top.dtype, pd.CategoricalDtype):
+        top = top.astype(object)
+    return top
+
+class SalesAggregator:
+    """
+    Agregados parciales y combinables de ventas limpias
+    
+    Mantiene por fecha las sumas y conteos del resumen diario, tablas de
+    conteo (fecha, valor) para los valores más frecuentes y los clientes
+    únicos, y por producto las sumas de ventas_producto. Su tamaño depende de
+    la cardinalidad de fechas y valores, no del número de filas.
+    
+    Cada bloque agregado debe contener transacciones completas (el número de
+    transacciones por producto se suma entre bloques) y los bloques deben
+    llegar en el orden de las ventas: para los empates de categoría y
+    vendedor se conserva la posición de primera aparición, como en
+    aggregate_daily_sales.
+    """
+    
+    CONTEOS = ['categoria', 'vendedor', 'nombre_cliente']
+    
+    # Parciales acumulados antes de combinarlos en una sola pasada
+    MAX_PARCIALES = 8
+    
+    def __init__(self):
+        self.filas = 0
+        self._parciales = []
+    
+    @classmethod
+    def from_frame(cls, df):
+        """Calcular los agregados parciales de un bloque de ventas limpias"""
+        agregador = cls()
+        if df.empty:
+            return agregador
+        
+        totales = df.groupby('fecha_venta').agg(
+            total_ventas=('total_factura', 'sum'),
+            total_transacciones=('total_factura', 'count'),
+            productos_vendidos=('cantidad', 'sum')
+        )
+        
+        posicion = pd.Series(np.arange(len(df)), index=df.index)
+        conteos = {}
+        for columna in cls.CONTEOS:
+            conteos[columna] = (
+                posicion.groupby([df['fecha_venta'], df[columna]], sort=False, observed=True)
+                .agg(['size', 'min'])
+                .rename(columns={'size': 'conteo', 'min': 'primera'})
+                .reset_index()
+            )
+            conteos[columna][columna] = conteos[columna][columna].astype(object)
+        
+        productos = df.groupby('codigo_producto', observed=True).agg(
+            cantidad_vendida=('cantidad', 'sum'),
+            ingresos_producto=('subtotal', 'sum'),
+            num_transacciones=('id_transaccion', 'nunique')
+        )
+        productos.index = productos.index.astype(object)
+        
+        agregador.filas = len(df)
+        agregador._parciales = [{'totales': totales, 'conteos': conteos, 'productos': productos}]
+        return agregador
+    
+    def update(self, df):
+        """Agregar un bloque de ventas limpias (posterior a los anteriores)"""
+        return self.merge(SalesAggregator.from_frame(df))
+    
+    def merge(self, otro):
+        """
+        Combinar con los agregados de filas posteriores a las propias
+        
+        Returns:
+            SalesAggregator: self, con los agregados combinados
+        """
+        for parcial in otro._parciales:
+            conteos = {
+                columna: tabla.assign(primera=tabla['primera'] + self.filas)
+                for columna, tabla in parcial['conteos'].items()
+            }
+            self._parciales.append({**parcial, 'conteos': conteos})
+        self.filas += otro.filas
+        if len(self._parciales) > self.MAX_PARCIALES:
+            self._combinar()
+        return self
+    
+    def _combinar(self):
+        """Reducir los parciales acumulados a uno solo"""
+        if len(self._parciales) < 2:
+            return
+        parciales = self._parciales
+        conteos = {}
+        for columna in self.CONTEOS:
+            conteos[columna] = (
+                pd.concat([p['conteos'][columna] for p in parciales], ignore_index=True)
+                .groupby(['fecha_venta', columna], sort=False)
+                .agg(conteo=('conteo', 'sum'), primera=('primera', 'min'))
+                .reset_index()
+            )
+        self._parciales = [{
+            'totales': pd.concat([p['totales'] for p in parciales]).groupby(level=0).sum(),
+            'conteos': conteos,
+            'productos': pd.concat([p['productos'] for p in parciales]).groupby(level=0).sum()
+        }]
+    
+    def _top(self, columna, desempate):
+        conteos = self._parciales[0]['conteos'][columna].sort_values(
+            ['conteo', desempate], ascending=[False, True], kind='mergesort'
+        )
+        return conteos.drop_duplicates('fecha_venta').set_index('fecha_venta')[columna]
+    
+    def daily_summary(self):
+        """
+        Resumen diario con las columnas de aggregate_daily_sales
+        (sin fecha_procesamiento)
+        """
+        if self.filas == 0:
+            return pd.DataFrame()
+        self._combinar()
+        
+        resumen = self._parciales[0]['totales'].sort_index()
+        transacciones = resumen['total_transacciones']
+        resumen.insert(1, 'promedio_ticket', resumen['total_ventas'].div(transacciones.where(transacciones > 0)))
+        resumen['clientes_unicos'] = (
+            self._parciales[0]['conteos']['nombre_cliente'].groupby('fecha_venta').size()
+            .reindex(resumen.index, fill_value=0)
+        )
+        resumen['categoria_mas_vendida'] = self._top('categoria', 'primera')
+        resumen['vendedor_top'] = self._top('vendedor', 'primera')
+        resumen['cliente_mas_frecuente'] = self._top('nombre_cliente', 'nombre_cliente')
+        return resumen.rename_axis('fecha_resumen').reset_index()
+    
+    def product_sales(self):
+        """Ventas por producto con las columnas de summarize_product_sales"""
+        if self.filas == 0:
+            return pd.DataFrame()
+        self._combinar()
+        return self._parciales[0]['productos'].sort_index().rename_axis('codigo_producto').reset_index()
+
 class DataTransformer:
     """Clase para transformar y limpiar datos"""
     
     def __init__(self):
         pass
     
-    def clean_sales_data(self, df_ventas):
+    @instrumented
+    def clean_sales_data(self, df_ventas, compact=None):
         """
         Limpiar y transformar datos de ventas
         
         Args:
             df_ventas (pd.DataFrame): DataFrame de ventas sin procesar
+            compact (bool): Usar el esquema compacto en memoria (categóricas y
+                enteros pequeños); por defecto TRANSFORM_COMPACT
         
         Returns:
             pd.DataFrame: DataFrame de ventas limpio
@@ -47,6 +276,7 @@ class DataTransformer:
             df['precio_unitario'] = pd.to_numeric(df['precio_unitario'], errors='coerce')
             df['descuento'] = pd.to_numeric(df['descuento'], errors='coerce').fillna(0)
             df['subtotal'] = pd.to_numeric(df['subtotal'], errors='coerce')
+            df['total_factura'] = pd.to_numeric(df['total_factura'], errors='coerce')
             
             # Calcular métricas adicionales
             df['precio_con_descuento'] = df['precio_unitario'] * (1 - df['descuento']/100)
@@ -72,6 +302,15 @@ class DataTransformer:
             df['dia_semana'] = df['fecha_venta'].dt.day_name()
             df['trimestre'] = df['fecha_venta'].dt.quarter
             
+            if compact is None:
+                compact = pipeline_config.transform_config['compact']
+            if compact:
+                memoria_inicial = memory_mb(df)
+                df = compact_sales_frame(df)
+                logger.info(
+                    f"Esquema compacto de ventas: {memoria_inicial:.1f} MB -> {memory_mb(df):.1f} MB"
+                )
+            
             logger.info(f"Datos de ventas limpiados: {len(df)} registros")
             return df
             
@@ -79,6 +318,7 @@ class DataTransformer:
             logger.error(f"Error limpiando datos de ventas: {str(e)}")
             raise
     
+    @instrumented
     def aggregate_daily_sales(self, df_ventas):
         """
         Crear resumen diario de ventas
@@ -96,33 +336,31 @@ class DataTransformer:
                 logger.warning("DataFrame de ventas está vacío")
                 return pd.DataFrame()
             
-            # Agrupar por fecha
-            daily_summary = df_ventas.groupby('fecha_venta').agg({
-                'total_factura': ['sum', 'mean', 'count'],
-                'cantidad': 'sum',
-                'nombre_cliente': 'nunique',
-                'categoria': lambda x: x.value_counts().index[0] if not x.empty else None,
-                'vendedor': lambda x: x.value_counts().index[0] if not x.empty else None
-            }).reset_index()
+            # Agregados por fecha en una sola pasada
+            daily_summary = df_ventas.groupby('fecha_venta').agg(
+                total_ventas=('total_factura', 'sum'),
+                promedio_ticket=('total_factura', 'mean'),
+                total_transacciones=('total_factura', 'count'),
+                productos_vendidos=('cantidad', 'sum')
+            )
             
-            # Aplanar columnas
-            daily_summary.columns = [
-                'fecha_resumen', 'total_ventas', 'promedio_ticket', 
-                'total_transacciones', 'productos_vendidos', 
-                'clientes_unicos', 'categoria_mas_vendida', 'vendedor_top'
-            ]
-            
-            # Calcular cliente más frecuente por día
-            clientes_frecuentes = df_ventas.groupby(['fecha_venta', 'nombre_cliente']).size().reset_index(name='frecuencia')
-            clientes_top = clientes_frecuentes.loc[clientes_frecuentes.groupby('fecha_venta')['frecuencia'].idxmax()]
-            
-            # Merge con resumen diario
-            daily_summary = daily_summary.merge(
-                clientes_top[['fecha_venta', 'nombre_cliente']].rename(columns={'nombre_cliente': 'cliente_mas_frecuente'}),
-                left_on='fecha_resumen',
-                right_on='fecha_venta',
-                how='left'
-            ).drop('fecha_venta', axis=1)
+            # Conteos agrupados para clientes únicos y valores más frecuentes
+            conteos_clientes = counts_by_date(df_ventas, 'nombre_cliente', orden_alfabetico=True)
+            daily_summary['clientes_unicos'] = (
+                conteos_clientes.groupby('fecha_venta').size()
+                .reindex(daily_summary.index, fill_value=0)
+            )
+            daily_summary['categoria_mas_vendida'] = top_value_by_date(
+                counts_by_date(df_ventas, 'categoria'), 'categoria'
+            )
+            daily_summary['vendedor_top'] = top_value_by_date(
+                counts_by_date(df_ventas, 'vendedor'), 'vendedor'
+            )
+            daily_summary['cliente_mas_frecuente'] = top_value_by_date(
+                conteos_clientes, 'nombre_cliente'
+            )
+            
+            daily_summary = daily_summary.rename_axis('fecha_resumen').reset_index()
             
             # Agregar timestamp de procesamiento
             daily_summary['fecha_procesamiento'] = datetime.now()
@@ -134,13 +372,98 @@ class DataTransformer:
             logger.error(f"Error creando resumen diario: {str(e)}")
             raise
     
-    def analyze_inventory_trends(self, df_inventario, df_ventas):
+    @instrumented
+    def summarize_product_sales(self, df_ventas):
+        """
+        Calcular ventas por producto
+        
+        Args:
+            df_ventas (pd.DataFrame): DataFrame de ventas
+        
+        Returns:
+            pd.DataFrame: Cantidad vendida, ingresos y transacciones por producto
+        """
+        try:
+            ventas_producto = df_ventas.groupby('codigo_producto', observed=True).agg({
+                'cantidad': 'sum',
+                'subtotal': 'sum',
+                'id_transaccion': 'nunique'
+            }).reset_index()
+            
+            ventas_producto.columns = ['codigo_producto', 'cantidad_vendida', 'ingresos_producto', 'num_transacciones']
+            return ventas_producto
+            
+        except Exception as e:
+            logger.error(f"Error calculando ventas por producto: {str(e)}")
+            raise
+    
+    @instrumented
+    def transform_sales_chunks(self, chunks, writer=None):
+        """
+        Limpiar y agregar ventas bloque a bloque en memoria acotada
+        
+        Las líneas de la última transacción de cada bloque se retienen y se
+        procesan con el bloque siguiente, de modo que cada bloque agregado
+        contiene transacciones completas. Requiere que las líneas de una
+        transacción lleguen contiguas, como en SALES_QUERY_TEMPLATE.
+        
+        Los bloques se limpian sin el esquema compacto: la memoria ya está
+        acotada por el tamaño del bloque.
+        
+        Args:
+            chunks (iterable): Bloques de ventas sin procesar
+            writer (StagingWriter): Escritor opcional de las ventas limpias
+        
+        Returns:
+            dict: resumen_diario (sin fecha_procesamiento) y ventas_producto
+        """
+        try:
+            logger.info("Transformando ventas por bloques")
+            
+            agregador = SalesAggregator()
+            
+            def _agregar(bloque):
+                if bloque.empty:
+                    return
+                limpio = self.clean_sales_data(bloque, compact=False)
+                if limpio.empty:
+                    return
+                if writer is not None:
+                    writer.write(limpio)
+                agregador.update(limpio)
+            
+            pendiente = None
+            for chunk in chunks:
+                if pendiente is not None:
+                    chunk = pd.concat([pendiente, chunk], ignore_index=True)
+                if chunk.empty:
+                    continue
+                cola = chunk['id_transaccion'].to_numpy() == chunk['id_transaccion'].iloc[-1]
+                pendiente = chunk[cola]
+                _agregar(chunk[~cola])
+            if pendiente is not None:
+                _agregar(pendiente)
+            
+            logger.info(f"Ventas transformadas por bloques: {agregador.filas} registros")
+            return {
+                'resumen_diario': agregador.daily_summary(),
+                'ventas_producto': agregador.product_sales()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error transformando ventas por bloques: {str(e)}")
+            raise
+    
+    @instrumented
+    def analyze_inventory_trends(self, df_inventario, df_ventas=None, ventas_producto=None):
         """
         Analizar tendencias de inventario vs ventas
         
         Args:
             df_inventario (pd.DataFrame): DataFrame de inventario
             df_ventas (pd.DataFrame): DataFrame de ventas
+            ventas_producto (pd.DataFrame): Ventas por producto ya calculadas
+                (por ejemplo en PostgreSQL); reemplaza a df_ventas
         
         Returns:
             pd.DataFrame: Análisis de inventario
@@ -148,18 +471,13 @@ class DataTransformer:
         try:
             logger.info("Analizando tendencias de inventario")
             
-            if df_inventario.empty or df_ventas.empty:
-                logger.warning("DataFrames de inventario o ventas están vacíos")
-                return pd.DataFrame()
-            
             # Calcular ventas por producto
-            ventas_producto = df_ventas.groupby('codigo_producto').agg({
-                'cantidad': 'sum',
-                'subtotal': 'sum',
-                'id_transaccion': 'nunique'
-            }).reset_index()
+            if ventas_producto is None and df_ventas is not None and not df_ventas.empty:
+                ventas_producto = self.summarize_product_sales(df_ventas)
             
-            ventas_producto.columns = ['codigo_producto', 'cantidad_vendida', 'ingresos_producto', 'num_transacciones']
+            if df_inventario.empty or ventas_producto is None or ventas_producto.empty:
+                logger.warning("DataFrames de inventario o ventas están vacíos")
+                return pd.DataFrame()
             
             # Merge con inventario
             inventory_analysis = df_inventario.merge(ventas_producto, on='codigo_producto', how='left')
@@ -192,6 +510,7 @@ class DataTransformer:
             logger.error(f"Error analizando inventario: {str(e)}")
             raise
     
+    @instrumented
     def process_logs_data(self, df_logs):
         """
         Procesar datos de logs de MongoDB
@@ -219,12 +538,14 @@ class DataTransformer:
             
             # Extraer información de productos si existe
             if 'productos' in df.columns:
-                df['num_productos'] = df['productos'].apply(lambda x: len(x) if isinstance(x, list) else 0)
+                df['num_productos'] = df['productos'].apply(
+                    lambda x: len(x) if isinstance(x, (list, np.ndarray)) else 0
+                )
             
             # Categorizar por hora del día
             df['periodo_dia'] = pd.cut(df['hora'], 
-                                     bins=[-1, 6, 12, 18, 24],
-                                     labels=['Madrugada', 'Mañana', 'Tarde', 'Noche'])
+                                     bins=[-1] + [hora for hora, _ in LOGS_PERIODS],
+                                     labels=[periodo for _, periodo in LOGS_PERIODS])
             
             logger.info(f"Logs procesados: {len(df)} registros")
             return df
@@ -233,6 +554,7 @@ class DataTransformer:
             logger.error(f"Error procesando logs: {str(e)}")
             raise
     
+    @instrumented
     def transform_all_data(self, raw_data):
         """
         Transformar todos los datos del pipeline
@@ -248,18 +570,44 @@ class DataTransformer:
             
             transformed_data = {}
             
+            # En modo incremental las ventas son las de los días con cambios; el
+            # análisis de inventario usa las ventas por producto del día de
+            # ejecución ('ventas_inventario'), como en la extracción completa
+            inventario_del_dia = 'ventas_inventario' in raw_data
+            con_inventario = 'inventario' in raw_data and not raw_data['inventario'].empty
+            
             # Transformar datos de ventas
             if 'ventas' in raw_data and not raw_data['ventas'].empty:
                 transformed_data['ventas_clean'] = self.clean_sales_data(raw_data['ventas'])
                 transformed_data['resumen_diario'] = self.aggregate_daily_sales(transformed_data['ventas_clean'])
                 
                 # Análisis de inventario si hay datos
-                if 'inventario' in raw_data and not raw_data['inventario'].empty:
+                if con_inventario and not inventario_del_dia:
                     transformed_data['analisis_inventario'] = self.analyze_inventory_trends(
                         raw_data['inventario'], 
                         transformed_data['ventas_clean']
                     )
             
+            # Ventas ya agregadas (en PostgreSQL en modo pushdown, o por bloques)
+            elif 'resumen_diario' in raw_data and not raw_data['resumen_diario'].empty:
+                resumen_diario = raw_data['resumen_diario'].copy()
+                resumen_diario['fecha_procesamiento'] = datetime.now()
+                transformed_data['resumen_diario'] = resumen_diario
+                
+                ventas_producto = raw_data.get('ventas_producto', pd.DataFrame())
+                if con_inventario and not inventario_del_dia:
+                    transformed_data['analisis_inventario'] = self.analyze_inventory_trends(
+                        raw_data['inventario'],
+                        ventas_producto=ventas_producto
+                    )
+            
+            # Sin ventas en el día de ejecución el análisis anterior se mantiene
+            if inventario_del_dia and con_inventario and not raw_data['ventas_inventario'].empty:
+                transformed_data['analisis_inventario'] = self.analyze_inventory_trends(
+                    raw_data['inventario'],
+                    ventas_producto=raw_data['ventas_inventario']
+                )
+            
             # Procesar logs
             if 'logs' in raw_data and not raw_data['logs'].empty:
                 transformed_data['logs_processed'] = self.process_logs_data(raw_data['logs'])
@@ -271,36 +619,86 @@ class DataTransformer:
             logger.error(f"Error en transformación completa: {str(e)}")
             raise
 
+def _transform_sales_stream(transformer, fecha_ejecucion, archivos):
+    """Transformar las ventas de staging por bloques, escribiendo ventas_clean"""
+    if not staging_store.exists('raw', 'ventas', fecha_ejecucion):
+        logger.warning("No se encontró archivo para ventas")
+        return {}
+    
+    chunk_size = pipeline_config.transform_config['chunk_size']
+    with staging_store.open_writer('processed', 'ventas_clean', fecha_ejecucion) as writer:
+        agregados = transformer.transform_sales_chunks(
+            staging_store.read_chunks('raw', 'ventas', fecha_ejecucion, chunk_size), writer
+        )
+    
+    if writer.total_registros:
+        archivos['ventas_clean'] = writer.path
+        logger.info(f"Datos transformados de ventas_clean guardados en {writer.path}")
+    return agregados
+
 # Función helper para Airflow
+@instrumented_task('transform')
 def transform_data_task(**context):
     """Task function para Airflow"""
     transformer = DataTransformer()
     fecha_ejecucion = context['ds']
     
-    # Cargar datos sin procesar
+    # Cargar datos sin procesar (en modo pushdown las ventas llegan agregadas)
     raw_data = {}
-    data_types = ['ventas', 'inventario', 'logs']
+    pushdown = pipeline_config.transform_config['pushdown']
+    streaming = pipeline_config.transform_config['streaming'] and not pushdown
+    if pushdown:
+        data_types = ['resumen_diario', 'ventas_producto', 'inventario', 'logs']
+    else:
+        data_types = ['ventas', 'inventario', 'logs']
+    if pipeline_config.extract_config['incremental']:
+        # Ventas por producto del día para el análisis de inventario
+        data_types.append('ventas_inventario')
+    if pipeline_config.transform_config['logs_pushdown']:
+        # El resumen de logs se calcula en MongoDB durante la carga
+        data_types.remove('logs')
+    
+    # Reintentos con entradas idénticas reutilizan la transformación anterior
+    cache = TransformCache() if pipeline_config.transform_config['cache'] else None
+    if cache:
+        clave = cache.key('raw', data_types, fecha_ejecucion)
+        if cache.restore(clave, 'processed', fecha_ejecucion) is not None:
+            return "Transformación completada (caché)"
+    
+    # Backend Polars: lee y escribe staging directamente, en un solo plan
+    if pipeline_config.transform_config['backend'] == 'polars':
+        from src.transform_polars import transform_staged
+        archivos = transform_staged(fecha_ejecucion, data_types)
+        if cache:
+            cache.save(clave, archivos)
+        return "Transformación completada"
     
     for data_type in data_types:
+        if streaming and data_type == 'ventas':
+            continue
         try:
-            file_path = f'/opt/airflow/data/raw/{data_type}_{fecha_ejecucion}.csv'
-            raw_data[data_type] = pd.read_csv(file_path)
+            raw_data[data_type] = staging_store.read('raw', data_type, fecha_ejecucion)
             logger.info(f"Cargados datos de {data_type}: {len(raw_data[data_type])} registros")
         except FileNotFoundError:
             logger.warning(f"No se encontró archivo para {data_type}")
             raw_data[data_type] = pd.DataFrame()
     
+    # Ventas por bloques: en memoria sólo quedan los agregados parciales
+    archivos = {}
+    if streaming:
+        raw_data.update(_transform_sales_stream(transformer, fecha_ejecucion, archivos))
+    
     # Transformar datos
     transformed_data = transformer.transform_all_data(raw_data)
     
     # Guardar datos transformados
-    import os
-    os.makedirs('/opt/airflow/data/processed', exist_ok=True)
-    
     for key, df in transformed_data.items():
         if not df.empty:
-            file_path = f'/opt/airflow/data/processed/{key}_{fecha_ejecucion}.csv'
-            df.to_csv(file_path, index=False)
+            file_path = staging_store.write(df, 'processed', key, fecha_ejecucion)
+            archivos[key] = file_path
             logger.info(f"Datos transformados de {key} guardados en {file_path}")
     
+    if cache:
+        cache.save(clave, archivos)
+    
     return "Transformación completada"
@@ -0,0 +1,208 @@
+"""
+Módulo de Caché de Transformaciones
+Metaltronic S.A. - Pipeline ETL
+
+Reutiliza los datasets transformados cuando los archivos de entrada de la
+transformación son idénticos a los de una ejecución anterior (reintentos o
+ejecuciones limpiadas en Airflow). La clave combina el hash del contenido de
+los archivos de staging de entrada, el código del pipeline (src/), las
+versiones de las bibliotecas de datos y la configuración que afecta al
+resultado. Las entradas se desalojan por uso menos reciente cuando el caché
+supera su tamaño máximo.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from importlib import metadata
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Código cuyo cambio invalida el caché: todo src/, porque las salidas también
+# dependen de la lectura de staging (staging.py), de las métricas que envuelven
+# a los lectores y de los módulos que importa el transformador
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_FILES = sorted(glob.glob(os.path.join(CODE_DIR, '*.py')))
+
+# Bibliotecas cuya versión cambia el resultado de la transformación
+LIBRARIES = ['numpy', 'pandas', 'pyarrow', 'polars']
+
+MANIFEST = 'manifest.json'
+
+
+def file_digest(path, hasher=None, bloque=1024 * 1024):
+    """Agregar el contenido de un archivo a un hash SHA-256"""
+    hasher = hasher or hashlib.sha256()
+    with open(path, 'rb') as archivo:
+        for parte in iter(lambda: archivo.read(bloque), b''):
+            hasher.update(parte)
+    return hasher
+
+
+def library_versions():
+    """Versiones instaladas de LIBRARIES (None si no está instalada)"""
+    versiones = {}
+    for biblioteca in LIBRARIES:
+        try:
+            versiones[biblioteca] = metadata.version(biblioteca)
+        except metadata.PackageNotFoundError:
+            versiones[biblioteca] = None
+    return versiones
+
+
+class TransformCache:
+    """Clase para guardar y restaurar salidas de la transformación"""
+
+    def __init__(self, cache_dir=None, max_mb=None, store=None):
+        config = pipeline_config.transform_config
+        self.cache_dir = cache_dir or config['cache_dir']
+        self.max_bytes = (config['cache_max_mb'] if max_mb is None else max_mb) * 1024 * 1024
+        self.store = store or staging_store
+
+    def key(self, etapa, nombres, fecha):
+        """
+        Calcular la clave de caché de un conjunto de datasets de entrada
+
+        Args:
+            etapa (str): Etapa de staging de las entradas ('raw')
+            nombres (list): Datasets de entrada
+            fecha (str): Fecha de ejecución
+
+        Returns:
+            str: Hash hexadecimal de entradas, código y configuración
+        """
+        hasher = hashlib.sha256()
+        for path in CODE_FILES:
+            hasher.update(f'{os.path.basename(path)}:'.encode('utf-8'))
+            file_digest(path, hasher)
+        hasher.update(json.dumps(library_versions(), sort_keys=True).encode('utf-8'))
+
+        configuracion = {k: v for k, v in pipeline_config.transform_config.items()
+                         if not k.startswith('cache')}
+        configuracion['staging'] = [self.store.formato, self.store.compression]
+        hasher.update(json.dumps(configuracion, sort_keys=True).encode('utf-8'))
+
+        for nombre in sorted(nombres):
+            path, formato = self.store.find(etapa, nombre, fecha)
+            hasher.update(f'{nombre}:{formato}:'.encode('utf-8'))
+            if path is not None:
+                hasher.update(file_digest(path).digest())
+        return hasher.hexdigest()
+
+    def _entry_dir(self, clave):
+        return os.path.join(self.cache_dir, clave)
+
+    def restore(self, clave, etapa, fecha):
+        """
+        Copiar a staging las salidas guardadas para una clave
+
+        Args:
+            clave (str): Clave calculada con key()
+            etapa (str): Etapa de staging de las salidas ('processed')
+            fecha (str): Fecha de ejecución
+
+        Returns:
+            list: Datasets restaurados, o None si la clave no está en caché
+        """
+        entrada = self._entry_dir(clave)
+        try:
+            with open(os.path.join(entrada, MANIFEST), encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        try:
+            for nombre, archivo in manifiesto['datasets'].items():
+                destino = self.store.path(etapa, nombre, fecha)
+                os.makedirs(os.path.dirname(destino), exist_ok=True)
+                shutil.copyfile(os.path.join(entrada, archivo), f'{destino}.tmp')
+                os.replace(f'{destino}.tmp', destino)
+        except OSError as e:
+            logger.warning(f"Entrada de caché {clave[:12]} incompleta, se descarta: {str(e)}")
+            shutil.rmtree(entrada, ignore_errors=True)
+            return None
+
+        # Marcar como usada recientemente para el desalojo LRU
+        os.utime(entrada)
+        logger.info(f"Transformación restaurada desde caché {clave[:12]}: {', '.join(manifiesto['datasets'])}")
+        return list(manifiesto['datasets'])
+
+    def save(self, clave, paths):
+        """
+        Guardar en caché los archivos de salida de una transformación
+
+        Args:
+            clave (str): Clave calculada con key()
+            paths (dict): Dataset -> ruta del archivo escrito en staging
+        """
+        entrada = self._entry_dir(clave)
+        if os.path.exists(os.path.join(entrada, MANIFEST)):
+            return
+
+        tmp = f'{entrada}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        datasets = {}
+        for nombre, path in paths.items():
+            archivo = os.path.basename(path)
+            shutil.copyfile(path, os.path.join(tmp, archivo))
+            datasets[nombre] = archivo
+        with open(os.path.join(tmp, MANIFEST), 'w', encoding='utf-8') as archivo:
+            json.dump({'datasets': datasets, 'creado': time.time()}, archivo)
+
+        shutil.rmtree(entrada, ignore_errors=True)
+        os.replace(tmp, entrada)
+        logger.info(f"Transformación guardada en caché {clave[:12]}")
+        self.evict(conservar=clave)
+
+    def entries(self):
+        """
+        Listar las entradas del caché
+
+        Returns:
+            list: Tuplas (clave, último uso, bytes) ordenadas de la menos a la
+                más recientemente usada
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entradas = []
+        for clave in os.listdir(self.cache_dir):
+            entrada = self._entry_dir(clave)
+            if not os.path.exists(os.path.join(entrada, MANIFEST)):
+                continue
+            tamano = sum(os.path.getsize(os.path.join(entrada, f)) for f in os.listdir(entrada))
+            entradas.append((clave, os.path.getmtime(entrada), tamano))
+        return sorted(entradas, key=lambda e: e[1])
+
+    def evict(self, conservar=None):
+        """
+        Eliminar entradas menos recientemente usadas hasta respetar el tamaño máximo
+
+        Args:
+            conservar (str): Clave que no se elimina (la recién guardada)
+
+        Returns:
+            int: Entradas eliminadas
+        """
+        entradas = self.entries()
+        total = sum(tamano for _, _, tamano in entradas)
+        eliminadas = 0
+        for clave, _, tamano in entradas:
+            if total <= self.max_bytes:
+                break
+            if clave == conservar:
+                continue
+            shutil.rmtree(self._entry_dir(clave), ignore_errors=True)
+            total -= tamano
+            eliminadas += 1
+        if eliminadas:
+            logger.info(f"Caché de transformación: {eliminadas} entradas desalojadas, {total / 1024 / 1024:.1f} MB en uso")
+        return eliminadas
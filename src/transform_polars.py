@@ -0,0 +1,567 @@
+"""
+Módulo de Transformación de Datos con Polars
+Metaltronic S.A. - Pipeline ETL
+
+Backend alternativo de DataTransformer (TRANSFORM_BACKEND=polars). Cada
+transformación se expresa como una consulta lazy de Polars, que se ejecuta
+en varios hilos y sin copias intermedias; transform_all_data arma un único
+plan con todas las salidas y lo ejecuta con collect_all, de modo que la
+limpieza de ventas se calcula una sola vez para el resumen diario y el
+análisis de inventario.
+
+PolarsTransformer ofrece la misma interfaz que DataTransformer (DataFrames
+de pandas de entrada y salida, con las mismas columnas, valores y tipos).
+En la tarea de Airflow, transform_staged lee los archivos de staging con
+scan_staged, de modo que las columnas no usadas y los filtros se aplican en
+la lectura, y escribe los resultados sin pasar por pandas.
+"""
+
+import os
+import logging
+from datetime import datetime
+import pandas as pd
+import polars as pl
+from config.pipeline import pipeline_config
+from src.staging import staging_store
+from src.metrics import instrumented, metrics_collector
+from src.transform import LOGS_PERIODS, compact_sales_frame, memory_mb
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SALES_NUMERIC_COLUMNS = ['cantidad', 'precio_unitario', 'descuento', 'subtotal', 'total_factura']
+
+PAYMENT_TYPES = {
+    'Efectivo': 'Inmediato',
+    'Transferencia': 'Inmediato',
+    'Cheque': 'Diferido',
+    'Crédito': 'Diferido'
+}
+
+# Intervalos (límite superior inclusive, etiqueta) de las columnas que
+# DataTransformer construye con pd.cut
+SALE_CATEGORIES = [(200, 'Pequeña'), (500, 'Mediana'), (1000, 'Grande'), (float('inf'), 'Muy Grande')]
+PERFORMANCE_LEVELS = [(0.1, 'Bajo'), (0.5, 'Medio'), (1.0, 'Alto'), (float('inf'), 'Muy Alto')]
+
+
+def scan_staged(etapa, nombre, fecha=None, store=None):
+    """
+    Abrir un dataset de staging como LazyFrame
+
+    Returns:
+        pl.LazyFrame: Lectura diferida del archivo, o None si no existe
+    """
+    store = store or staging_store
+    path, formato = store.find(etapa, nombre, fecha)
+    if path is None:
+        return None
+    metrics_collector.record_bytes(leidos=os.path.getsize(path))
+    if formato == 'parquet':
+        return pl.scan_parquet(path)
+    return pl.scan_csv(path, try_parse_dates=True)
+
+
+def _lazy(df):
+    """Convertir una entrada (pandas o Polars) a LazyFrame"""
+    if isinstance(df, pl.LazyFrame):
+        return df
+    if isinstance(df, pl.DataFrame):
+        return df.lazy()
+    return pl.from_pandas(df).lazy()
+
+
+def _is_empty(df):
+    """Verificar si una entrada está vacía (los LazyFrames se consideran con datos)"""
+    return df is None or (not isinstance(df, pl.LazyFrame) and len(df) == 0)
+
+
+def _bucket(columna, limites, inferior=None):
+    """
+    Expresión equivalente a pd.cut con intervalos cerrados por la derecha
+
+    El resultado es un Enum con las etiquetas en orden (categórica ordenada
+    en pandas). Los valores nulos, NaN o no mayores que el límite inferior
+    quedan nulos.
+    """
+    valor = pl.col(columna).cast(pl.Float64)
+    fuera = valor.is_null() | valor.is_nan()
+    if inferior is not None:
+        fuera = fuera | (valor <= inferior)
+    expresion = pl.when(fuera).then(None)
+    for limite, etiqueta in limites:
+        expresion = expresion.when(valor <= limite).then(pl.lit(etiqueta))
+    return expresion.otherwise(None).cast(pl.Enum([etiqueta for _, etiqueta in limites]))
+
+
+def to_pandas(df):
+    """
+    Convertir un resultado de Polars a pandas con los tipos de DataTransformer
+
+    Los Enum pasan a categóricas ordenadas; las fechas sin hora se
+    convierten a objetos date.
+    """
+    resultado = df.to_pandas()
+    for columna, dtype in df.schema.items():
+        if dtype == pl.Date:
+            resultado[columna] = pd.to_datetime(resultado[columna]).dt.date
+    return resultado
+
+
+def _csv_frame(df):
+    """
+    Dar a las fechas el formato de texto de DataFrame.to_csv
+
+    pandas omite la hora si todos los valores de la columna son medianoche y
+    los microsegundos si ninguno los tiene; el staging CSV se lee como texto,
+    por lo que ambos backends deben escribir lo mismo.
+    """
+    columnas = [c for c, dtype in df.schema.items() if isinstance(dtype, pl.Datetime)]
+    if not columnas:
+        return df
+    componentes = df.select(
+        *[(pl.col(c).dt.time() != pl.time(0)).any().alias(f'hora_{c}') for c in columnas],
+        *[(pl.col(c).dt.microsecond() != 0).any().alias(f'micro_{c}') for c in columnas]
+    ).row(0, named=True)
+    formatos = []
+    for columna in columnas:
+        if componentes[f'micro_{columna}']:
+            formato = '%Y-%m-%d %H:%M:%S%.6f'
+        elif componentes[f'hora_{columna}']:
+            formato = '%Y-%m-%d %H:%M:%S'
+        else:
+            formato = '%Y-%m-%d'
+        formatos.append(pl.col(columna).dt.strftime(formato))
+    return df.with_columns(formatos)
+
+
+def write_staged(df, etapa, nombre, fecha=None, store=None):
+    """
+    Guardar un resultado de Polars en staging sin pasar por pandas
+
+    Returns:
+        str: Ruta del archivo escrito
+    """
+    store = store or staging_store
+    path = store.path(etapa, nombre, fecha)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        if store.formato == 'parquet':
+            df.write_parquet(tmp_path, compression=store.compression or 'uncompressed')
+        else:
+            _csv_frame(df).write_csv(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    metrics_collector.record_bytes(escritos=os.path.getsize(path))
+    return path
+
+
+def collect_all(planes):
+    """Ejecutar varios planes juntos (motor streaming si TRANSFORM_STREAMING)"""
+    motor = 'streaming' if pipeline_config.transform_config['streaming'] else 'auto'
+    return pl.collect_all(list(planes), engine=motor)
+
+
+class PolarsTransformer:
+    """Clase para transformar y limpiar datos con consultas lazy de Polars"""
+
+    def __init__(self):
+        pass
+
+    # Planes lazy: reciben y devuelven pl.LazyFrame
+
+    def clean_sales_plan(self, ventas):
+        """Plan de clean_sales_data"""
+        esquema = ventas.collect_schema()
+
+        if esquema['fecha_venta'] == pl.String:
+            fecha = pl.col('fecha_venta').str.to_datetime(time_unit='ns')
+        else:
+            fecha = pl.col('fecha_venta').cast(pl.Datetime('ns'))
+
+        # Como pd.to_numeric: los tipos numéricos se conservan, el resto
+        # (Decimal, texto) pasa a flotante con errores como nulos
+        numericas = [
+            pl.col(columna) if esquema[columna].is_integer() or esquema[columna].is_float()
+            else pl.col(columna).cast(pl.Float64, strict=False)
+            for columna in SALES_NUMERIC_COLUMNS
+        ]
+
+        precio_con_descuento = pl.col('precio_unitario') * (1 - pl.col('descuento') / 100)
+        return (
+            ventas
+            .filter(pl.col('numero_factura').is_not_null() & pl.col('fecha_venta').is_not_null())
+            .with_columns(fecha.alias('fecha_venta'), *numericas)
+            .with_columns(pl.col('descuento').fill_null(0))
+            .with_columns(precio_con_descuento.alias('precio_con_descuento'))
+            .with_columns(
+                (pl.col('precio_unitario') - pl.col('precio_con_descuento')).alias('margen_descuento'),
+                (pl.col('cantidad') * pl.col('precio_con_descuento')).alias('valor_total_producto'),
+                pl.col('metodo_pago').replace_strict(PAYMENT_TYPES, default='Otro',
+                                                     return_dtype=pl.String).alias('tipo_pago'),
+                _bucket('total_factura', SALE_CATEGORIES, inferior=0).alias('categoria_venta'),
+                pl.col('fecha_venta').dt.year().cast(pl.Int32).alias('año'),
+                pl.col('fecha_venta').dt.month().cast(pl.Int32).alias('mes'),
+                pl.col('fecha_venta').dt.strftime('%A').alias('dia_semana'),
+                pl.col('fecha_venta').dt.quarter().cast(pl.Int32).alias('trimestre')
+            )
+        )
+
+    def _top_value(self, ventas, columna, orden_alfabetico=False):
+        """
+        Valor más frecuente por fecha; ante empates gana la primera
+        aparición, o el primero alfabéticamente
+        """
+        desempate = columna if orden_alfabetico else 'primera'
+        return (
+            ventas.filter(pl.col(columna).is_not_null())
+            .group_by('fecha_venta', columna)
+            .agg(pl.len().alias('conteo'), pl.col('fila').min().alias('primera'))
+            .sort(['fecha_venta', 'conteo', desempate], descending=[False, True, False])
+            .group_by('fecha_venta', maintain_order=True)
+            .first()
+            .select('fecha_venta', columna)
+        )
+
+    def daily_summary_plan(self, ventas_clean):
+        """Plan de aggregate_daily_sales (sin fecha_procesamiento)"""
+        ventas = ventas_clean.with_row_index('fila')
+        resumen = (
+            ventas.group_by('fecha_venta')
+            .agg(
+                pl.col('total_factura').sum().alias('total_ventas'),
+                pl.col('total_factura').mean().alias('promedio_ticket'),
+                pl.col('total_factura').count().cast(pl.Int64).alias('total_transacciones'),
+                pl.col('cantidad').sum().alias('productos_vendidos'),
+                pl.col('nombre_cliente').drop_nulls().n_unique().cast(pl.Int64).alias('clientes_unicos')
+            )
+        )
+        categoria = self._top_value(ventas, 'categoria').rename({'categoria': 'categoria_mas_vendida'})
+        vendedor = self._top_value(ventas, 'vendedor').rename({'vendedor': 'vendedor_top'})
+        cliente = self._top_value(ventas, 'nombre_cliente', orden_alfabetico=True).rename(
+            {'nombre_cliente': 'cliente_mas_frecuente'})
+        return (
+            resumen
+            .join(categoria, on='fecha_venta', how='left')
+            .join(vendedor, on='fecha_venta', how='left')
+            .join(cliente, on='fecha_venta', how='left')
+            .sort('fecha_venta')
+            .rename({'fecha_venta': 'fecha_resumen'})
+        )
+
+    def product_sales_plan(self, ventas_clean):
+        """Plan de summarize_product_sales"""
+        return (
+            ventas_clean.filter(pl.col('codigo_producto').is_not_null())
+            .group_by('codigo_producto')
+            .agg(
+                pl.col('cantidad').sum().alias('cantidad_vendida'),
+                pl.col('subtotal').sum().alias('ingresos_producto'),
+                pl.col('id_transaccion').drop_nulls().n_unique().cast(pl.Int64).alias('num_transacciones')
+            )
+            .sort('codigo_producto')
+        )
+
+    def inventory_plan(self, inventario, ventas_producto):
+        """Plan de analyze_inventory_trends a partir de las ventas por producto"""
+        vendidos = ['cantidad_vendida', 'ingresos_producto', 'num_transacciones']
+
+        def _reemplazar_no_finitos(expresion, valor):
+            return (pl.when(expresion.is_infinite()).then(valor)
+                    .otherwise(expresion).fill_nan(valor).fill_null(valor))
+
+        return (
+            inventario.join(ventas_producto, on='codigo_producto', how='left', maintain_order='left')
+            .with_columns(pl.col(vendidos).fill_null(0))
+            .with_columns(
+                _reemplazar_no_finitos(
+                    pl.col('cantidad_vendida').cast(pl.Float64) / pl.col('stock_actual'), 0.0
+                ).alias('rotacion_inventario'),
+                _reemplazar_no_finitos(
+                    pl.col('stock_actual').cast(pl.Float64) / pl.col('cantidad_vendida') * 30, 999.0
+                ).alias('dias_stock')
+            )
+            .with_columns(_bucket('rotacion_inventario', PERFORMANCE_LEVELS).alias('performance'))
+        )
+
+    def logs_plan(self, logs):
+        """Plan de process_logs_data"""
+        esquema = logs.collect_schema()
+        if esquema['timestamp'] == pl.String:
+            timestamp = pl.col('timestamp').str.to_datetime(time_unit='ns')
+        else:
+            timestamp = pl.col('timestamp').cast(pl.Datetime('ns'))
+
+        columnas = [
+            pl.col('timestamp').dt.date().alias('fecha'),
+            pl.col('timestamp').dt.hour().cast(pl.Int32).alias('hora')
+        ]
+        if 'productos' in esquema:
+            columnas.append(pl.col('productos').list.len().fill_null(0).cast(pl.Int64).alias('num_productos'))
+
+        return (
+            logs.with_columns(timestamp.alias('timestamp'))
+            .with_columns(columnas)
+            .with_columns(_bucket('hora', LOGS_PERIODS, inferior=-1).alias('periodo_dia'))
+        )
+
+    def plan_all(self, raw_data):
+        """
+        Planes de todas las salidas de transform_all_data
+
+        La limpieza de ventas es un subplan común del resumen diario y del
+        análisis de inventario; collect_all lo ejecuta una sola vez.
+
+        Returns:
+            dict: Dataset transformado -> pl.LazyFrame
+        """
+        planes = {}
+        procesamiento = pl.lit(datetime.now()).cast(pl.Datetime('ns')).alias('fecha_procesamiento')
+        inventario = raw_data.get('inventario')
+        # Modo incremental: análisis de inventario con las ventas del día de ejecución
+        inventario_del_dia = 'ventas_inventario' in raw_data
+
+        if not _is_empty(raw_data.get('ventas')):
+            ventas_clean = self.clean_sales_plan(_lazy(raw_data['ventas']))
+            planes['ventas_clean'] = ventas_clean
+            planes['resumen_diario'] = self.daily_summary_plan(ventas_clean).with_columns(procesamiento)
+            if not _is_empty(inventario) and not inventario_del_dia:
+                planes['analisis_inventario'] = self.inventory_plan(
+                    _lazy(inventario), self.product_sales_plan(ventas_clean)
+                )
+
+        # Ventas ya agregadas (en PostgreSQL en modo pushdown)
+        elif not _is_empty(raw_data.get('resumen_diario')):
+            planes['resumen_diario'] = _lazy(raw_data['resumen_diario']).with_columns(procesamiento)
+            ventas_producto = raw_data.get('ventas_producto')
+            if not _is_empty(inventario) and not _is_empty(ventas_producto) and not inventario_del_dia:
+                planes['analisis_inventario'] = self.inventory_plan(
+                    _lazy(inventario), _lazy(ventas_producto)
+                )
+
+        if not _is_empty(inventario) and inventario_del_dia and not _is_empty(raw_data['ventas_inventario']):
+            planes['analisis_inventario'] = self.inventory_plan(
+                _lazy(inventario), _lazy(raw_data['ventas_inventario'])
+            )
+
+        if not _is_empty(raw_data.get('logs')):
+            planes['logs_processed'] = self.logs_plan(_lazy(raw_data['logs']))
+
+        return planes
+
+    # Interfaz de DataTransformer: DataFrames de pandas de entrada y salida
+
+    @instrumented
+    def clean_sales_data(self, df_ventas, compact=None):
+        """
+        Limpiar y transformar datos de ventas
+
+        Args:
+            df_ventas (pd.DataFrame): DataFrame de ventas sin procesar
+            compact (bool): Usar el esquema compacto en memoria; por defecto
+                TRANSFORM_COMPACT
+
+        Returns:
+            pd.DataFrame: DataFrame de ventas limpio
+        """
+        try:
+            logger.info("Iniciando limpieza de datos de ventas (Polars)")
+
+            if _is_empty(df_ventas):
+                logger.warning("DataFrame de ventas está vacío")
+                return df_ventas
+
+            df = to_pandas(self.clean_sales_plan(_lazy(df_ventas)).collect())
+            df = self._compact(df, compact)
+
+            logger.info(f"Datos de ventas limpiados: {len(df)} registros")
+            return df
+
+        except Exception as e:
+            logger.error(f"Error limpiando datos de ventas: {str(e)}")
+            raise
+
+    def _compact(self, df, compact):
+        if compact is None:
+            compact = pipeline_config.transform_config['compact']
+        if not compact:
+            return df
+        memoria_inicial = memory_mb(df)
+        df = compact_sales_frame(df)
+        logger.info(f"Esquema compacto de ventas: {memoria_inicial:.1f} MB -> {memory_mb(df):.1f} MB")
+        return df
+
+    @instrumented
+    def aggregate_daily_sales(self, df_ventas):
+        """
+        Crear resumen diario de ventas
+
+        Args:
+            df_ventas (pd.DataFrame): DataFrame de ventas limpio
+
+        Returns:
+            pd.DataFrame: Resumen diario de ventas
+        """
+        try:
+            logger.info("Creando resumen diario de ventas (Polars)")
+
+            if _is_empty(df_ventas):
+                logger.warning("DataFrame de ventas está vacío")
+                return pd.DataFrame()
+
+            daily_summary = to_pandas(self.daily_summary_plan(_lazy(df_ventas)).collect())
+            daily_summary['fecha_procesamiento'] = datetime.now()
+
+            logger.info(f"Resumen diario creado: {len(daily_summary)} días")
+            return daily_summary
+
+        except Exception as e:
+            logger.error(f"Error creando resumen diario: {str(e)}")
+            raise
+
+    @instrumented
+    def summarize_product_sales(self, df_ventas):
+        """
+        Calcular ventas por producto
+
+        Args:
+            df_ventas (pd.DataFrame): DataFrame de ventas
+
+        Returns:
+            pd.DataFrame: Cantidad vendida, ingresos y transacciones por producto
+        """
+        try:
+            return to_pandas(self.product_sales_plan(_lazy(df_ventas)).collect())
+
+        except Exception as e:
+            logger.error(f"Error calculando ventas por producto: {str(e)}")
+            raise
+
+    @instrumented
+    def analyze_inventory_trends(self, df_inventario, df_ventas=None, ventas_producto=None):
+        """
+        Analizar tendencias de inventario vs ventas
+
+        Args:
+            df_inventario (pd.DataFrame): DataFrame de inventario
+            df_ventas (pd.DataFrame): DataFrame de ventas
+            ventas_producto (pd.DataFrame): Ventas por producto ya calculadas;
+                reemplaza a df_ventas
+
+        Returns:
+            pd.DataFrame: Análisis de inventario
+        """
+        try:
+            logger.info("Analizando tendencias de inventario (Polars)")
+
+            if ventas_producto is None and not _is_empty(df_ventas):
+                ventas_producto = self.product_sales_plan(_lazy(df_ventas))
+
+            if _is_empty(df_inventario) or _is_empty(ventas_producto):
+                logger.warning("DataFrames de inventario o ventas están vacíos")
+                return pd.DataFrame()
+
+            inventory_analysis = to_pandas(
+                self.inventory_plan(_lazy(df_inventario), _lazy(ventas_producto)).collect()
+            )
+
+            logger.info(f"Análisis de inventario completado: {len(inventory_analysis)} productos")
+            return inventory_analysis
+
+        except Exception as e:
+            logger.error(f"Error analizando inventario: {str(e)}")
+            raise
+
+    @instrumented
+    def process_logs_data(self, df_logs):
+        """
+        Procesar datos de logs de MongoDB
+
+        Args:
+            df_logs (pd.DataFrame): DataFrame de logs
+
+        Returns:
+            pd.DataFrame: Logs procesados
+        """
+        try:
+            logger.info("Procesando datos de logs (Polars)")
+
+            if _is_empty(df_logs):
+                logger.warning("DataFrame de logs está vacío")
+                return df_logs
+
+            df = to_pandas(self.logs_plan(_lazy(df_logs)).collect())
+
+            logger.info(f"Logs procesados: {len(df)} registros")
+            return df
+
+        except Exception as e:
+            logger.error(f"Error procesando logs: {str(e)}")
+            raise
+
+    @instrumented
+    def transform_all_data(self, raw_data):
+        """
+        Ejecutar todas las transformaciones en un solo plan de Polars
+
+        Args:
+            raw_data (dict): Datos sin procesar (DataFrames de pandas o
+                LazyFrames de scan_staged)
+
+        Returns:
+            dict: Diccionario con datos transformados (DataFrames de pandas)
+        """
+        try:
+            logger.info("Iniciando transformación completa de datos (Polars)")
+
+            planes = self.plan_all(raw_data)
+            transformed_data = {}
+            for nombre, resultado in zip(planes, collect_all(planes.values())):
+                if resultado.height == 0:
+                    continue
+                transformed_data[nombre] = to_pandas(resultado)
+                if nombre == 'ventas_clean':
+                    transformed_data[nombre] = self._compact(transformed_data[nombre], None)
+
+            logger.info("Transformación completa finalizada")
+            return transformed_data
+
+        except Exception as e:
+            logger.error(f"Error en transformación completa: {str(e)}")
+            raise
+
+
+@instrumented
+def transform_staged(fecha_ejecucion, data_types, store=None):
+    """
+    Transformar los datasets de staging de una fecha con Polars
+
+    Las entradas se leen con scan_staged y las salidas se escriben con
+    write_staged: los datos no pasan por pandas.
+
+    Args:
+        fecha_ejecucion (str): Fecha de ejecución
+        data_types (list): Datasets de entrada en la etapa 'raw'
+        store (StagingStore): Staging a usar (por defecto el global)
+
+    Returns:
+        dict: Dataset transformado -> ruta del archivo escrito
+    """
+    store = store or staging_store
+    raw_data = {}
+    for data_type in data_types:
+        raw_data[data_type] = scan_staged('raw', data_type, fecha_ejecucion, store)
+        if raw_data[data_type] is None:
+            logger.warning(f"No se encontró archivo para {data_type}")
+
+    planes = PolarsTransformer().plan_all(raw_data)
+    archivos = {}
+    for nombre, resultado in zip(planes, collect_all(planes.values())):
+        if resultado.height == 0:
+            continue
+        archivos[nombre] = write_staged(resultado, 'processed', nombre, fecha_ejecucion, store)
+        logger.info(f"Datos transformados de {nombre} guardados en {archivos[nombre]}: {resultado.height} registros")
+    return archivos
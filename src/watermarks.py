@@ -0,0 +1,111 @@
+"""
+Módulo de Marcas de Agua (Watermarks)
+Metaltronic S.A. - Pipeline ETL
+
+Persiste en analytics.etl_watermarks el último valor procesado de cada fuente
+para la extracción incremental. Las marcas de ventas e inventario se
+registran como pendientes al extraer y se confirman sólo después de una
+carga exitosa.
+"""
+
+import logging
+from sqlalchemy import text
+from config.database import db_config
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CREATE_WATERMARKS_TABLE = """
+CREATE TABLE IF NOT EXISTS analytics.etl_watermarks (
+    fuente VARCHAR(100) PRIMARY KEY,
+    valor_confirmado VARCHAR(50),
+    valor_pendiente VARCHAR(50),
+    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class WatermarkStore:
+    """Clase para leer y actualizar marcas de agua de extracción incremental"""
+
+    def __init__(self):
+        self.db_config = db_config
+        self._tabla_verificada = False
+
+    def _ensure_table(self, conn):
+        """Crear la tabla de marcas de agua si no existe"""
+        if not self._tabla_verificada:
+            conn.execute(text(CREATE_WATERMARKS_TABLE))
+            self._tabla_verificada = True
+
+    def get(self, fuente):
+        """
+        Obtener la marca de agua confirmada de una fuente
+
+        Args:
+            fuente (str): Identificador de la fuente (por ejemplo 'ventas.transacciones')
+
+        Returns:
+            str: Último valor confirmado, o None si nunca se procesó
+        """
+        engine = self.db_config.get_postgres_engine()
+        with engine.begin() as conn:
+            self._ensure_table(conn)
+            result = conn.execute(
+                text("SELECT valor_confirmado FROM analytics.etl_watermarks WHERE fuente = :fuente"),
+                {"fuente": fuente}
+            ).fetchone()
+        return result[0] if result else None
+
+    def set(self, fuente, valor, pendiente=False):
+        """
+        Registrar una nueva marca de agua
+
+        Args:
+            fuente (str): Identificador de la fuente
+            valor: Nuevo valor (se guarda como texto)
+            pendiente (bool): Guardar como pendiente hasta llamar a confirm()
+        """
+        columna = 'valor_pendiente' if pendiente else 'valor_confirmado'
+        engine = self.db_config.get_postgres_engine()
+        with engine.begin() as conn:
+            self._ensure_table(conn)
+            conn.execute(
+                text(f"""
+                INSERT INTO analytics.etl_watermarks (fuente, {columna}, fecha_actualizacion)
+                VALUES (:fuente, :valor, CURRENT_TIMESTAMP)
+                ON CONFLICT (fuente) DO UPDATE
+                SET {columna} = EXCLUDED.{columna},
+                    fecha_actualizacion = EXCLUDED.fecha_actualizacion
+                """),
+                {"fuente": fuente, "valor": str(valor)}
+            )
+        logger.info(f"Marca de agua {'pendiente ' if pendiente else ''}de {fuente}: {valor}")
+
+    def confirm(self, fuente=None):
+        """
+        Confirmar las marcas de agua pendientes
+
+        Args:
+            fuente (str): Fuente a confirmar (por defecto todas)
+
+        Returns:
+            int: Número de marcas confirmadas
+        """
+        filtro = "AND fuente = :fuente" if fuente else ""
+        engine = self.db_config.get_postgres_engine()
+        with engine.begin() as conn:
+            self._ensure_table(conn)
+            result = conn.execute(
+                text(f"""
+                UPDATE analytics.etl_watermarks
+                SET valor_confirmado = valor_pendiente,
+                    valor_pendiente = NULL,
+                    fecha_actualizacion = CURRENT_TIMESTAMP
+                WHERE valor_pendiente IS NOT NULL {filtro}
+                """),
+                {"fuente": fuente}
+            )
+        logger.info(f"Marcas de agua confirmadas: {result.rowcount}")
+        return result.rowcount